@@ -0,0 +1,294 @@
+"""
+Coordinator driving several load generators as one larger load source.
+
+A coordinator fronts N load generator instances (each started with --serve)
+through their /start, /stop and /metrics endpoints, and offers the same
+interface as a single LoadGenerator, so it can be served on the usual HTTP
+API or run from the command line with --coordinate.
+
+On start, target_rate is split evenly across the instances and every instance
+is given the same start_at time, a few seconds in the future, so that each
+can build its corpus and all of them begin sending together. Metrics are
+scraped from every instance and merged: counters and the target rate are
+summed, and the export latency histograms are added bucket by bucket, so the
+quantiles are those of the combined load rather than an average. Retry
+and per-endpoint counters are summed per status code and per endpoint. The
+CPU headroom reported is that of the instance with the least left, and
+measurement starts once the last instance has finished its warmup. An
+instance whose metrics can't be merged, e.g. one with another latency bucket
+layout, is counted as down.
+
+Calibration runs on every instance at once, and their ceilings are summed.
+"""
+
+import concurrent.futures
+import json
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from latency import LatencyHistogram
+from retry import RETRY_OUTCOMES
+
+LATENCY_METRIC = "export_latency_seconds"
+TARGET_RATE_METRIC = "target_rate"
+HEADROOM_METRIC = "cpu_headroom"
+MEASURE_FROM_METRIC = "measurement_start_time_seconds"
+# Labelled samples that are summed across instances, by label
+SUMMED_LABELLED_METRICS = RETRY_OUTCOMES + ("endpoint_",)
+CALIBRATED_RATES = (
+    "items_per_second",
+    "batches_per_second",
+    "bytes_per_second",
+    "wire_bytes_per_second",
+)
+
+# Seconds from a start request to the agreed start time of the instances
+START_DELAY = 5.0
+# Timeout of each request to an instance, in seconds
+REQUEST_TIMEOUT = 10.0
+# A scrape of the instances is reused by the reads that follow it for this
+# many seconds, so one /metrics request scrapes each instance once.
+SCRAPE_MAX_AGE = 1.0
+
+
+def split_rate(rate: int, parts: int) -> List[int]:
+    """
+    Split a rate into parts integer shares that differ by at most one.
+    """
+    share, remainder = divmod(rate, parts)
+    return [share + (1 if i < remainder else 0) for i in range(parts)]
+
+
+def parse_metrics(text: str) -> Tuple[Dict[str, float], LatencyHistogram]:
+    """
+    Parse a load generator's /metrics text into its unlabelled samples (and
+    its retry and per-endpoint counters, labelled by status code and
+    endpoint) and its export latency histogram.
+    """
+    lines = [line for line in text.splitlines() if line and line[0] != "#"]
+    samples = {}
+    for line in lines:
+        name, _, value = line.partition(" ")
+        if "{" not in name or name.startswith(SUMMED_LABELLED_METRICS):
+            samples[name] = float(value)
+    return samples, LatencyHistogram.from_prometheus_lines(lines, LATENCY_METRIC)
+
+
+class Coordinator:
+    """
+    Drives a set of load generator instances as a single load generator.
+
+    Attributes:
+        endpoints: Base URLs of the instances, e.g. http://loadgen-1:5001.
+        start_delay: Seconds from a start request to the agreed start time.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[str],
+        start_delay: float = START_DELAY,
+        timeout: float = REQUEST_TIMEOUT,
+    ):
+        if not endpoints:
+            raise ValueError("Coordinator needs at least one load generator")
+        self.endpoints = [e.rstrip("/") for e in endpoints]
+        self.start_delay = start_delay
+        self.timeout = timeout
+        self.executor = concurrent.futures.ThreadPoolExecutor(len(self.endpoints))
+        self._scrape: Optional[tuple] = None
+        self._scraped_at = 0.0
+
+    def _request(
+        self,
+        endpoint: str,
+        path: str,
+        body: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        data = None if body is None else json.dumps(body).encode()
+        req = urllib.request.Request(
+            endpoint + path,
+            data=data,
+            method="GET" if body is None else "POST",
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=timeout or self.timeout) as resp:
+            return resp.read().decode()
+
+    def _each(self, call: Callable[[int, str], str]) -> list:
+        """
+        Run call(index, endpoint) for every instance concurrently, returning
+        each result, or the exception it raised.
+        """
+        futures = [
+            self.executor.submit(call, i, endpoint)
+            for i, endpoint in enumerate(self.endpoints)
+        ]
+        results: List[Union[str, Exception]] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _errors(self, results: list) -> Dict[str, str]:
+        return {
+            endpoint: str(result)
+            for endpoint, result in zip(self.endpoints, results)
+            if isinstance(result, Exception)
+        }
+
+    def start(self, config) -> Tuple[dict, int]:
+        """
+        Start every instance with its share of the configured load, at a
+        common start time. If any instance fails to start, the others are
+        stopped again.
+        Returns a tuple of (response_dict, status_code).
+        """
+        if config.load_profile:
+            return {"error": "load_profile is not supported by the coordinator"}, 400
+        count = len(self.endpoints)
+        rates: List[Optional[int]] = [None] * count
+        if config.target_rate:
+            if config.target_rate < count:
+                return {"error": f"target_rate must be at least {count}"}, 400
+            rates = list(split_rate(config.target_rate, count))
+        start_at = time.time() + self.start_delay
+        params = config.model_dump()
+
+        def start_instance(i: int, endpoint: str) -> str:
+            body = {**params, "target_rate": rates[i], "start_at": start_at}
+            return self._request(endpoint, "/start", body)
+
+        errors = self._errors(self._each(start_instance))
+        if errors:
+            self.stop()
+            return {"error": "Failed to start load generators", **errors}, 502
+        self._scrape = None
+        return {"status": "started", "instances": count, "start_at": start_at}, 200
+
+    def calibrate(self, config, duration: float) -> Tuple[dict, int]:
+        """
+        Calibrate every instance with the full configuration, at the same
+        time, and sum their ceilings.
+        Returns a tuple of (response_dict, status_code).
+        """
+        body = {**config.model_dump(), "duration": duration}
+        timeout = self.timeout + duration
+
+        results = self._each(
+            lambda i, endpoint: self._request(endpoint, "/calibrate", body, timeout)
+        )
+        errors = self._errors(results)
+        if errors:
+            return {"error": "Failed to calibrate load generators", **errors}, 502
+        calibrations = [json.loads(result) for result in results]
+        headrooms = [
+            c[HEADROOM_METRIC] for c in calibrations if c[HEADROOM_METRIC] is not None
+        ]
+        return {
+            "status": "calibrated",
+            "instances": len(calibrations),
+            **{rate: sum(c[rate] for c in calibrations) for rate in CALIBRATED_RATES},
+            "failed": sum(c["failed"] for c in calibrations),
+            HEADROOM_METRIC: min(headrooms, default=None),
+        }, 200
+
+    def stop(self) -> Tuple[dict, int]:
+        """
+        Stop every instance.
+        Returns a tuple of (response_dict, status_code).
+        """
+        results = self._each(lambda i, endpoint: self._request(endpoint, "/stop", {}))
+        errors = self._errors(results)
+        self._scrape = None
+        if errors:
+            return {"status": "stopped", "errors": errors}, 502
+        return {"status": "stopped"}, 200
+
+    def scrape(self) -> tuple:
+        """
+        Scrape and merge the metrics of every instance that answers.
+
+        Returns the summed samples, the merged latency histogram and the
+        number of instances scraped. Instances whose metrics can't be parsed
+        are skipped with a warning.
+        """
+        if self._scrape and time.monotonic() - self._scraped_at < SCRAPE_MAX_AGE:
+            return self._scrape
+        results = self._each(lambda i, endpoint: self._request(endpoint, "/metrics"))
+        totals: Dict[str, float] = {}
+        histograms = []
+        for endpoint, result in zip(self.endpoints, results):
+            if isinstance(result, Exception):
+                continue
+            try:
+                samples, histogram = parse_metrics(result)
+            except ValueError as e:
+                print(f"Skipping the metrics of {endpoint}: {e}")
+                continue
+            for name, value in samples.items():
+                if name == HEADROOM_METRIC:
+                    totals[name] = min(totals.get(name, value), value)
+                elif name == MEASURE_FROM_METRIC:
+                    totals[name] = max(totals.get(name, value), value)
+                else:
+                    totals[name] = totals.get(name, 0) + value
+            histograms.append(histogram)
+        self._scrape = (totals, LatencyHistogram.merged(histograms), len(histograms))
+        self._scraped_at = time.monotonic()
+        return self._scrape
+
+    def get_metrics(self) -> dict:
+        """
+        Get the counters summed over every instance, and the number of
+        instances that answered.
+        """
+        totals, _, up = self.scrape()
+        metrics = {
+            name: int(value) if value.is_integer() else value
+            for name, value in totals.items()
+            if name not in (TARGET_RATE_METRIC, HEADROOM_METRIC, MEASURE_FROM_METRIC)
+            and not name.startswith("export_latency")
+        }
+        metrics["instances_up"] = up
+        return metrics
+
+    def get_latency(self) -> LatencyHistogram:
+        """Merge the export latency histograms of every instance."""
+        return self.scrape()[1]
+
+    def get_cpu_placement(self) -> Dict[int, List[int]]:
+        """
+        CPU placement is per host, so it is read from each instance's own
+        /metrics rather than merged.
+        """
+        return {}
+
+    def get_cpu_usage(self) -> Dict[int, Tuple[float, float]]:
+        """
+        Worker CPU usage is per host, so it is read from each instance's own
+        /metrics rather than merged.
+        """
+        return {}
+
+    def get_endpoint_metrics(self) -> Dict[str, dict]:
+        """
+        Per-endpoint counters are summed by endpoint into get_metrics, as
+        labelled samples.
+        """
+        return {}
+
+    def get_cpu_headroom(self) -> Optional[float]:
+        """Get the lowest CPU headroom of the instances."""
+        return self.scrape()[0].get(HEADROOM_METRIC)
+
+    def get_measure_from(self) -> float:
+        """Get the latest measurement start time of the instances."""
+        return self.scrape()[0].get(MEASURE_FROM_METRIC, 0.0)
+
+    def get_target_rate(self) -> float:
+        """Get the sum of the instances' current target rates."""
+        return self.scrape()[0].get(TARGET_RATE_METRIC, 0.0)
@@ -0,0 +1,377 @@
+"""
+Payload corpus for the load generator.
+
+A corpus is a fixed, bounded set of serialized request payloads that senders
+cycle through round-robin. Batches on the wire are therefore not all
+byte-identical, yet nothing is generated or encoded on the send path.
+
+A corpus is either generated at startup or read from a memory-mapped file of
+length-delimited protobuf messages (a varint length prefix followed by the
+message bytes, as written by protobuf's writeDelimitedTo). Worker processes
+attach to the parent's corpus through shared memory, or by mapping the same
+file, so the corpus is held in memory once regardless of the worker count.
+
+Entries are compressed once, when the corpus is built, so compression is not
+paid again on every send. Each entry records both its uncompressed size and
+its size on the wire.
+"""
+
+import gzip
+import mmap
+import sys
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import zstandard  # type: ignore
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Protobuf wire types
+WIRE_VARINT, WIRE_FIXED64, WIRE_LEN, WIRE_FIXED32 = 0, 1, 2, 5
+
+
+def encode_varint(value: int) -> bytes:
+    """
+    Encode a non-negative integer as a protobuf base-128 varint.
+    """
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def decode_varint(buf, pos: int) -> Tuple[int, int]:
+    """
+    Decode a protobuf varint from buf at pos, returning (value, next_pos).
+    """
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(buf):
+            raise ValueError("Truncated varint")
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def iter_length_delimited(buf) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the (start, end) offsets of each length-delimited message in buf.
+    """
+    pos = 0
+    while pos < len(buf):
+        length, start = decode_varint(buf, pos)
+        end = start + length
+        if end > len(buf):
+            raise ValueError(f"Truncated message at offset {pos}")
+        yield start, end
+        pos = end
+
+
+def iter_fields(buf, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Yield (field number, wire type, value start, value end) for each field of
+    the message serialized in buf[start:end].
+    """
+    pos = start
+    while pos < end:
+        key, pos = decode_varint(buf, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == WIRE_VARINT:
+            _, value_end = decode_varint(buf, pos)
+        elif wire_type == WIRE_FIXED64:
+            value_end = pos + 8
+        elif wire_type == WIRE_LEN:
+            length, pos = decode_varint(buf, pos)
+            value_end = pos + length
+        elif wire_type == WIRE_FIXED32:
+            value_end = pos + 4
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type} at offset {pos}")
+        if value_end > end:
+            raise ValueError(f"Truncated field {field} at offset {pos}")
+        yield field, wire_type, pos, value_end
+        pos = value_end
+
+
+def compress(payload: bytes, compression: str) -> bytes:
+    """
+    Compress a payload with 'gzip' or 'zstd', or return it as-is for 'none'.
+
+    Levels match the defaults of the Go gzip and zstd encoders used by
+    collectors and agents.
+    """
+    if compression == "gzip":
+        return gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return bytes(payload)
+
+
+def write_length_delimited(path: str, payloads: Sequence[bytes]) -> None:
+    """
+    Write serialized messages to path in length-delimited form.
+    """
+    with open(path, "wb") as f:
+        for payload in payloads:
+            f.write(encode_varint(len(payload)))
+            f.write(payload)
+
+
+@dataclass(frozen=True)
+class CorpusHandle:
+    """
+    Picklable reference used to attach to a corpus from another process.
+
+    Attributes:
+        offsets: (start, end) of each payload within the backing buffer.
+        item_counts: Number of telemetry items (e.g. log records) per payload.
+        shm_name: Name of the shared memory block holding generated payloads.
+        path: Path of the file backing a memory-mapped corpus.
+        raw_sizes: Uncompressed size of each payload.
+        wire_sizes: Size of each payload on the wire.
+    """
+
+    offsets: Tuple[Tuple[int, int], ...]
+    item_counts: Tuple[int, ...]
+    shm_name: Optional[str] = None
+    path: Optional[str] = None
+    raw_sizes: Optional[Tuple[int, ...]] = None
+    wire_sizes: Optional[Tuple[int, ...]] = None
+
+
+class PayloadCorpus:
+    """
+    A read-only set of serialized payloads with per-payload item counts.
+
+    Payloads are bytes when the corpus was generated in this process, and
+    memoryviews over the backing buffer when it is memory-mapped from a file
+    or attached from shared memory. bytes_backed tells senders whether a
+    payload can be handed to APIs that only accept bytes without a copy.
+
+    raw_sizes and wire_sizes default to the payload lengths. They differ when
+    payloads are stored compressed, or are compressed by the transport.
+    """
+
+    def __init__(
+        self,
+        payloads: Sequence,
+        item_counts: Sequence[int],
+        path: Optional[str] = None,
+        raw_sizes: Optional[Sequence[int]] = None,
+        wire_sizes: Optional[Sequence[int]] = None,
+    ):
+        if not payloads:
+            raise ValueError("Corpus must contain at least one payload")
+        if len(payloads) != len(item_counts):
+            raise ValueError("Corpus payloads and item counts differ in length")
+        self.payloads: List = list(payloads)
+        self.item_counts: List[int] = list(item_counts)
+        sizes = [len(p) for p in self.payloads]
+        self.raw_sizes: List[int] = list(raw_sizes) if raw_sizes else sizes
+        self.wire_sizes: List[int] = list(wire_sizes) if wire_sizes else sizes
+        self.bytes_backed = all(type(p) is bytes for p in self.payloads)
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._owns_shm = False
+        self._offsets: Optional[Tuple[Tuple[int, int], ...]] = None
+        self._handle: Optional[CorpusHandle] = None
+
+    @classmethod
+    def generate(
+        cls,
+        size: int,
+        build: Callable[[int], Union[Tuple[bytes, int], Tuple[bytes, int, int, int]]],
+    ) -> "PayloadCorpus":
+        """
+        Generate a corpus of size payloads.
+
+        Args:
+            size: Number of distinct payloads to generate.
+            build: Called with the payload index, returns the serialized
+                payload and the number of items it contains, optionally
+                followed by its uncompressed and wire sizes.
+        """
+        payloads = []
+        item_counts = []
+        raw_sizes = []
+        wire_sizes = []
+        for i in range(size):
+            built = build(i)
+            payload, items = built[0], built[1]
+            if len(built) == 4:
+                raw_size, wire_size = built[2], built[3]
+            else:
+                raw_size = wire_size = len(payload)
+            payloads.append(payload)
+            item_counts.append(items)
+            raw_sizes.append(raw_size)
+            wire_sizes.append(wire_size)
+        return cls(payloads, item_counts, raw_sizes=raw_sizes, wire_sizes=wire_sizes)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        count_items: Optional[Callable[[memoryview], int]] = None,
+        offsets: Optional[Sequence[Tuple[int, int]]] = None,
+        item_counts: Optional[Sequence[int]] = None,
+        raw_sizes: Optional[Sequence[int]] = None,
+        wire_sizes: Optional[Sequence[int]] = None,
+    ) -> "PayloadCorpus":
+        """
+        Memory-map a file of length-delimited messages as a corpus.
+
+        Args:
+            path: File written in length-delimited form.
+            count_items: Returns the number of items in a payload. Only called
+                when item_counts is not supplied, once per payload at load.
+            offsets: Precomputed payload offsets, skipping the file scan.
+            item_counts: Precomputed item counts matching offsets.
+            raw_sizes: Uncompressed payload sizes, when not the file's.
+            wire_sizes: Wire payload sizes, when not the file's.
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        if offsets is None:
+            offsets = list(iter_length_delimited(view))
+        payloads = [view[start:end] for start, end in offsets]
+        if item_counts is None:
+            if count_items is None:
+                raise ValueError("Either count_items or item_counts is required")
+            item_counts = [count_items(payload) for payload in payloads]
+        corpus = cls(
+            payloads,
+            item_counts,
+            path=path,
+            raw_sizes=raw_sizes,
+            wire_sizes=wire_sizes,
+        )
+        corpus._mmap = mapped
+        corpus._offsets = tuple((start, end) for start, end in offsets)
+        view.release()
+        return corpus
+
+    @classmethod
+    def attach(cls, handle: CorpusHandle) -> "PayloadCorpus":
+        """
+        Attach to a corpus shared by another process.
+        """
+        if handle.path is not None:
+            return cls.from_file(
+                handle.path,
+                offsets=handle.offsets,
+                item_counts=handle.item_counts,
+                raw_sizes=handle.raw_sizes,
+                wire_sizes=handle.wire_sizes,
+            )
+        # The creating process owns the block and is responsible for
+        # unlinking it, so don't register it with this process's tracker.
+        # Before Python 3.13 attaching always registers it, which is harmless
+        # in worker processes: they share their parent's resource tracker,
+        # which only unlinks the block once.
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=handle.shm_name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=handle.shm_name)
+        buf = shm.buf
+        assert buf is not None  # only None once closed
+        payloads = [buf[start:end] for start, end in handle.offsets]
+        corpus = cls(
+            payloads,
+            handle.item_counts,
+            raw_sizes=handle.raw_sizes,
+            wire_sizes=handle.wire_sizes,
+        )
+        corpus._shm = shm
+        corpus._handle = handle
+        return corpus
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def __getitem__(self, index: int):
+        return self.payloads[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of all payloads in bytes."""
+        return sum(len(p) for p in self.payloads)
+
+    def share(self) -> CorpusHandle:
+        """
+        Return a handle other processes can attach to.
+
+        Generated corpora are moved into a shared memory block, which lives
+        until close() is called on this corpus. The corpus then serves its
+        payloads from that block so it is not held in memory twice.
+        """
+        if self._handle is not None:
+            return self._handle
+        if self._offsets is not None:
+            # Memory-mapped corpora are shared by mapping the same file.
+            return CorpusHandle(
+                offsets=self._offsets,
+                item_counts=tuple(self.item_counts),
+                path=self.path,
+                raw_sizes=tuple(self.raw_sizes),
+                wire_sizes=tuple(self.wire_sizes),
+            )
+
+        offsets = []
+        pos = 0
+        for payload in self.payloads:
+            offsets.append((pos, pos + len(payload)))
+            pos += len(payload)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(pos, 1))
+        buf = shm.buf
+        assert buf is not None  # only None once closed
+        for payload, (start, end) in zip(self.payloads, offsets):
+            buf[start:end] = payload
+        self._shm = shm
+        self._owns_shm = True
+        self.payloads = [buf[start:end] for start, end in offsets]
+        self.bytes_backed = False
+        self._handle = CorpusHandle(
+            offsets=tuple(offsets),
+            item_counts=tuple(self.item_counts),
+            shm_name=shm.name,
+            raw_sizes=tuple(self.raw_sizes),
+            wire_sizes=tuple(self.wire_sizes),
+        )
+        return self._handle
+
+    def close(self) -> None:
+        """
+        Release any memory map or shared memory backing the corpus.
+        """
+        if self._mmap is None and self._shm is None:
+            return
+        # Views must be released before the underlying buffer is closed.
+        for payload in self.payloads:
+            if isinstance(payload, memoryview):
+                payload.release()
+        self.payloads = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._offsets = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._owns_shm:
+                self._shm.unlink()
+            self._shm = None
+        self._handle = None
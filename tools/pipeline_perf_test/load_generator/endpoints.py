@@ -0,0 +1,105 @@
+"""
+Client-side load balancing of OTLP exports across several endpoints.
+
+A load generator can send to a list of endpoints rather than one, e.g. the
+replicas of a horizontally scaled collector, or the per-core listeners of a
+multi-core engine, so the scale-out of the pipeline can be measured from a
+single load generator. Each worker spreads its exports over the endpoints
+with one of these policies:
+
+- round_robin: every worker holds a connection to every endpoint and sends
+    each batch to the next one in turn, starting from a different endpoint
+    per worker.
+- least_outstanding: every worker holds a connection to every endpoint and
+    sends each batch to the endpoint with the fewest exports in flight from
+    the load generator's process, so a slower endpoint gets less of the load.
+- hash: every worker sticks to one endpoint, chosen from its worker id, as
+    a balancer hashing each client connection would.
+"""
+
+import threading
+from typing import List, Optional
+
+ENDPOINT_POLICIES = ("round_robin", "least_outstanding", "hash")
+# Most endpoints a run can spread its load over
+MAX_ENDPOINTS = 64
+
+
+def parse_endpoints(spec: str) -> List[str]:
+    """
+    Split a comma separated list of endpoints, ignoring blank entries.
+    """
+    endpoints = [endpoint.strip() for endpoint in spec.split(",") if endpoint.strip()]
+    if not endpoints:
+        raise ValueError(f"No endpoints in '{spec}'")
+    if len(endpoints) > MAX_ENDPOINTS:
+        raise ValueError(f"At most {MAX_ENDPOINTS} endpoints are supported")
+    return endpoints
+
+
+class EndpointBalancer:
+    """
+    Picks the endpoint of each export of one worker.
+
+    Attributes:
+        count: Number of endpoints.
+        policy: One of ENDPOINT_POLICIES.
+        outstanding: Exports in flight to each endpoint, shared by the
+            balancers of every worker in the process. Only counted by the
+            least_outstanding policy.
+        lock: Guards outstanding, shared along with it.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        policy: str = "round_robin",
+        worker_id: int = 0,
+        outstanding: Optional[List[int]] = None,
+        lock: Optional[threading.Lock] = None,
+    ):
+        if policy not in ENDPOINT_POLICIES:
+            raise ValueError(
+                f"Unknown endpoint policy '{policy}', expected one of "
+                f"{ENDPOINT_POLICIES}"
+            )
+        self.count = count
+        self.policy = policy
+        self.outstanding = outstanding if outstanding is not None else [0] * count
+        self.lock = lock or threading.Lock()
+        # Workers start (and break ties) at different endpoints, so they
+        # don't all send to the same one at once.
+        self.next = worker_id % count
+
+    def candidates(self) -> List[int]:
+        """Return the indexes of the endpoints this worker may send to."""
+        if self.policy == "hash":
+            return [self.next]
+        return list(range(self.count))
+
+    def acquire(self) -> int:
+        """
+        Pick the endpoint of the next export and count it as in flight until
+        release is called.
+        """
+        start = self.next
+        if self.policy == "hash":
+            return start
+        self.next = (start + 1) % self.count
+        if self.policy == "round_robin":
+            return start
+        outstanding = self.outstanding
+        target = start
+        with self.lock:
+            for offset in range(1, self.count):
+                candidate = (start + offset) % self.count
+                if outstanding[candidate] < outstanding[target]:
+                    target = candidate
+            outstanding[target] += 1
+        return target
+
+    def release(self, target: int) -> None:
+        """Count an export to target as no longer in flight."""
+        if self.policy == "least_outstanding":
+            with self.lock:
+                self.outstanding[target] -= 1
@@ -0,0 +1,135 @@
+"""
+Export latency histograms for the load generator.
+
+Latencies are counted in fixed log-scale buckets, four per power of two from
+10us to about 170s, so a quantile read from the histogram is off by at most
+one bucket width (19%). Recording is a bisect and two additions. Every worker
+records into a histogram of its own, without locking, and the histograms are
+merged when read, by adding their bucket counts.
+"""
+
+import bisect
+from typing import Iterable, List
+
+# Upper bounds, in seconds, of the finite buckets. The last bucket counts
+# every latency above LATENCY_BOUNDS[-1].
+LATENCY_BOUNDS = tuple(1e-5 * 2 ** (i / 4) for i in range(97))
+NUM_BUCKETS = len(LATENCY_BOUNDS) + 1
+
+# Quantiles reported alongside the buckets, keyed by their metric suffix
+LATENCY_QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+
+class LatencyHistogram:
+    """
+    A mergeable histogram of request latencies in seconds.
+
+    Each histogram must only be written by one thread. Readers see a slightly
+    stale but usable view, since counts only ever grow.
+    """
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * NUM_BUCKETS
+        self.sum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Count one request that took seconds to complete."""
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS, seconds)] += 1
+        self.sum += seconds
+
+    def add(self, other: "LatencyHistogram") -> None:
+        """Add the counts of another histogram to this one."""
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+
+    def subtract(self, other: "LatencyHistogram") -> None:
+        """
+        Remove the counts of another histogram from this one, e.g. those of
+        an earlier snapshot of the same histograms.
+        """
+        for i, count in enumerate(other.counts):
+            self.counts[i] -= count
+        self.sum -= other.sum
+
+    @classmethod
+    def merged(cls, histograms: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        """Return a new histogram holding the sum of the given histograms."""
+        total = cls()
+        for histogram in histograms:
+            total.add(histogram)
+        return total
+
+    @classmethod
+    def from_prometheus_lines(
+        cls, lines: Iterable[str], name: str
+    ) -> "LatencyHistogram":
+        """
+        Rebuild a histogram rendered by prometheus_lines, e.g. one scraped
+        from another load generator's /metrics.
+        """
+        histogram = cls()
+        buckets = []
+        for line in lines:
+            key, _, value = line.rpartition(" ")
+            if key.startswith(f"{name}_bucket{{"):
+                buckets.append(int(float(value)))
+            elif key == f"{name}_sum":
+                histogram.sum = float(value)
+        if len(buckets) != NUM_BUCKETS:
+            raise ValueError(
+                f"Expected {NUM_BUCKETS} '{name}' buckets, found {len(buckets)}"
+            )
+        # Buckets are cumulative
+        for i, cumulative in enumerate(buckets):
+            histogram.counts[i] = cumulative - (buckets[i - 1] if i else 0)
+        return histogram
+
+    @property
+    def count(self) -> int:
+        """Number of recorded requests."""
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-quantile (0 <= q <= 1), interpolating linearly within
+        the bucket it falls in. Returns 0.0 for an empty histogram.
+        """
+        total = self.count
+        if not total:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = LATENCY_BOUNDS[i - 1] if i else 0.0
+                # Overflows are reported at the largest finite bound.
+                upper = LATENCY_BOUNDS[min(i, len(LATENCY_BOUNDS) - 1)]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return LATENCY_BOUNDS[-1]
+
+    def prometheus_lines(self, name: str, help_text: str = "") -> List[str]:
+        """
+        Render the histogram in the Prometheus text exposition format, with
+        cumulative buckets, followed by a gauge per LATENCY_QUANTILES entry.
+        """
+        lines = [
+            f"# HELP {name} {help_text or name}",
+            f"# TYPE {name} histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(LATENCY_BOUNDS, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound:.6g}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {cumulative}")
+        base = name.removesuffix("_seconds")
+        for suffix, q in LATENCY_QUANTILES.items():
+            lines.append(f"# TYPE {base}_{suffix}_seconds gauge")
+            lines.append(f"{base}_{suffix}_seconds {self.quantile(q)}")
+        return lines
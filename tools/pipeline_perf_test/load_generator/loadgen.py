@@ -2,17 +2,21 @@
 OTLP Logs Load Generator
 
 This module implements a configurable load generator for OpenTelemetry
-Protocol (OTLP) logs. It supports generating batches of randomized log records
-with customizable sizes and attributes, and sending them concurrently to an
-OTLP collector endpoint over gRPC.
+Protocol (OTLP) logs, traces and metrics, OTAP (OTel Arrow) logs and syslog.
+It supports generating batches of randomized telemetry with customizable
+sizes and attributes, and sending them concurrently to an OTLP collector
+endpoint over gRPC or OTLP/HTTP. See readme.md for a description of every
+feature.
 
 Features:
-- Generates OTLP log records with random content for testing or benchmarking.
-- Runs multiple worker threads to simulate concurrent load.
+- Generates OTLP logs, traces and metrics, OTAP logs or syslog messages.
+- Sends pre-serialized batches from a bounded corpus, or replays a recording.
+- Runs multiple worker threads or processes to simulate concurrent load.
 - Supports shared or dedicated TCP connection per-worker thread.
-- Supports optional rate targeting for message throughput (or max achievable).
-- Provides a Flask-based HTTP API to start, stop, and monitor the load
-    generator.
+- Supports optional rate targeting for message throughput (or max achievable),
+    closed or open loop, and time-varying load profiles.
+- Provides a Flask-based HTTP API to start, stop, calibrate and monitor the
+    load generator, and can coordinate several instances as one.
 - Can run either as a one-off command line tool or as a long-running server.
 - Handles graceful shutdown on system signals.
 
@@ -20,7 +24,7 @@ Usage:
 - As a command-line tool: run with desired parameters for batch size, threads,
     duration, etc.
 - As a server: start with --serve flag and control load generation via HTTP
-    endpoints (/start, /stop, /metrics).
+    endpoints (/start, /stop, /calibrate, /metrics).
 
 Examples:
   Standalone OTLP load generation:
@@ -42,18 +46,28 @@ Examples:
 Endpoints:
 - POST /start: Start load generation with specified parameters in JSON.
 - POST /stop: Stop the load generation.
-- GET /metrics: Retrieve current load generation metrics (logs sent, failed,
-    bytes sent).
+- POST /calibrate: Measure the load generator's ceiling against a null sink.
+- GET /metrics: Retrieve current load generation metrics in Prometheus text
+    format.
 
 Environment Variables:
-- OTLP_ENDPOINT: Target OTLP gRPC endpoint (default: localhost:4317).
+- OTLP_ENDPOINT: Target OTLP gRPC endpoint, or comma separated endpoints
+    (default: localhost:4317).
+- OTLP_HTTP_ENDPOINT: Target OTLP/HTTP base URL, or comma separated URLs
+    (default: http://localhost:4318).
 - SYSLOG_SERVER: Target syslog server hostname/IP (default: localhost).
 - SYSLOG_PORT: Target syslog server port (default: 514).
 - SYSLOG_TRANSPORT: Transport protocol for syslog: 'tcp' or 'udp' (default: udp).
 """
 
 import argparse
+import asyncio
+import bisect
 import concurrent.futures
+import ctypes
+import functools
+import itertools
+import multiprocessing
 import os
 import random
 import signal
@@ -63,22 +77,160 @@ import sys
 import threading
 import time
 from datetime import datetime as dt, timezone
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import grpc  # type: ignore
 from flask import Flask, jsonify, request
-from opentelemetry.proto.collector.logs.v1 import (
-    logs_service_pb2_grpc,
-    logs_service_pb2,
-)
+from opentelemetry.proto.collector.logs.v1 import logs_service_pb2
+from opentelemetry.proto.collector.metrics.v1 import metrics_service_pb2
+from opentelemetry.proto.collector.trace.v1 import trace_service_pb2
 from opentelemetry.proto.logs.v1 import logs_pb2
 from opentelemetry.proto.common.v1 import common_pb2
-from pydantic import BaseModel, Field, field_validator, ValidationError
-
+from opentelemetry.proto.metrics.v1 import metrics_pb2
+from opentelemetry.proto.trace.v1 import trace_pb2
+from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import ValidationError
+
+import otap
+import otlp_http
+from coordinator import START_DELAY, Coordinator
+from corpus import CorpusHandle, PayloadCorpus, compress
+from endpoints import (
+    ENDPOINT_POLICIES,
+    MAX_ENDPOINTS,
+    EndpointBalancer,
+    parse_endpoints,
+)
+from latency import LATENCY_BOUNDS, LATENCY_QUANTILES, NUM_BUCKETS, LatencyHistogram
+from null_sink import NullSink
+from pacing import ARRIVAL_PROCESSES, PACING_MODES, IntervalSchedule, Pacer
+from profiles import parse_load_profile
+from replay import LATE_TOLERANCE, Recording, read_recording
+from retry import (
+    RETRIED,
+    RETRIES_PER_BATCH,
+    RETRY_OUTCOMES,
+    RETRY_STATUS_CODES,
+    PendingRetry,
+    RetryQueue,
+    classify_error,
+)
+from shapes import load_data_shape, shape_pools
+from syslog_sender import (
+    SYSLOG_FORMATS,
+    SYSLOG_FRAMINGS,
+    DatagramSender,
+    frame,
+    syslog_header,
+)
+from timestamps import (
+    LOG_TIMESTAMP_FIELDS,
+    METRIC_TIMESTAMP_FIELDS,
+    TRACE_TIMESTAMP_FIELDS,
+    Restamper,
+    find_timestamps,
+    latest_timestamp,
+)
 
 FLASK_PORT = 5001
 LOG_SEVERITY_NUMBER = logs_pb2.SeverityNumber.SEVERITY_NUMBER_INFO
 LOG_SEVERITY_TEXT = "INFO"
+COUNTER_NAMES: Tuple[str, ...] = (
+    "sent",
+    "failed",
+    "bytes_sent",
+    "wire_bytes_sent",
+    "late_batches",
+)
+# Index of each counter within a worker's counter slot
+SENT, FAILED, BYTES_SENT, WIRE_BYTES_SENT, LATE_BATCHES = range(len(COUNTER_NAMES))
+# Index of the counter of each (retry outcome, status code), in worker slots
+# after the counters above. They count batches, named as Prometheus samples.
+RETRY_COUNTERS = {
+    key: len(COUNTER_NAMES) + i
+    for i, key in enumerate(itertools.product(RETRY_OUTCOMES, RETRY_STATUS_CODES))
+}
+RETRY_COUNTER_NAMES = tuple(
+    f'{outcome}{{code="{code}"}}' for outcome, code in RETRY_COUNTERS
+)
+COUNTER_NAMES += RETRY_COUNTER_NAMES
+# Counters of the load sent during the warmup of a run, reported apart
+WARMUP_COUNTER_NAMES = tuple(f"warmup_{name}" for name in COUNTER_NAMES[:5])
+# Base index of each per-endpoint counter in worker slots, after the counters
+# above, followed by one counter per endpoint of the run: items sent and
+# failed, and the number and total latency (in microseconds) of successful
+# exports.
+ENDPOINT_COUNTER_KINDS = ("sent", "failed", "requests", "latency_us")
+ENDPOINT_SENT, ENDPOINT_FAILED, ENDPOINT_REQUESTS, ENDPOINT_LATENCY_US = (
+    len(COUNTER_NAMES) + i * MAX_ENDPOINTS for i in range(len(ENDPOINT_COUNTER_KINDS))
+)
+ENDPOINT_COUNTER_NAMES = tuple(
+    f'endpoint_{kind}{{endpoint="{i}"}}'
+    for kind in ENDPOINT_COUNTER_KINDS
+    for i in range(MAX_ENDPOINTS)
+)
+COUNTER_NAMES += ENDPOINT_COUNTER_NAMES
+# Seconds an OTAP stream waits for outstanding acks after the run is stopped.
+OTAP_DRAIN_TIMEOUT = 5.0
+# gRPC Export method and response type for each OTLP load type.
+OTLP_EXPORT_METHODS: Dict[str, Tuple[str, Any]] = {
+    "otlp": (
+        "/opentelemetry.proto.collector.logs.v1.LogsService/Export",
+        logs_service_pb2.ExportLogsServiceResponse,
+    ),
+    "traces": (
+        "/opentelemetry.proto.collector.trace.v1.TraceService/Export",
+        trace_service_pb2.ExportTraceServiceResponse,
+    ),
+    "metrics": (
+        "/opentelemetry.proto.collector.metrics.v1.MetricsService/Export",
+        metrics_service_pb2.ExportMetricsServiceResponse,
+    ),
+    "replay": (
+        "/opentelemetry.proto.collector.logs.v1.LogsService/Export",
+        logs_service_pb2.ExportLogsServiceResponse,
+    ),
+}
+# Export request message of each OTLP load type
+OTLP_REQUEST_TYPES: Dict[str, Any] = {
+    "otlp": logs_service_pb2.ExportLogsServiceRequest,
+    "traces": trace_service_pb2.ExportTraceServiceRequest,
+    "metrics": metrics_service_pb2.ExportMetricsServiceRequest,
+    "replay": logs_service_pb2.ExportLogsServiceRequest,
+}
+# Where the timestamps of each load type's serialized requests are
+OTLP_TIMESTAMP_FIELDS = {
+    "otlp": LOG_TIMESTAMP_FIELDS,
+    "traces": TRACE_TIMESTAMP_FIELDS,
+    "metrics": METRIC_TIMESTAMP_FIELDS,
+    "replay": LOG_TIMESTAMP_FIELDS,
+}
+METRIC_TYPES = ("gauge", "sum", "histogram", "exponential_histogram")
+# Explicit bucket bounds of generated histograms, shaped like a latency in ms.
+HISTOGRAM_BOUNDS = (5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+EXPONENTIAL_HISTOGRAM_SCALE = 3
+EXPONENTIAL_HISTOGRAM_BUCKETS = 16
+SPAN_NAMES = (
+    "GET /api/users",
+    "POST /api/orders",
+    "SELECT orders",
+    "cache.get",
+    "publish events",
+    "render template",
+)
+ALPHANUMERIC = (string.ascii_letters + string.digits).encode("ascii")
+# Maps every byte value onto the alphabet so random bytes can be turned into
+# alphanumeric text with a single bytes.translate call. The 256 % 62 leftover
+# values slightly favour the first few letters, which is fine for load data.
+ALPHANUMERIC_TABLE = bytes(ALPHANUMERIC[i % len(ALPHANUMERIC)] for i in range(256))
+# Number of CPUs whose placement worker processes can report
+NUM_CPUS = os.cpu_count() or 1
+# Seconds between the CPU time samples worker processes publish
+CPU_SAMPLE_INTERVAL = 0.5
+# Load types whose ceiling calibrate can measure against a NullSink
+CALIBRATION_LOAD_TYPES = ("otlp", "traces", "metrics")
+# Default length of a calibration run, in seconds
+CALIBRATION_SECONDS = 10.0
 
 
 app = Flask(__name__)
@@ -86,22 +238,218 @@ app = Flask(__name__)
 
 class LoadGenConfig(BaseModel):
     body_size: int = Field(
-        25, gt=0, description="Size of log message body in characters"
+        default=25, gt=0, description="Size of log message body in characters"
+    )
+    num_attributes: int = Field(
+        default=2,
+        gt=0,
+        description="Number of attributes per log record, span or series",
     )
-    num_attributes: int = Field(2, gt=0, description="Number of attributes per log")
     attribute_value_size: int = Field(
-        15, gt=0, description="Size of attribute values in characters"
+        default=15, gt=0, description="Size of attribute values in characters"
+    )
+    batch_size: int = Field(
+        default=5000,
+        gt=0,
+        description="Number of logs (or spans, data points) per batch",
     )
-    batch_size: int = Field(5000, gt=0, description="Number of logs per batch")
-    threads: int = Field(4, gt=0, description="Number of worker threads to run")
+    threads: int = Field(default=4, gt=0, description="Number of worker threads to run")
     target_rate: Optional[int] = Field(
-        None, gt=0, description="Optional target messages per second"
+        default=None, gt=0, description="Optional target messages per second"
     )
     tcp_connection_per_thread: bool = Field(
-        True, description="Use a dedicated TCP connection per-thread"
+        default=True, description="Use a dedicated TCP connection per-thread"
+    )
+    fresh_timestamps: bool = Field(
+        default=True,
+        description=(
+            "Move the timestamps of every OTLP batch so its latest is the time "
+            "it is sent, rather than sending the time the batch was built, at "
+            "the cost of a copy of the batch per send. Payloads stored "
+            "encoded (otap, or JSON or compressed otlp_http bodies) keep their "
+            "build time"
+        ),
     )
     load_type: str = Field(
-        "otlp", description="Load generation type: 'otlp' or 'syslog'"
+        default="otlp",
+        description=(
+            "Load generation type: 'otlp', 'traces', 'metrics', 'otap', "
+            "'replay' or 'syslog'"
+        ),
+    )
+    workers: str = Field(
+        default="threads",
+        description="Worker execution model: 'threads' or 'processes'",
+    )
+    sender: str = Field(
+        default="sync", description="OTLP sender implementation: 'sync' or 'async'"
+    )
+    max_in_flight: int = Field(
+        default=1,
+        gt=0,
+        description=(
+            "Maximum outstanding Export calls per connection (async sender), "
+            "or unacknowledged batches per stream (otap)"
+        ),
+    )
+    corpus_size: int = Field(
+        default=1, gt=0, description="Number of distinct batches senders cycle through"
+    )
+    transport: str = Field(
+        default="grpc", description="OTLP transport: 'grpc' or 'otlp_http'"
+    )
+    endpoints: Optional[str] = Field(
+        default=None,
+        description=(
+            "Optional comma separated OTLP endpoints to spread the load over "
+            "(host:port for grpc, base URLs for otlp_http), instead of "
+            "OTLP_ENDPOINT or OTLP_HTTP_ENDPOINT, which can also be lists"
+        ),
+    )
+    endpoint_policy: str = Field(
+        default="round_robin",
+        description=(
+            "How workers spread exports over the endpoints: 'round_robin', "
+            "'least_outstanding' or 'hash' (one endpoint per worker)"
+        ),
+    )
+    http_encoding: str = Field(
+        default="protobuf", description="OTLP/HTTP body encoding: 'protobuf' or 'json'"
+    )
+    compression: str = Field(
+        default="none",
+        description=(
+            "Payload compression: 'none', 'gzip' or 'zstd' (otlp_http bodies, "
+            "or Arrow IPC buffers for otap). gzip over gRPC is applied by the "
+            "channel on every send, and its wire bytes are estimated"
+        ),
+    )
+    corpus_path: Optional[str] = Field(
+        default=None,
+        description=(
+            "Optional file of length-delimited OTLP Export requests (matching "
+            "load_type) to memory-map as the corpus instead of generating one. "
+            "For 'replay', the recording of ExportLogsServiceRequest messages, "
+            "length-delimited or as OTLP JSON lines"
+        ),
+    )
+    replay_speed: float = Field(
+        default=1.0,
+        gt=0,
+        description=(
+            "Speed of a 'replay' relative to the recording's original timing, "
+            "e.g. 2 to replay twice as fast"
+        ),
+    )
+    spans_per_trace: int = Field(
+        default=10, gt=0, description="Number of spans in each generated trace"
+    )
+    trace_depth: int = Field(
+        default=3, gt=0, description="Maximum depth of the generated span trees"
+    )
+    span_events: int = Field(default=0, ge=0, description="Number of events per span")
+    span_links: int = Field(default=0, ge=0, description="Number of links per span")
+    data_shape: Optional[str] = Field(
+        default=None,
+        description=(
+            "Optional shape of generated log batches, overriding body_size, "
+            "num_attributes and attribute_value_size: a preset ('k8s', 'wide' "
+            "or 'structured'), inline JSON or a JSON file"
+        ),
+    )
+    metric_mix: str = Field(
+        default="gauge=1,sum=1,histogram=1,exponential_histogram=1",
+        description=(
+            "Relative weights of the metric types, as comma separated "
+            "type=weight pairs"
+        ),
+    )
+    metric_series: int = Field(
+        default=100, gt=0, description="Number of distinct metric series (cardinality)"
+    )
+    points_per_series: int = Field(
+        default=1, gt=0, description="Number of data points per series in each batch"
+    )
+    pacing: str = Field(
+        default="closed",
+        description=(
+            "Rate pacing: 'closed' (each send waits for the previous one) or "
+            "'open' (fixed arrival schedule, latency from intended send time)"
+        ),
+    )
+    arrivals: str = Field(
+        default="uniform",
+        description="Open-loop arrival process: 'uniform' or 'poisson'",
+    )
+    load_profile: Optional[str] = Field(
+        default=None,
+        description=(
+            "Optional time-varying target rate, overriding target_rate: "
+            "'ramp:from=,to=,over=', 'steps:start=,step=,every=,count=', "
+            "'spike:base=,peak=,every=,for=' or 'csv:path=,scale=,speed='"
+        ),
+    )
+    syslog_format: str = Field(
+        default="rfc3164", description="Syslog message format: 'rfc3164' or 'rfc5424'"
+    )
+    syslog_framing: str = Field(
+        default="newline",
+        description=(
+            "Syslog TCP framing: 'newline' or 'octet' (octet counting). UDP "
+            "datagrams are sent unframed with 'octet'"
+        ),
+    )
+    syslog_send_buffer: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Optional SO_SNDBUF size in bytes for syslog sockets",
+    )
+    cpu_affinity: Optional[str] = Field(
+        default=None,
+        description=(
+            "Optional CPUs to pin the workers to, as a list of CPUs and ranges "
+            "such as '2-5,8'. Workers get dedicated CPUs when there are at "
+            "least as many CPUs as workers, and share them round-robin otherwise"
+        ),
+    )
+    retry_on_failure: bool = Field(
+        default=False,
+        description=(
+            "Retry batches rejected with a retryable status (e.g. UNAVAILABLE, "
+            "RESOURCE_EXHAUSTED, HTTP 429 or 503) from a bounded per-worker "
+            "queue with exponential backoff, like the collector's exporters"
+        ),
+    )
+    retry_queue_size: int = Field(
+        default=100, gt=0, description="Batches each worker holds for retry"
+    )
+    retry_initial_interval: float = Field(
+        default=5.0, gt=0, description="Seconds before the first retry of a batch"
+    )
+    retry_max_interval: float = Field(
+        default=30.0, gt=0, description="Upper bound on the backoff between retries"
+    )
+    retry_max_elapsed_time: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds after its first failure a batch is dropped",
+    )
+    warmup_seconds: float = Field(
+        default=0.0,
+        ge=0,
+        description=(
+            "Seconds at the start of the run whose load is counted in separate "
+            "warmup counters, with the counters and latency histograms starting "
+            "clean after them"
+        ),
+    )
+    start_at: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Optional Unix time to start sending at, so that load generators "
+            "started by a coordinator begin together"
+        ),
     )
 
     @field_validator(
@@ -115,11 +463,646 @@ class LoadGenConfig(BaseModel):
 
     @field_validator("load_type")
     def validate_load_type(cls, v):
-        """Ensure load_type is either 'otlp' or 'syslog'."""
-        if v.lower() not in ["otlp", "syslog"]:
-            raise ValueError("load_type must be 'otlp' or 'syslog'")
+        """Ensure load_type is one of 'otlp', 'traces', 'metrics', 'otap',
+        'replay' or 'syslog'."""
+        if v.lower() not in ["otlp", "traces", "metrics", "otap", "replay", "syslog"]:
+            raise ValueError(
+                "load_type must be 'otlp', 'traces', 'metrics', 'otap', 'replay' "
+                "or 'syslog'"
+            )
+        return v.lower()
+
+    @field_validator("workers")
+    def validate_workers(cls, v):
+        """Ensure workers is either 'threads' or 'processes'."""
+        if v.lower() not in ["threads", "processes"]:
+            raise ValueError("workers must be 'threads' or 'processes'")
+        return v.lower()
+
+    @field_validator("sender")
+    def validate_sender(cls, v):
+        """Ensure sender is either 'sync' or 'async'."""
+        if v.lower() not in ["sync", "async"]:
+            raise ValueError("sender must be 'sync' or 'async'")
+        return v.lower()
+
+    @field_validator("transport")
+    def validate_transport(cls, v):
+        """Ensure transport is either 'grpc' or 'otlp_http'."""
+        if v.lower() not in ["grpc", "otlp_http"]:
+            raise ValueError("transport must be 'grpc' or 'otlp_http'")
+        return v.lower()
+
+    @field_validator("http_encoding")
+    def validate_http_encoding(cls, v):
+        """Ensure http_encoding is either 'protobuf' or 'json'."""
+        if v.lower() not in ["protobuf", "json"]:
+            raise ValueError("http_encoding must be 'protobuf' or 'json'")
+        return v.lower()
+
+    @field_validator("compression")
+    def validate_compression(cls, v):
+        """Ensure compression is one of 'none', 'gzip' or 'zstd'."""
+        if v.lower() not in ["none", "gzip", "zstd"]:
+            raise ValueError("compression must be 'none', 'gzip' or 'zstd'")
+        return v.lower()
+
+    @field_validator("pacing")
+    def validate_pacing(cls, v):
+        """Ensure pacing is either 'closed' or 'open'."""
+        if v.lower() not in PACING_MODES:
+            raise ValueError("pacing must be 'closed' or 'open'")
         return v.lower()
 
+    @field_validator("arrivals")
+    def validate_arrivals(cls, v):
+        """Ensure arrivals is either 'uniform' or 'poisson'."""
+        if v.lower() not in ARRIVAL_PROCESSES:
+            raise ValueError("arrivals must be 'uniform' or 'poisson'")
+        return v.lower()
+
+    @field_validator("syslog_format")
+    def validate_syslog_format(cls, v):
+        """Ensure syslog_format is either 'rfc3164' or 'rfc5424'."""
+        if v.lower() not in SYSLOG_FORMATS:
+            raise ValueError("syslog_format must be 'rfc3164' or 'rfc5424'")
+        return v.lower()
+
+    @field_validator("syslog_framing")
+    def validate_syslog_framing(cls, v):
+        """Ensure syslog_framing is either 'newline' or 'octet'."""
+        if v.lower() not in SYSLOG_FRAMINGS:
+            raise ValueError("syslog_framing must be 'newline' or 'octet'")
+        return v.lower()
+
+    @field_validator("endpoints")
+    def validate_endpoints(cls, v):
+        """Ensure endpoints lists at least one and at most MAX_ENDPOINTS."""
+        if v is not None:
+            parse_endpoints(v)
+        return v
+
+    @field_validator("endpoint_policy")
+    def validate_endpoint_policy(cls, v):
+        """Ensure endpoint_policy is one of ENDPOINT_POLICIES."""
+        if v.lower() not in ENDPOINT_POLICIES:
+            raise ValueError(f"endpoint_policy must be one of {ENDPOINT_POLICIES}")
+        return v.lower()
+
+    @field_validator("data_shape")
+    def validate_data_shape(cls, v):
+        """Ensure data_shape names a preset, or is a valid shape."""
+        if v is not None:
+            load_data_shape(v)
+        return v
+
+    @field_validator("cpu_affinity")
+    def validate_cpu_affinity(cls, v):
+        """
+        Ensure cpu_affinity parses. Whether its CPUs exist is only checked by
+        the load generator that pins its workers to them, as a coordinator
+        validates configs meant for other hosts.
+        """
+        if v is None:
+            return v
+        return format_cpu_list(parse_cpu_list(v))
+
+    @field_validator("metric_mix")
+    def validate_metric_mix(cls, v):
+        """Ensure metric_mix parses, and normalize it."""
+        mix = parse_metric_mix(v)
+        return ",".join(f"{name}={weight:g}" for name, weight in mix.items())
+
+    @field_validator("load_profile")
+    def validate_load_profile(cls, v):
+        """Ensure load_profile parses, and that any CSV file it names loads."""
+        if v is not None:
+            parse_load_profile(v)
+        return v
+
+    @model_validator(mode="after")
+    def validate_otap(self):
+        """Ensure OTAP batches fit the Arrow encoding of the load generator."""
+        if self.load_type != "otap":
+            return self
+        if self.batch_size > otap.MAX_LOGS_BATCH_SIZE:
+            raise ValueError(
+                f"batch_size must be at most {otap.MAX_LOGS_BATCH_SIZE} for 'otap'"
+            )
+        if self.num_attributes > otap.MAX_ATTRIBUTE_KEYS:
+            raise ValueError(
+                f"num_attributes must be at most {otap.MAX_ATTRIBUTE_KEYS} for 'otap'"
+            )
+        if self.corpus_path:
+            raise ValueError("corpus_path is not supported for 'otap'")
+        if self.transport != "grpc":
+            raise ValueError("'otap' is only supported over the 'grpc' transport")
+        return self
+
+    @model_validator(mode="after")
+    def validate_data_shape_load_type(self):
+        """Ensure a data shape is only given for generated OTLP logs."""
+        if self.data_shape and (self.load_type != "otlp" or self.corpus_path):
+            raise ValueError(
+                "data_shape only applies to generated 'otlp' logs, without "
+                "corpus_path"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def validate_replay(self):
+        """Ensure a replay has a recording, and keeps the recorded timing."""
+        if self.load_type != "replay":
+            return self
+        if not self.corpus_path:
+            raise ValueError("corpus_path (the recording) is required for 'replay'")
+        if self.target_rate or self.load_profile:
+            raise ValueError(
+                "'replay' follows the recording's timing, set replay_speed "
+                "instead of target_rate or load_profile"
+            )
+        if self.sender != "sync":
+            raise ValueError("'replay' only supports the 'sync' sender")
+        if self.transport == "otlp_http" and (
+            self.http_encoding,
+            self.compression,
+        ) != ("protobuf", "none"):
+            raise ValueError(
+                "'replay' over 'otlp_http' requires protobuf bodies without "
+                "compression, as requests are re-timestamped on send"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def validate_retry(self):
+        """Ensure retries are only requested for OTLP batches from the corpus."""
+        if not self.retry_on_failure:
+            return self
+        if self.load_type not in ("otlp", "traces", "metrics"):
+            raise ValueError(
+                "retry_on_failure is only supported for 'otlp', 'traces' and "
+                "'metrics'"
+            )
+        if self.retry_max_interval < self.retry_initial_interval:
+            raise ValueError(
+                "retry_max_interval must be at least retry_initial_interval"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def validate_endpoints_load_type(self):
+        """Ensure endpoints are only given for OTLP and OTAP load types."""
+        if self.endpoints and self.load_type == "syslog":
+            raise ValueError("endpoints do not apply to 'syslog', set SYSLOG_SERVER")
+        return self
+
+    @model_validator(mode="after")
+    def validate_arrivals_pacing(self):
+        """Ensure Poisson arrivals are only requested for open-loop pacing."""
+        if self.arrivals == "poisson" and self.pacing != "open":
+            raise ValueError("arrivals 'poisson' requires pacing 'open'")
+        return self
+
+    @model_validator(mode="after")
+    def validate_grpc_compression(self):
+        """Ensure OTLP over gRPC uses a compressor gRPC Python provides."""
+        if (
+            self.load_type in OTLP_EXPORT_METHODS
+            and self.transport == "grpc"
+            and self.compression == "zstd"
+        ):
+            raise ValueError(
+                "compression 'zstd' requires the 'otlp_http' transport "
+                "for OTLP load types"
+            )
+        return self
+
+
+def count_log_records(payload) -> int:
+    """
+    Count the log records in a serialized ExportLogsServiceRequest.
+    """
+    request = logs_service_pb2.ExportLogsServiceRequest.FromString(payload)
+    return sum(
+        len(scope_logs.log_records)
+        for resource_logs in request.resource_logs
+        for scope_logs in resource_logs.scope_logs
+    )
+
+
+def count_spans(payload) -> int:
+    """
+    Count the spans in a serialized ExportTraceServiceRequest.
+    """
+    request = trace_service_pb2.ExportTraceServiceRequest.FromString(payload)
+    return sum(
+        len(scope_spans.spans)
+        for resource_spans in request.resource_spans
+        for scope_spans in resource_spans.scope_spans
+    )
+
+
+def count_metric_points(payload) -> int:
+    """
+    Count the data points in a serialized ExportMetricsServiceRequest.
+    """
+    request = metrics_service_pb2.ExportMetricsServiceRequest.FromString(payload)
+    return sum(
+        len(getattr(metric, metric.WhichOneof("data")).data_points)
+        for resource_metrics in request.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+        if metric.WhichOneof("data")
+    )
+
+
+def parse_metric_mix(mix: str) -> dict:
+    """
+    Parse a metric mix such as "gauge=1,histogram=3" into {type: weight}.
+
+    A type without a weight counts as weight 1. Types not listed are not
+    generated.
+    """
+    weights = {}
+    for part in mix.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in METRIC_TYPES:
+            raise ValueError(
+                f"Unknown metric type '{name}', expected one of {METRIC_TYPES}"
+            )
+        try:
+            value = float(weight) if weight.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight '{weight}' for metric type '{name}'")
+        if value < 0:
+            raise ValueError(f"Weight for metric type '{name}' must not be negative")
+        weights[name] = value
+    if not any(weights.values()):
+        raise ValueError("metric_mix must give at least one type a positive weight")
+    return weights
+
+
+def parse_cpu_list(spec: str) -> List[int]:
+    """
+    Parse a CPU list such as "2-5,8", in the format of taskset -c and the
+    engines' --core-id-range, into sorted CPU numbers.
+    """
+    cpus: Set[int] = set()
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        first, sep, last = part.partition("-")
+        try:
+            low = int(first)
+            high = int(last) if sep else low
+        except ValueError:
+            raise ValueError(f"Invalid CPU range '{part.strip()}'")
+        if low < 0 or high < low:
+            raise ValueError(f"Invalid CPU range '{part.strip()}'")
+        cpus.update(range(low, high + 1))
+    if not cpus:
+        raise ValueError("CPU list must name at least one CPU")
+    return sorted(cpus)
+
+
+def format_cpu_list(cpus: Sequence[int]) -> str:
+    """
+    Format sorted CPU numbers as a CPU list, collapsing runs into ranges.
+    """
+    ranges: List[List[int]] = []
+    for cpu in cpus:
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def check_cpus_available(cpus: Sequence[int]) -> None:
+    """
+    Raise ValueError unless this process may be pinned to every one of cpus.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        raise ValueError("cpu_affinity is only supported on Linux")
+    unavailable = sorted(set(cpus) - os.sched_getaffinity(0))
+    if unavailable:
+        raise ValueError(
+            f"CPUs {format_cpu_list(unavailable)} are not available to the "
+            "load generator"
+        )
+
+
+def worker_cpus(cpus: Sequence[int], worker_id: int, num_workers: int) -> List[int]:
+    """
+    Return the CPUs a worker is pinned to.
+
+    With at least as many CPUs as workers, the CPUs are split into one
+    contiguous group per worker, so no two workers share a CPU. Otherwise
+    workers take single CPUs round-robin.
+    """
+    if num_workers > len(cpus):
+        return [cpus[worker_id % len(cpus)]]
+    share, extra = divmod(len(cpus), num_workers)
+    start = worker_id * share + min(worker_id, extra)
+    return list(cpus[start : start + share + (1 if worker_id < extra else 0)])
+
+
+@functools.lru_cache(maxsize=8)
+def metric_series_table(
+    series: int, mix: str, num_attributes: int, attribute_value_size: int
+) -> tuple:
+    """
+    Return the (metric type, attribute values) of every metric series.
+
+    Series are derived from their index with a seeded generator, so every
+    batch, corpus entry and worker process agrees on the same series set and
+    the cardinality seen by the backend is exactly series.
+    """
+    weights = parse_metric_mix(mix)
+    names = list(weights)
+    cumulative = list(itertools.accumulate(weights[name] for name in names))
+    table = []
+    for index in range(series):
+        rng = random.Random(index)
+        pick = rng.random() * cumulative[-1]
+        metric_type = names[bisect.bisect_right(cumulative, pick)]
+        values = tuple(
+            rng.randbytes(attribute_value_size).translate(ALPHANUMERIC_TABLE).decode()
+            for _ in range(num_attributes)
+        )
+        table.append((metric_type, values))
+    return tuple(table)
+
+
+class ThreadCpuClock:
+    """
+    CPU and wall time used by a thread since the clock was created in it,
+    readable from other threads while the thread runs.
+
+    The thread stops the clock before it exits, freezing the reading, since
+    the CPU clock of an exited thread can't be read.
+    """
+
+    def __init__(self):
+        self.clock_id = time.pthread_getcpuclockid(threading.get_ident())
+        self.cpu_start = time.clock_gettime(self.clock_id)
+        self.wall_start = time.monotonic()
+        self.final: Optional[Tuple[float, float]] = None
+
+    def read(self) -> Tuple[float, float]:
+        """Return the (CPU seconds, wall seconds) used so far."""
+        if self.final is not None:
+            return self.final
+        try:
+            cpu = time.clock_gettime(self.clock_id)
+        except OSError:
+            # The thread stopped the clock and exited since the check above.
+            return self.final or (0.0, 0.0)
+        return cpu - self.cpu_start, time.monotonic() - self.wall_start
+
+    def stop(self) -> None:
+        """Freeze the clock. Called by its own thread."""
+        self.final = self.read()
+
+
+def cpu_headroom(
+    usage: Dict[int, Tuple[float, float]], share_process: bool
+) -> Optional[float]:
+    """
+    Return the share of a CPU left unused by the busiest Python interpreter
+    of a run, given the (CPU seconds, wall seconds) of each worker, or None
+    before any worker reported.
+
+    Worker threads of one process take turns on the GIL, so together they
+    can use at most one CPU; each worker process has its own.
+    """
+    utilization = [cpu / wall for cpu, wall in usage.values() if wall > 0]
+    if not utilization:
+        return None
+    busiest = sum(utilization) if share_process else max(utilization)
+    return max(0.0, 1.0 - busiest)
+
+
+class SharedCounters:
+    """
+    Per-worker metric counters backed by shared memory.
+
+    Each worker owns one slot of len(COUNTER_NAMES) unsigned 64-bit counters
+    in a raw (lock-free) multiprocessing array. A slot is only ever written by
+    its worker, as it runs, and readers sum all slots to get a single
+    consistent view.
+    Latency histograms are shared the same way, as a slot of bucket counts
+    and a latency sum per worker, the set of CPUs each worker runs on, as
+    one flag per CPU, and the CPU and wall time of each worker process.
+    """
+
+    def __init__(self, num_workers: int, ctx=multiprocessing):
+        self.num_workers = num_workers
+        self.values = ctx.RawArray(ctypes.c_uint64, num_workers * len(COUNTER_NAMES))
+        self.latency_counts = ctx.RawArray(ctypes.c_uint64, num_workers * NUM_BUCKETS)
+        self.latency_sums = ctx.RawArray(ctypes.c_double, num_workers)
+        self.cpu_flags = ctx.RawArray(ctypes.c_uint8, num_workers * NUM_CPUS)
+        self.cpu_seconds = ctx.RawArray(ctypes.c_double, num_workers)
+        self.wall_seconds = ctx.RawArray(ctypes.c_double, num_workers)
+
+    def slot(self, worker_id: int):
+        """
+        Return a worker's slot as a ctypes array over the shared memory,
+        indexed like COUNTER_NAMES.
+        """
+        size = len(COUNTER_NAMES)
+        offset = worker_id * size * ctypes.sizeof(ctypes.c_uint64)
+        return (ctypes.c_uint64 * size).from_buffer(self.values, offset)
+
+    def add(self, worker_id: int, updates: dict) -> None:
+        """Add the given metric amounts to a worker's slot."""
+        base = worker_id * len(COUNTER_NAMES)
+        for i, name in enumerate(COUNTER_NAMES):
+            self.values[base + i] += updates.get(name, 0)
+
+    def totals(self) -> dict:
+        """Sum the counters of all worker slots."""
+        totals = dict.fromkeys(COUNTER_NAMES, 0)
+        for worker_id in range(self.num_workers):
+            base = worker_id * len(COUNTER_NAMES)
+            for i, name in enumerate(COUNTER_NAMES):
+                totals[name] += self.values[base + i]
+        return totals
+
+    def latency_slot(self, worker_id: int) -> "SharedLatencySlot":
+        """Return a worker's latency histogram slot over the shared memory."""
+        offset = worker_id * NUM_BUCKETS * ctypes.sizeof(ctypes.c_uint64)
+        counts = (ctypes.c_uint64 * NUM_BUCKETS).from_buffer(
+            self.latency_counts, offset
+        )
+        return SharedLatencySlot(counts, self.latency_sums, worker_id)
+
+    def set_cpus(self, worker_id: int, cpus: Sequence[int]) -> None:
+        """Record the CPUs a worker runs on."""
+        base = worker_id * NUM_CPUS
+        for cpu in range(NUM_CPUS):
+            self.cpu_flags[base + cpu] = cpu in cpus
+
+    def cpu_placement(self) -> Dict[int, List[int]]:
+        """Return the CPUs of each worker that recorded them."""
+        placement = {}
+        for worker_id in range(self.num_workers):
+            base = worker_id * NUM_CPUS
+            cpus = [cpu for cpu in range(NUM_CPUS) if self.cpu_flags[base + cpu]]
+            if cpus:
+                placement[worker_id] = cpus
+        return placement
+
+    def set_cpu_time(self, worker_id: int, cpu: float, wall: float) -> None:
+        """Record the CPU and wall time a worker process has used so far."""
+        self.cpu_seconds[worker_id] = cpu
+        self.wall_seconds[worker_id] = wall
+
+    def cpu_usage(self) -> Dict[int, Tuple[float, float]]:
+        """Return the (CPU seconds, wall seconds) of each worker that reported."""
+        return {
+            worker_id: (self.cpu_seconds[worker_id], self.wall_seconds[worker_id])
+            for worker_id in range(self.num_workers)
+            if self.wall_seconds[worker_id]
+        }
+
+    def latency(self) -> LatencyHistogram:
+        """Merge the latency histograms of all worker slots."""
+        total = LatencyHistogram()
+        for worker_id in range(self.num_workers):
+            base = worker_id * NUM_BUCKETS
+            for i in range(NUM_BUCKETS):
+                total.counts[i] += self.latency_counts[base + i]
+            total.sum += self.latency_sums[worker_id]
+        return total
+
+
+class SharedLatencySlot:
+    """
+    A worker's latency histogram slot in SharedCounters, recorded into as the
+    worker sends so that readers see its latencies while it runs.
+    """
+
+    __slots__ = ("counts", "sums", "worker_id")
+
+    def __init__(self, counts, sums, worker_id: int):
+        self.counts = counts
+        self.sums = sums
+        self.worker_id = worker_id
+
+    def record(self, seconds: float) -> None:
+        """Count one request that took seconds to complete."""
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS, seconds)] += 1
+        self.sums[self.worker_id] += seconds
+
+
+class RunStart:
+    """
+    Start signal of the worker processes of a run.
+
+    Each worker process reports ready once it is set up, and waits for the
+    parent to start the run's clock, so that load profiles, replay timing and
+    the warmup run from when the workers can send rather than from the spawn.
+    """
+
+    def __init__(self, num_workers: int, ctx=multiprocessing):
+        self.num_workers = num_workers
+        self.ready = ctx.Semaphore(0)
+        self.started = ctx.Event()
+        self.times = ctx.RawArray(ctypes.c_double, 2)
+
+    def wait_ready(self, processes: list, stop_event) -> None:
+        """
+        Wait until every worker process is ready, the run is stopped or a
+        worker process exits.
+        """
+        for _ in range(self.num_workers):
+            while not self.ready.acquire(timeout=0.1):
+                if stop_event.is_set() or not all(p.is_alive() for p in processes):
+                    return
+
+    def start(self, started_at: float, measure_from: float) -> None:
+        """Start the run's clock in every worker process."""
+        self.times[0] = started_at
+        self.times[1] = measure_from
+        self.started.set()
+
+    def worker_ready(self, stop_event) -> Optional[dict]:
+        """
+        Report a worker process ready and wait for the run to start. Returns
+        the run's started_at and measure_from, or None if it stopped first.
+        """
+        self.ready.release()
+        while not self.started.wait(0.1):
+            if stop_event.is_set():
+                return None
+        return {"started_at": self.times[0], "measure_from": self.times[1]}
+
+
+def process_worker_main(
+    worker_name: str,
+    worker_id: int,
+    args: dict,
+    stop_event,
+    counters: SharedCounters,
+    run_start: RunStart,
+    corpus_handle: Optional[CorpusHandle] = None,
+) -> None:
+    """
+    Entry point for a worker running in its own OS process.
+
+    A fresh LoadGenerator is built in the child so that no locks, sockets or
+    gRPC channels are inherited from the parent. The worker method runs
+    unchanged against the shared stop event, updating the worker's shared
+    counter and latency histogram slots as it goes. The payload corpus built
+    by the parent is attached through shared memory rather than rebuilt. The
+    worker starts once the parent starts the run's clock. The process's CPU
+    time is published every CPU_SAMPLE_INTERVAL seconds.
+    """
+    # Shutdown is coordinated by the parent through stop_event.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    generator = LoadGenerator()
+    generator.stop_event = stop_event
+    generator.worker_counters = counters
+    generator.pin_worker(worker_id, args)
+    if corpus_handle is not None:
+        generator.corpus = PayloadCorpus.attach(corpus_handle)
+    if args.get("load_type") == "replay":
+        generator.get_recording(args)
+    run_clock = run_start.worker_ready(stop_event)
+    if run_clock is None:
+        if generator.corpus is not None:
+            generator.corpus.close()
+        return
+    args = {**args, **run_clock}
+    generator.in_warmup = args.get("warmup_seconds", 0) > 0
+    generator.start_warmup(args)
+
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    done = threading.Event()
+
+    def publish_cpu_time() -> None:
+        counters.set_cpu_time(
+            worker_id, time.process_time() - cpu_start, time.monotonic() - wall_start
+        )
+
+    def sample_cpu_time() -> None:
+        while not done.wait(CPU_SAMPLE_INTERVAL):
+            publish_cpu_time()
+
+    threading.Thread(target=sample_cpu_time, daemon=True).start()
+    try:
+        getattr(generator, worker_name)(worker_id, args)
+    finally:
+        done.set()
+        publish_cpu_time()
+        if generator.corpus is not None:
+            generator.corpus.close()
+
 
 class LoadGenerator:
     def __init__(self):
@@ -127,15 +1110,60 @@ class LoadGenerator:
         self.stop_event = threading.Event()
         self.current_config = {}
         self.lock = threading.Lock()
-        self.metrics = {"sent": 0, "failed": 0, "bytes_sent": 0, "late_batches": 0}
+        self.metrics = dict.fromkeys(COUNTER_NAMES, 0)
+        # Counter slots of the running workers, folded into metrics on exit
+        self.live_counters: list = []
+        # Set in worker processes, whose slots live in shared memory
+        self.worker_counters: Optional[SharedCounters] = None
+        # One export latency histogram per worker, merged when read
+        self.latency_histograms: list = []
+        self.shared_counters: Optional[SharedCounters] = None
+        self.corpus: Optional[PayloadCorpus] = None
+        self.corpus_lock = threading.Lock()
+        # Timing of the replayed recording, built from the corpus on first use
+        self.recording: Optional[Recording] = None
+        # Timestamp offsets and latest timestamp of each corpus payload,
+        # found on first use
+        self.timestamp_layout: Optional[Tuple[List[List[int]], List[int]]] = None
+        # CPUs each pinned worker thread of the current run is running on
+        self.cpu_placement: Dict[int, List[int]] = {}
+        # CPU clocks of the worker threads of the current run, and the CPU
+        # and wall time of its finished worker processes
+        self.cpu_clocks: Dict[int, ThreadCpuClock] = {}
+        self.cpu_usage: Dict[int, Tuple[float, float]] = {}
+        self.workers_share_process = True
+        # Target rate over time of the current run, read by get_target_rate
+        self.rate_schedule: Optional[Callable[[float], float]] = None
+        self.run_started_at = 0.0
+        # Warmup of the current run: whether it is in progress, the Unix time
+        # it ends (and measurement starts) and the counters and latencies at
+        # its end, subtracted from those read after it.
+        self.in_warmup = False
+        self.measure_from = 0.0
+        self.warmup_metrics: Optional[dict] = None
+        self.warmup_latency: Optional[LatencyHistogram] = None
+        # OTLP endpoints of the current run, and the exports in flight to
+        # each from this process, shared by the workers' balancers
+        self.endpoints: List[str] = []
+        self.outstanding: List[int] = []
+        self.outstanding_lock = threading.Lock()
 
     def generate_random_string(self, length: int) -> str:
         """
         Generate a random alphanumeric string of the specified length.
         """
-        return "".join(
-            random.choice(string.ascii_letters + string.digits) for _ in range(length)
-        )
+        return random.randbytes(length).translate(ALPHANUMERIC_TABLE).decode("ascii")
+
+    def generate_random_strings(self, count: int, length: int) -> list:
+        """
+        Generate count random alphanumeric strings of the specified length.
+
+        All strings are cut from one random byte buffer mapped onto the
+        alphabet in a single pass, instead of being built a character at a
+        time.
+        """
+        text = self.generate_random_string(count * length)
+        return [text[i : i + length] for i in range(0, count * length, length)]
 
     def create_log_record(
         self,
@@ -164,6 +1192,35 @@ class LoadGenerator:
             attributes=attributes,
         )
 
+    def counter_slot(self, worker_id: int):
+        """
+        Return the counter slot a worker updates as it sends, indexed like
+        COUNTER_NAMES.
+
+        Only the worker writes to its slot, so updates take no lock, and
+        get_metrics sums the slots of running workers on read. In a worker
+        process, the slot is the worker's slot of the shared counters.
+        """
+        if self.worker_counters is not None:
+            return self.worker_counters.slot(worker_id)
+        slot = [0] * len(COUNTER_NAMES)
+        with self.lock:
+            self.live_counters.append(slot)
+        return slot
+
+    def release_counter_slot(self, slot) -> None:
+        """
+        Fold a finished worker's counter slot into the run totals.
+        """
+        with self.lock:
+            remaining = [live for live in self.live_counters if live is not slot]
+            if len(remaining) == len(self.live_counters):
+                # A worker process slot, already in the shared counters
+                return
+            self.live_counters = remaining
+            for name, amount in zip(COUNTER_NAMES, slot):
+                self.metrics[name] += amount
+
     def increment_metric(self, key: str, amount: int = 1) -> None:
         with self.lock:
             self.metrics[key] += amount
@@ -175,24 +1232,760 @@ class LoadGenerator:
                 if key in self.metrics:
                     self.metrics[key] += amount
 
-    def worker_thread(self, thread_id: int, args: dict) -> None:
+    def pin_worker(
+        self, worker_id: int, args: dict, cpus: Optional[Sequence[int]] = None
+    ) -> None:
         """
-        Worker thread that sends batches of log records to an OTLP endpoint.
+        Pin the calling thread, and the threads it starts, to the worker's
+        share of cpu_affinity (or to cpus), recording where it ended up.
         """
-        endpoint = os.getenv("OTLP_ENDPOINT", "localhost:4317")
+        if not args.get("cpu_affinity"):
+            return
+        if cpus is None:
+            cpus = worker_cpus(
+                parse_cpu_list(args["cpu_affinity"]), worker_id, args.get("threads", 4)
+            )
+        check_cpus_available(cpus)
+        os.sched_setaffinity(0, cpus)
+        placement = sorted(os.sched_getaffinity(0))
+        if self.worker_counters is not None:
+            self.worker_counters.set_cpus(worker_id, placement)
+        else:
+            with self.lock:
+                self.cpu_placement[worker_id] = placement
 
-        channel = None
+    def run_pinned_worker(self, worker_func: Callable, worker_id: int, args: dict):
+        """
+        Run a worker in the current thread, pinned to its CPUs, measuring
+        its CPU time.
+        """
+        self.pin_worker(worker_id, args)
+        self.run_measured(worker_id, worker_func, worker_id, args)
+
+    def run_measured(self, worker_id: int, func: Callable, *args):
+        """
+        Call func in the current thread, with a CPU clock registered for
+        worker_id while it runs.
+        """
+        if not hasattr(time, "pthread_getcpuclockid"):
+            return func(*args)
+        clock = ThreadCpuClock()
+        with self.lock:
+            self.cpu_clocks[worker_id] = clock
+        try:
+            return func(*args)
+        finally:
+            clock.stop()
+
+    def start_warmup(self, args: dict) -> None:
+        """
+        End the warmup of a run at its measure_from time, unless the run
+        stops first.
+        """
+        if not self.in_warmup:
+            return
+
+        def end_at_measure_from():
+            if not self.stop_event.wait(max(0.0, args["measure_from"] - time.time())):
+                self.end_warmup()
+
+        threading.Thread(
+            target=end_at_measure_from, name="loadgen-warmup", daemon=True
+        ).start()
+
+    def end_warmup(self) -> None:
+        """
+        Take the counters and latencies so far as the run's warmup, so that
+        those read from now on start clean.
+        """
+        metrics = self.counter_totals()
+        latency = self.latency_totals()
+        with self.lock:
+            self.warmup_metrics = metrics
+            self.warmup_latency = latency
+            self.in_warmup = False
+
+    def latency_histogram(
+        self, worker_id: int
+    ) -> Union[LatencyHistogram, SharedLatencySlot]:
+        """
+        Create a worker's export latency histogram, registered for get_latency.
+        In a worker process, it is the worker's latency slot of the shared
+        counters.
+        """
+        if self.worker_counters is not None:
+            return self.worker_counters.latency_slot(worker_id)
+        histogram = LatencyHistogram()
+        with self.lock:
+            self.latency_histograms.append(histogram)
+        return histogram
+
+    def pacer(
+        self, args: dict, batch_interval: Union[None, float, IntervalSchedule]
+    ) -> Pacer:
+        """
+        Create a worker's send pacer for the configured pacing mode.
+
+        With a load profile, each worker sends its share of the profile's
+        rate, timed from the start of the run rather than of the worker.
+        """
+        elapsed = 0.0
+        if args.get("load_profile"):
+            rate_at = parse_load_profile(args["load_profile"]).rate_at
+            batch_items = args["batch_size"] * args.get("threads", 4)
+
+            def profile_interval(offset: float) -> Optional[float]:
+                rate = rate_at(offset)
+                return batch_items / rate if rate > 0 else None
+
+            batch_interval = profile_interval
+            elapsed = max(0.0, time.time() - args.get("started_at", time.time()))
+        return Pacer(
+            batch_interval,
+            mode=args.get("pacing", "closed"),
+            arrivals=args.get("arrivals", "uniform"),
+            elapsed=elapsed,
+            stop_event=self.stop_event,
+        )
+
+    def target_rate_schedule(self, args: dict) -> Optional[Callable[[float], float]]:
+        """
+        Return the run's target rate as a function of seconds since it
+        started, or None when the run is not rate limited.
+        """
+        if args.get("load_profile"):
+            return parse_load_profile(args["load_profile"]).rate_at
+        target_rate = args.get("target_rate")
+        if target_rate:
+            return lambda elapsed: float(target_rate)
+        return None
+
+    def grpc_channel_options(self, args: dict) -> list:
+        """
+        Build the gRPC channel options for a worker connection.
+        """
         if args.get("tcp_connection_per_thread"):
             # This disables the default python grpc client behavior of shared global
             # subchannels per destination.
-            channel = grpc.insecure_channel(
-                endpoint, options=[("grpc.use_local_subchannel_pool", 1)]
+            return [("grpc.use_local_subchannel_pool", 1)]
+        return []
+
+    def grpc_compression(self, args: dict) -> grpc.Compression:
+        """
+        Return the message compression of a worker's gRPC channel.
+
+        gRPC Python compresses each message as it is sent and offers no way
+        to send pre-compressed messages, so gzip is left to the channel and
+        costs a compression per send. The wire bytes reported for these
+        messages are an estimate: the size of a gzip of each corpus entry
+        made once in Python, not the bytes the channel actually wrote.
+        zstd is only applied to OTAP payloads, as Arrow IPC compression.
+        """
+        if args.get("compression", "none") == "gzip":
+            return grpc.Compression.Gzip
+        return grpc.Compression.NoCompression
+
+    def add_log_records(
+        self,
+        log_records,
+        count: int,
+        body_size: int = 25,
+        num_attributes: int = 2,
+        attribute_value_size: int = 15,
+    ) -> None:
+        """
+        Append count OTLP log records with random content to a repeated
+        LogRecord field.
+
+        Produces the same records as create_log_record, but every body and
+        attribute value of the batch comes from one pass over a random
+        buffer, and records are filled in place instead of being constructed
+        and copied into the request.
+        """
+        bodies = self.generate_random_strings(count, body_size)
+        values = self.generate_random_strings(
+            count * num_attributes, attribute_value_size
+        )
+        keys = [f"attribute.{i+1}" for i in range(num_attributes)]
+        time_unix_nano = int(time.time_ns())
+
+        for record_index, body in enumerate(bodies):
+            record = log_records.add(
+                time_unix_nano=time_unix_nano,
+                severity_text=LOG_SEVERITY_TEXT,
+                severity_number=LOG_SEVERITY_NUMBER,
+            )
+            record.body.string_value = body
+            attributes = record.attributes
+            offset = record_index * num_attributes
+            for i, key in enumerate(keys):
+                attributes.add(key=key).value.string_value = values[offset + i]
+
+    def build_logs_request(self, args: dict):
+        """
+        Build an ExportLogsServiceRequest holding one batch of random log records,
+        shaped by the data_shape when there is one.
+        """
+        if args.get("data_shape"):
+            return shape_pools(args["data_shape"]).build_logs_request(
+                args["batch_size"],
+                time_unix_nano=time.time_ns(),
+                severity_text=LOG_SEVERITY_TEXT,
+                severity_number=LOG_SEVERITY_NUMBER,
+            )
+        logs_request = logs_service_pb2.ExportLogsServiceRequest()
+        scope_logs = logs_request.resource_logs.add().scope_logs.add()
+        self.add_log_records(
+            scope_logs.log_records,
+            args["batch_size"],
+            body_size=args["body_size"],
+            num_attributes=args["num_attributes"],
+            attribute_value_size=args["attribute_value_size"],
+        )
+        return logs_request
+
+    def add_trace_spans(
+        self,
+        spans,
+        count: int,
+        spans_per_trace: int = 10,
+        trace_depth: int = 3,
+        num_attributes: int = 2,
+        attribute_value_size: int = 15,
+        span_events: int = 0,
+        span_links: int = 0,
+    ) -> None:
+        """
+        Append count spans, grouped into traces of spans_per_trace, to a
+        repeated Span field.
+
+        Each trace is a random tree: the first span is the root and every
+        later span picks a parent among the spans of its trace that are less
+        than trace_depth levels deep. Children start and end within their
+        parent's time range so the traces look like real request trees.
+        """
+        values = self.generate_random_strings(
+            count * num_attributes, attribute_value_size
+        )
+        keys = [f"attribute.{i+1}" for i in range(num_attributes)]
+        now = time.time_ns()
+
+        # (span_id, depth, start, end) of each span in the current trace
+        trace_spans: list = []
+        trace_id = b""
+        for span_index in range(count):
+            if span_index % spans_per_trace == 0:
+                trace_id = random.randbytes(16)
+                trace_spans = []
+
+            parents = [p for p in trace_spans if p[1] < trace_depth]
+            if parents:
+                parent_id, parent_depth, parent_start, parent_end = random.choice(
+                    parents
+                )
+                depth = parent_depth + 1
+                start = random.randint(parent_start, parent_end)
+                end = random.randint(start, parent_end)
+                kind = random.choice(
+                    (
+                        trace_pb2.Span.SpanKind.SPAN_KIND_CLIENT,
+                        trace_pb2.Span.SpanKind.SPAN_KIND_INTERNAL,
+                    )
+                )
+            else:
+                # Root span (or another top-level span when trace_depth is 1)
+                parent_id = b""
+                depth = 1
+                end = now
+                start = end - random.randint(1_000_000, 500_000_000)
+                kind = trace_pb2.Span.SpanKind.SPAN_KIND_SERVER
+
+            span_id = random.randbytes(8)
+            trace_spans.append((span_id, depth, start, end))
+            span = spans.add(
+                trace_id=trace_id,
+                span_id=span_id,
+                parent_span_id=parent_id,
+                name=random.choice(SPAN_NAMES),
+                kind=kind,
+                start_time_unix_nano=start,
+                end_time_unix_nano=end,
+            )
+            attributes = span.attributes
+            offset = span_index * num_attributes
+            for i, key in enumerate(keys):
+                attributes.add(key=key).value.string_value = values[offset + i]
+            for event_index in range(span_events):
+                span.events.add(
+                    time_unix_nano=random.randint(start, end),
+                    name=f"event.{event_index+1}",
+                )
+            for _ in range(span_links):
+                span.links.add(
+                    trace_id=random.randbytes(16), span_id=random.randbytes(8)
+                )
+
+    def build_trace_request(self, args: dict):
+        """
+        Build an ExportTraceServiceRequest holding one batch of random spans.
+        """
+        trace_request = trace_service_pb2.ExportTraceServiceRequest()
+        resource_spans = trace_request.resource_spans.add()
+        resource_spans.resource.attributes.add(
+            key="service.name"
+        ).value.string_value = "loadgen"
+        scope_spans = resource_spans.scope_spans.add()
+        self.add_trace_spans(
+            scope_spans.spans,
+            args["batch_size"],
+            spans_per_trace=args.get("spans_per_trace", 10),
+            trace_depth=args.get("trace_depth", 3),
+            num_attributes=args["num_attributes"],
+            attribute_value_size=args["attribute_value_size"],
+            span_events=args.get("span_events", 0),
+            span_links=args.get("span_links", 0),
+        )
+        return trace_request
+
+    def add_metric_points(
+        self,
+        metrics,
+        count: int,
+        metric_mix: str = "gauge=1,sum=1,histogram=1,exponential_histogram=1",
+        metric_series: int = 100,
+        points_per_series: int = 1,
+        num_attributes: int = 2,
+        attribute_value_size: int = 15,
+    ) -> None:
+        """
+        Append count data points to a repeated Metric field.
+
+        Points are spread over consecutive series from metric_series_table,
+        starting at a random series, with points_per_series points one
+        second apart for each. All points of one metric type go into a single
+        Metric named loadgen.<type>.
+        """
+        table = metric_series_table(
+            metric_series, metric_mix, num_attributes, attribute_value_size
+        )
+        keys = ["series.id"] + [f"attribute.{i+1}" for i in range(num_attributes)]
+        now = time.time_ns()
+        start_time = now - (points_per_series + 60) * 1_000_000_000
+        first_series = random.randrange(metric_series)
+
+        # Data points container of each metric type's metric
+        data_points: Dict[str, Any] = {}
+        for point_index in range(count):
+            series_index = (first_series + point_index // points_per_series) % (
+                metric_series
+            )
+            metric_type, values = table[series_index]
+            points = data_points.get(metric_type)
+            if points is None:
+                metric = metrics.add(name=f"loadgen.{metric_type}")
+                if metric_type == "gauge":
+                    points = metric.gauge.data_points
+                elif metric_type == "sum":
+                    metric.sum.is_monotonic = True
+                    metric.sum.aggregation_temporality = (
+                        metrics_pb2.AGGREGATION_TEMPORALITY_CUMULATIVE
+                    )
+                    points = metric.sum.data_points
+                elif metric_type == "histogram":
+                    metric.unit = "ms"
+                    metric.histogram.aggregation_temporality = (
+                        metrics_pb2.AGGREGATION_TEMPORALITY_CUMULATIVE
+                    )
+                    points = metric.histogram.data_points
+                else:
+                    metric.unit = "ms"
+                    metric.exponential_histogram.aggregation_temporality = (
+                        metrics_pb2.AGGREGATION_TEMPORALITY_CUMULATIVE
+                    )
+                    points = metric.exponential_histogram.data_points
+                data_points[metric_type] = points
+
+            age = points_per_series - 1 - point_index % points_per_series
+            point = points.add(
+                start_time_unix_nano=start_time,
+                time_unix_nano=now - age * 1_000_000_000,
             )
+            attributes = point.attributes
+            attributes.add(key=keys[0]).value.int_value = series_index
+            for key, value in zip(keys[1:], values):
+                attributes.add(key=key).value.string_value = value
+
+            if metric_type == "gauge":
+                point.as_double = random.random() * 100
+            elif metric_type == "sum":
+                point.as_int = random.randrange(1_000_000)
+            elif metric_type == "histogram":
+                counts = list(random.randbytes(len(HISTOGRAM_BOUNDS) + 1))
+                point.explicit_bounds.extend(HISTOGRAM_BOUNDS)
+                point.bucket_counts.extend(counts)
+                point.count = sum(counts)
+                point.sum = point.count * random.uniform(5.0, 500.0)
+                point.min = random.uniform(0.0, HISTOGRAM_BOUNDS[0])
+                point.max = random.uniform(HISTOGRAM_BOUNDS[-1], 5000.0)
+            else:
+                counts = list(random.randbytes(EXPONENTIAL_HISTOGRAM_BUCKETS))
+                point.scale = EXPONENTIAL_HISTOGRAM_SCALE
+                point.zero_count = counts[0] % 4
+                point.positive.offset = random.randrange(32)
+                point.positive.bucket_counts.extend(counts)
+                point.count = sum(counts) + point.zero_count
+                point.sum = point.count * random.uniform(5.0, 500.0)
+
+    def build_metrics_request(self, args: dict):
+        """
+        Build an ExportMetricsServiceRequest holding one batch of random data
+        points.
+        """
+        metrics_request = metrics_service_pb2.ExportMetricsServiceRequest()
+        resource_metrics = metrics_request.resource_metrics.add()
+        resource_metrics.resource.attributes.add(
+            key="service.name"
+        ).value.string_value = "loadgen"
+        scope_metrics = resource_metrics.scope_metrics.add()
+        self.add_metric_points(
+            scope_metrics.metrics,
+            args["batch_size"],
+            metric_mix=args.get(
+                "metric_mix", "gauge=1,sum=1,histogram=1,exponential_histogram=1"
+            ),
+            metric_series=args.get("metric_series", 100),
+            points_per_series=args.get("points_per_series", 1),
+            num_attributes=args["num_attributes"],
+            attribute_value_size=args["attribute_value_size"],
+        )
+        return metrics_request
+
+    def build_otap_logs_payloads(self, args: dict) -> tuple:
+        """
+        Encode one batch of random log records as OTAP ArrowPayloads.
+
+        Returns the payloads and their size without Arrow IPC compression.
+        """
+        batch_size = args["batch_size"]
+        num_attributes = args["num_attributes"]
+        encode = functools.partial(
+            otap.encode_logs_payloads,
+            bodies=self.generate_random_strings(batch_size, args["body_size"]),
+            attribute_keys=[f"attribute.{i+1}" for i in range(num_attributes)],
+            attribute_values=self.generate_random_strings(
+                batch_size * num_attributes, args["attribute_value_size"]
+            ),
+            time_unix_nano=time.time_ns(),
+            severity_number=LOG_SEVERITY_NUMBER,
+            severity_text=LOG_SEVERITY_TEXT,
+        )
+        payloads = encode()
+        if args.get("compression", "none") != "zstd":
+            return payloads, len(payloads)
+        return encode(compression="zstd"), len(payloads)
+
+    def get_corpus(self, args: dict) -> PayloadCorpus:
+        """
+        Return the payload corpus shared by every worker of the current run,
+        building it on first use.
+
+        The corpus holds corpus_size distinct serialized Export requests for
+        the load type, or the messages of corpus_path when set, so memory use
+        is bounded by the corpus and not by the number of workers. With the
+        otlp_http transport the entries are complete request bodies, already
+        in the configured encoding and compression.
+
+        Every entry records its uncompressed size and its size on the wire.
+        Messages the gRPC channel gzips on send are compressed once here to
+        estimate the latter; the channel still compresses them again on
+        every send.
+        """
+        load_type = args.get("load_type", "otlp")
+        if load_type == "traces":
+            build_request, count_items = self.build_trace_request, count_spans
+        elif load_type == "metrics":
+            build_request = self.build_metrics_request
+            count_items = count_metric_points
         else:
-            channel = grpc.insecure_channel(endpoint)
+            build_request, count_items = self.build_logs_request, count_log_records
+
+        http_encoding = args.get("http_encoding", "protobuf")
+        compression = args.get("compression", "none")
+        otlp_http_transport = args.get("transport", "grpc") == "otlp_http"
+        channel_gzip = not otlp_http_transport and compression == "gzip"
+
+        def wire_size(payload) -> int:
+            if channel_gzip:
+                return len(compress(payload, "gzip"))
+            return len(payload)
+
+        def encode(request, items: int) -> tuple:
+            if otlp_http_transport:
+                body = otlp_http.encode_body(request, http_encoding)
+                payload = compress(body, compression)
+                return payload, items, len(body), len(payload)
+            payload = request.SerializeToString()
+            return payload, items, len(payload), wire_size(payload)
+
+        def build_payload(_):
+            if load_type == "otap":
+                payload, raw_size = self.build_otap_logs_payloads(args)
+                return payload, args["batch_size"], raw_size, wire_size(payload)
+            return encode(build_request(args), args["batch_size"])
+
+        with self.corpus_lock:
+            if self.corpus is None:
+                corpus_path = args.get("corpus_path")
+                if corpus_path and load_type == "replay":
+                    self.corpus = read_recording(corpus_path, count_log_records)
+                    if channel_gzip:
+                        self.corpus.wire_sizes = [
+                            wire_size(payload) for payload in self.corpus.payloads
+                        ]
+                elif corpus_path:
+                    self.corpus = PayloadCorpus.from_file(
+                        corpus_path, count_items=count_items
+                    )
+                    if otlp_http_transport and (
+                        http_encoding,
+                        compression,
+                    ) != ("protobuf", "none"):
+                        # Re-encode the file's protobuf requests as bodies.
+                        file_corpus = self.corpus
+                        request_type = OTLP_REQUEST_TYPES[load_type]
+                        payloads, item_counts, raw_sizes, wire_sizes = zip(
+                            *(
+                                encode(request_type.FromString(payload), items)
+                                for payload, items in zip(
+                                    file_corpus.payloads, file_corpus.item_counts
+                                )
+                            )
+                        )
+                        self.corpus = PayloadCorpus(
+                            payloads,
+                            item_counts,
+                            raw_sizes=raw_sizes,
+                            wire_sizes=wire_sizes,
+                        )
+                        file_corpus.close()
+                    elif channel_gzip:
+                        self.corpus.wire_sizes = [
+                            wire_size(payload) for payload in self.corpus.payloads
+                        ]
+                else:
+                    self.corpus = PayloadCorpus.generate(
+                        args.get("corpus_size", 1), build_payload
+                    )
+                print(
+                    f"Payload corpus ready: {len(self.corpus)} batches, "
+                    f"{sum(self.corpus.raw_sizes)} bytes "
+                    f"({sum(self.corpus.wire_sizes)} bytes on the wire)"
+                )
+            return self.corpus
+
+    def get_recording(self, args: dict) -> Recording:
+        """
+        Return the timing of the recording replayed by the current run,
+        reading it from the corpus on first use.
+        """
+        corpus = self.get_corpus(args)
+        with self.corpus_lock:
+            if self.recording is None or self.recording.corpus is not corpus:
+                self.recording = Recording(corpus)
+            return self.recording
 
-        stub = logs_service_pb2_grpc.LogsServiceStub(channel)
+    def restamper(self, args: dict) -> Optional[Restamper]:
+        """
+        Return a worker's Restamper over the corpus of the current run, or
+        None when fresh_timestamps is off or the payloads are stored encoded,
+        so their timestamps can't be patched.
 
+        The timestamp offsets are found once per run and shared by the
+        workers of this process. Each worker patches its payloads in its own
+        scratch buffer.
+        """
+        load_type = args.get("load_type", "otlp")
+        spec = OTLP_TIMESTAMP_FIELDS.get(load_type)
+        if spec is None or not args.get("fresh_timestamps", True):
+            return None
+        if args.get("transport", "grpc") == "otlp_http" and (
+            args.get("http_encoding", "protobuf"),
+            args.get("compression", "none"),
+        ) != ("protobuf", "none"):
+            return None
+        corpus = self.get_corpus(args)
+        with self.corpus_lock:
+            if self.timestamp_layout is None:
+                offsets = [find_timestamps(p, spec) for p in corpus.payloads]
+                latest = [
+                    latest_timestamp(p, o) for p, o in zip(corpus.payloads, offsets)
+                ]
+                self.timestamp_layout = (offsets, latest)
+            return Restamper(corpus.payloads, *self.timestamp_layout)
+
+    def otlp_endpoints(self, args: dict) -> List[str]:
+        """
+        Return the OTLP endpoints of a run, for its transport: the run's
+        otlp_endpoint or otlp_http_endpoint (as calibrate sets), else its
+        endpoints, else OTLP_ENDPOINT or OTLP_HTTP_ENDPOINT. Each can be a
+        comma separated list.
+        """
+        if args.get("transport", "grpc") == "otlp_http":
+            override = args.get("otlp_http_endpoint")
+            default = os.getenv("OTLP_HTTP_ENDPOINT", "http://localhost:4318")
+        else:
+            override = args.get("otlp_endpoint")
+            default = os.getenv("OTLP_ENDPOINT", "localhost:4317")
+        return parse_endpoints(override or args.get("endpoints") or default)
+
+    def endpoint_balancer(self, thread_id: int, args: dict) -> EndpointBalancer:
+        """
+        Create the balancer a worker picks the endpoint of each export with.
+        Balancers of the same process share their counts of exports in
+        flight, and the lock guarding them.
+        """
+        count = len(self.otlp_endpoints(args))
+        with self.lock:
+            if len(self.outstanding) != count:
+                self.outstanding = [0] * count
+            outstanding = self.outstanding
+        return EndpointBalancer(
+            count,
+            args.get("endpoint_policy", "round_robin"),
+            thread_id,
+            outstanding,
+            self.outstanding_lock,
+        )
+
+    def http_exporter(
+        self, args: dict, endpoint: Optional[str] = None
+    ) -> otlp_http.HttpExporter:
+        """
+        Create a worker's OTLP/HTTP exporter for the load type, posting to
+        the endpoint base URL, or the run's first endpoint.
+        """
+        return otlp_http.HttpExporter(
+            endpoint or self.otlp_endpoints(args)[0],
+            otlp_http.OTLP_HTTP_PATHS[args.get("load_type", "otlp")],
+            encoding=args.get("http_encoding", "protobuf"),
+            compression=args.get("compression", "none"),
+        )
+
+    def balanced_exporter(self, thread_id: int, args: dict, counters) -> tuple:
+        """
+        Create a worker's blocking OTLP export function, export(payload,
+        items), which sends each payload to the endpoint the worker's
+        balancer picks and counts it in that endpoint's counters, and the
+        function that closes its connections.
+        """
+        balancer = self.endpoint_balancer(thread_id, args)
+        endpoints = self.otlp_endpoints(args)
+        exporters = {
+            i: self.otlp_exporter(args, endpoints[i]) for i in balancer.candidates()
+        }
+
+        def export(payload, items: int) -> None:
+            target = balancer.acquire()
+            start = time.perf_counter()
+            try:
+                exporters[target][0](payload)
+            except Exception:
+                counters[ENDPOINT_FAILED + target] += items
+                raise
+            finally:
+                balancer.release(target)
+            elapsed = time.perf_counter() - start
+            counters[ENDPOINT_SENT + target] += items
+            counters[ENDPOINT_REQUESTS + target] += 1
+            counters[ENDPOINT_LATENCY_US + target] += int(elapsed * 1e6)
+
+        def close() -> None:
+            for _, close_exporter in exporters.values():
+                close_exporter()
+
+        return export, close
+
+    def otlp_exporter(self, args: dict, endpoint: Optional[str] = None) -> tuple:
+        """
+        Create a blocking OTLP export function for the configured transport,
+        on its own connection to the endpoint (or the run's first endpoint),
+        and the function that closes it.
+        """
+        if args.get("transport", "grpc") == "otlp_http":
+            http_exporter = self.http_exporter(args, endpoint)
+            return http_exporter.export, http_exporter.close
+        endpoint = endpoint or self.otlp_endpoints(args)[0]
+        channel = grpc.insecure_channel(
+            endpoint,
+            options=self.grpc_channel_options(args),
+            compression=self.grpc_compression(args),
+        )
+        export = self.export_callable(channel, args.get("load_type", "otlp"))
+        return export, channel.close
+
+    def export_callable(self, channel, load_type: str = "otlp"):
+        """
+        Create an Export call on the channel that sends pre-serialized bytes.
+
+        Passing no request serializer makes gRPC send the payload as-is,
+        skipping the per-call protobuf encoding done by the generated stub.
+        """
+        method, response_type = OTLP_EXPORT_METHODS[load_type]
+        return channel.unary_unary(
+            method,
+            request_serializer=None,
+            response_deserializer=response_type.FromString,
+        )
+
+    def retry_queue(self, args: dict) -> Optional[RetryQueue]:
+        """
+        Create a worker's retry queue, or return None when retry_on_failure
+        is off.
+        """
+        if not args.get("retry_on_failure"):
+            return None
+        return RetryQueue(
+            args.get("retry_queue_size", 100),
+            initial_interval=args.get("retry_initial_interval", 5.0),
+            max_interval=args.get("retry_max_interval", 30.0),
+            max_elapsed_time=args.get("retry_max_elapsed_time", 300.0),
+        )
+
+    def export_failed(
+        self,
+        thread_id: int,
+        counters,
+        retries: Optional[RetryQueue],
+        error: Exception,
+        index: int,
+        items: int,
+        retry: Optional[PendingRetry] = None,
+    ) -> None:
+        """
+        Account for a failed export of the corpus entry at index (or of a
+        retry of it): queue it for another attempt if retries are on and the
+        error is retryable, otherwise count its items as failed.
+        """
+        code, retry_after = (None, None)
+        if retries is not None:
+            code, retry_after = classify_error(error)
+        if retries is None or code is None:
+            print(f"Thread {thread_id}: Failed to send batch: {error}")
+            counters[FAILED] += items
+            return
+        outcome = retries.add(
+            index, items, code, time.perf_counter(), retry_after, retry
+        )
+        counters[RETRY_COUNTERS[outcome, code]] += 1
+        if outcome != RETRIED:
+            print(f"Thread {thread_id}: Dropped batch ({outcome}): {error}")
+            counters[FAILED] += items
+
+    def worker_thread(self, thread_id: int, args: dict) -> None:
+        """
+        Worker thread that sends batches of log records (or spans, data points)
+        to the OTLP endpoints.
+        """
         batch_size = args["batch_size"]
         thread_count = args["threads"]
         target_rate = args.get("target_rate")
@@ -204,66 +1997,509 @@ class LoadGenerator:
                 f"Thread {thread_id} started with rate limit: {thread_rate} "
                 f"logs/sec (interval: {batch_interval:.4f}s)"
             )
+        elif args.get("load_profile"):
+            batch_interval = None
+            print(
+                f"Thread {thread_id} started with load profile "
+                f"{args['load_profile']}"
+            )
         else:
             batch_interval = None
             print(f"Thread {thread_id} started with no rate limit")
 
-        log_batch = [
-            self.create_log_record(
-                body_size=args["body_size"],
-                num_attributes=args["num_attributes"],
-                attribute_value_size=args["attribute_value_size"],
+        corpus = self.get_corpus(args)
+        payloads = corpus.payloads
+        item_counts = corpus.item_counts
+        raw_sizes = corpus.raw_sizes
+        wire_sizes = corpus.wire_sizes
+        # gRPC only accepts bytes, so views over shared memory or a mapped
+        # file are copied on send. OTLP/HTTP sends restamped payloads
+        # straight from the worker's scratch buffer.
+        copy_payload = not corpus.bytes_backed
+        send_view = args.get("transport", "grpc") == "otlp_http"
+        restamper = self.restamper(args)
+        # Start each worker at a different entry so they don't send in step.
+        index = thread_id % len(payloads)
+
+        # Live counters, summed by get_metrics while the worker runs
+        counters = self.counter_slot(thread_id)
+        latency = self.latency_histogram(thread_id)
+        retries = self.retry_queue(args)
+        export, close = self.balanced_exporter(thread_id, args, counters)
+
+        def send(
+            index: int, intended: float, retry: Optional[PendingRetry] = None
+        ) -> None:
+            payload = payloads[index]
+            items = item_counts[index]
+            if restamper is not None:
+                payload = restamper.stamp(index, time.time_ns())
+                if not send_view:
+                    payload = bytes(payload)
+            elif copy_payload:
+                payload = bytes(payload)
+            try:
+                start = pacer.latency_start(intended)
+                export(payload, items)
+                latency.record(time.perf_counter() - start)
+                counters[SENT] += items
+                counters[BYTES_SENT] += raw_sizes[index]
+                counters[WIRE_BYTES_SENT] += wire_sizes[index]
+            except Exception as e:
+                self.export_failed(thread_id, counters, retries, e, index, items, retry)
+
+        pacer = self.pacer(args, batch_interval)
+        while not self.stop_event.is_set():
+            # Retries that are due go out ahead of the next new batch, on
+            # top of the paced load, with latency measured from their resend.
+            # Only a few per batch, so new batches keep to the pacer's rate.
+            if retries is not None:
+                for _ in range(RETRIES_PER_BATCH):
+                    retry = retries.pop_due(time.perf_counter())
+                    if retry is None:
+                        break
+                    send(retry.index, time.perf_counter(), retry)
+            # Wait for the next send slot. If we're not reaching the target
+            # rate (e.g. we're sending without sleep and it's still too
+            # slow), we increment a metric to inform observers.
+            intended, late = pacer.wait()
+            if self.stop_event.is_set():
+                break
+            if late:
+                counters[LATE_BATCHES] += 1
+            send(index, intended)
+            index = (index + 1) % len(payloads)
+
+        close()
+        if retries is not None:
+            # Batches still waiting for a retry are given up on.
+            counters[FAILED] += retries.drain()
+
+        # Fold the worker's counters into the run totals
+        self.release_counter_slot(counters)
+
+    def replay_worker_thread(self, thread_id: int, args: dict) -> None:
+        """
+        Worker thread that replays its share of a recording (every threads-th
+        request) at the recorded times divided by replay_speed, looping over
+        the recording until stopped.
+
+        Each request is re-timestamped in the worker's scratch buffer just
+        before it is sent.
+        Latency is measured from the request's scheduled time, and a request
+        sent more than its gap to the worker's previous request (and at least
+        LATE_TOLERANCE) behind schedule counts as a late batch.
+        """
+        recording = self.get_recording(args)
+        corpus = recording.corpus
+        requests = range(thread_id, len(recording), args["threads"])
+        speed = args.get("replay_speed", 1.0)
+        if not requests:
+            print(f"Thread {thread_id}: No recorded requests to replay")
+            return
+        print(
+            f"Thread {thread_id} replaying {len(requests)} of {len(recording)} "
+            f"requests every {recording.period / speed:.3f}s"
+        )
+
+        counters = self.counter_slot(thread_id)
+        export, close = self.balanced_exporter(thread_id, args, counters)
+        latency = self.latency_histogram(thread_id)
+        restamper = Restamper(corpus.payloads, recording.timestamps, recording.latest)
+        send_view = args.get("transport", "grpc") == "otlp_http"
+
+        # Every worker, including those in other processes, replays on the
+        # clock of the run.
+        started_at = args.get("started_at", time.time())
+        start = time.perf_counter() - (time.time() - started_at)
+        previous: Optional[float] = None
+        schedule = (
+            (index, loop * recording.period + recording.offsets[index])
+            for loop in itertools.count()
+            for index in requests
+        )
+        for index, offset in schedule:
+            intended = start + offset / speed
+            wait = intended - time.perf_counter()
+            if wait > 0:
+                self.stop_event.wait(wait)
+            if self.stop_event.is_set():
+                break
+            behind = time.perf_counter() - intended
+            if previous is not None and behind > max(
+                intended - previous, LATE_TOLERANCE
+            ):
+                counters[LATE_BATCHES] += 1
+            previous = intended
+            items = corpus.item_counts[index]
+            payload: Union[bytes, memoryview] = restamper.stamp(index, time.time_ns())
+            if not send_view:
+                payload = bytes(payload)
+            try:
+                export(payload, items)
+                latency.record(time.perf_counter() - intended)
+                counters[SENT] += items
+                counters[BYTES_SENT] += corpus.raw_sizes[index]
+                counters[WIRE_BYTES_SENT] += corpus.wire_sizes[index]
+            except Exception as e:
+                print(f"Thread {thread_id}: Failed to send batch: {e}")
+                counters[FAILED] += items
+
+        close()
+
+        # Fold the worker's counters into the run totals
+        self.release_counter_slot(counters)
+
+    def async_worker_thread(self, thread_id: int, args: dict) -> None:
+        """
+        Worker thread that drives an asyncio event loop sending batches of log
+        records (or spans, data points) to an OTLP endpoint with up to
+        max_in_flight outstanding Export calls on its connection.
+        """
+        asyncio.run(self.async_worker(thread_id, args))
+
+    async def run_async_workers(self, args: dict) -> None:
+        """
+        Run every async worker of the load as a task on the current event loop.
+        """
+        await asyncio.gather(
+            *(self.async_worker(i, args) for i in range(args.get("threads", 4)))
+        )
+
+    async def async_worker(self, thread_id: int, args: dict) -> None:
+        """
+        Send log batches over a grpc.aio channel with a bounded in-flight window.
+
+        Each batch is issued as soon as a window slot is free (and the pacing
+        schedule allows), so a single connection is no longer limited to one
+        batch per round trip.
+
+        With the otlp_http transport, the blocking HTTP requests run on a
+        thread pool of max_in_flight threads sharing one connection pool per
+        endpoint.
+        """
+        batch_size = args["batch_size"]
+        thread_count = args["threads"]
+        target_rate = args.get("target_rate")
+        max_in_flight = args.get("max_in_flight", 1)
+
+        balancer = self.endpoint_balancer(thread_id, args)
+        endpoints = self.otlp_endpoints(args)
+        if args.get("transport", "grpc") == "otlp_http":
+            http_exporters = {
+                i: self.http_exporter(args, endpoints[i]) for i in balancer.candidates()
+            }
+            executor = concurrent.futures.ThreadPoolExecutor(max_in_flight)
+            loop = asyncio.get_running_loop()
+
+            async def export_to(target: int, payload) -> None:
+                await loop.run_in_executor(
+                    executor, http_exporters[target].export, payload
+                )
+
+            async def close() -> None:
+                executor.shutdown()
+                for http_exporter in http_exporters.values():
+                    http_exporter.close()
+
+        else:
+            channels = {
+                i: grpc.aio.insecure_channel(
+                    endpoints[i],
+                    options=self.grpc_channel_options(args),
+                    compression=self.grpc_compression(args),
+                )
+                for i in balancer.candidates()
+            }
+            load_type = args.get("load_type", "otlp")
+            exports = {
+                i: self.export_callable(channel, load_type)
+                for i, channel in channels.items()
+            }
+
+            async def export_to(target: int, payload) -> None:
+                await exports[target](payload)
+
+            async def close() -> None:
+                for channel in channels.values():
+                    await channel.close()
+
+        if target_rate:
+            thread_rate = target_rate / thread_count
+            batch_interval = batch_size / thread_rate
+            print(
+                f"Thread {thread_id} started with rate limit: {thread_rate} "
+                f"logs/sec (interval: {batch_interval:.4f}s, "
+                f"max in flight: {max_in_flight})"
+            )
+        elif args.get("load_profile"):
+            batch_interval = None
+            print(
+                f"Thread {thread_id} started with load profile "
+                f"{args['load_profile']} (max in flight: {max_in_flight})"
+            )
+        else:
+            batch_interval = None
+            print(
+                f"Thread {thread_id} started with no rate limit "
+                f"(max in flight: {max_in_flight})"
             )
-            for _ in range(batch_size)
-        ]
 
-        scope_logs = logs_pb2.ScopeLogs(log_records=log_batch)
-        resource_logs = logs_pb2.ResourceLogs(scope_logs=[scope_logs])
-        logs_request = logs_service_pb2.ExportLogsServiceRequest(
-            resource_logs=[resource_logs]
+        corpus = self.get_corpus(args)
+        payloads = corpus.payloads
+        item_counts = corpus.item_counts
+        raw_sizes = corpus.raw_sizes
+        wire_sizes = corpus.wire_sizes
+        copy_payload = not corpus.bytes_backed
+        restamper = self.restamper(args)
+        index = thread_id % len(payloads)
+
+        # Live counters, summed by get_metrics while the worker runs.
+        # Completion callbacks all run on this thread's event loop.
+        counters = self.counter_slot(thread_id)
+        latency = self.latency_histogram(thread_id)
+
+        retries = self.retry_queue(args)
+
+        async def export(payload, items: int) -> None:
+            # Same per-endpoint accounting as balanced_exporter
+            target = balancer.acquire()
+            start = time.perf_counter()
+            try:
+                await export_to(target, payload)
+            except Exception:
+                counters[ENDPOINT_FAILED + target] += items
+                raise
+            finally:
+                balancer.release(target)
+            elapsed = time.perf_counter() - start
+            counters[ENDPOINT_SENT + target] += items
+            counters[ENDPOINT_REQUESTS + target] += 1
+            counters[ENDPOINT_LATENCY_US + target] += int(elapsed * 1e6)
+
+        window = asyncio.Semaphore(max_in_flight)
+        pending: set = set()
+
+        async def send_batch(
+            index: int, intended: float, retry: Optional[PendingRetry] = None
+        ) -> None:
+            payload = payloads[index]
+            items = item_counts[index]
+            if restamper is not None:
+                # Copied out of the scratch buffer, which the next send
+                # reuses while this one is in flight
+                payload = bytes(restamper.stamp(index, time.time_ns()))
+            elif copy_payload:
+                payload = bytes(payload)
+            try:
+                start = pacer.latency_start(intended)
+                await export(payload, items)
+                latency.record(time.perf_counter() - start)
+                counters[SENT] += items
+                counters[BYTES_SENT] += raw_sizes[index]
+                counters[WIRE_BYTES_SENT] += wire_sizes[index]
+            except Exception as e:
+                self.export_failed(thread_id, counters, retries, e, index, items, retry)
+            finally:
+                window.release()
+
+        async def issue(
+            index: int, intended: float, retry: Optional[PendingRetry] = None
+        ) -> None:
+            await window.acquire()
+            task = asyncio.create_task(send_batch(index, intended, retry))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        pacer = self.pacer(args, batch_interval)
+        while not self.stop_event.is_set():
+            # Due retries are issued ahead of the next new batch, as in
+            # worker_thread.
+            if retries is not None:
+                for _ in range(RETRIES_PER_BATCH):
+                    retry = retries.pop_due(time.perf_counter())
+                    if retry is None:
+                        break
+                    await issue(retry.index, time.perf_counter(), retry)
+            # Same pacing as worker_thread, measured at issue time rather
+            # than completion time. In open mode, time spent waiting for a
+            # window slot counts towards the request's latency.
+            intended, late = await pacer.wait_async()
+            if self.stop_event.is_set():
+                break
+            if late:
+                counters[LATE_BATCHES] += 1
+            await issue(index, intended)
+            index = (index + 1) % len(payloads)
+
+        # Let in-flight requests complete so they are accounted for.
+        if pending:
+            await asyncio.gather(*pending)
+        await close()
+        if retries is not None:
+            counters[FAILED] += retries.drain()
+
+        # Fold the worker's counters into the run totals
+        self.release_counter_slot(counters)
+
+    def otap_worker_thread(self, thread_id: int, args: dict) -> None:
+        """
+        Worker thread that streams OTAP log batches over ArrowLogsService.
+
+        The stream stays open across batches, with up to max_in_flight
+        batches awaiting their BatchStatus ack. Logs count as sent when their
+        batch is acknowledged with an OK status, and as failed when it is
+        rejected or the stream ends before the ack arrives. A broken stream
+        is reopened until the run is stopped. With several endpoints, the
+        workers' streams are spread over them by worker.
+        """
+        endpoints = self.otlp_endpoints(args)
+        endpoint = endpoints[thread_id % len(endpoints)]
+
+        channel = grpc.insecure_channel(
+            endpoint,
+            options=self.grpc_channel_options(args),
+            compression=self.grpc_compression(args),
+        )
+        arrow_logs = channel.stream_stream(
+            otap.ARROW_LOGS_METHOD,
+            request_serializer=None,
+            response_deserializer=otap.decode_batch_status,
         )
 
-        # Accumulate metrics locally to avoid lock contention
-        total_sent = 0
-        total_failed = 0
-        total_bytes_sent = 0
-        total_late_batches = 0
+        batch_size = args["batch_size"]
+        thread_count = args["threads"]
+        target_rate = args.get("target_rate")
+        max_in_flight = args.get("max_in_flight", 1)
+
+        if target_rate:
+            thread_rate = target_rate / thread_count
+            batch_interval = batch_size / thread_rate
+            print(
+                f"Thread {thread_id} started with rate limit: {thread_rate} "
+                f"logs/sec (interval: {batch_interval:.4f}s, "
+                f"max in flight: {max_in_flight})"
+            )
+        elif args.get("load_profile"):
+            batch_interval = None
+            print(
+                f"Thread {thread_id} started with load profile "
+                f"{args['load_profile']} (max in flight: {max_in_flight})"
+            )
+        else:
+            batch_interval = None
+            print(
+                f"Thread {thread_id} started with no rate limit "
+                f"(max in flight: {max_in_flight})"
+            )
 
-        next_send_time = time.perf_counter()
+        corpus = self.get_corpus(args)
+        payloads = corpus.payloads
+        item_counts = corpus.item_counts
+        raw_sizes = corpus.raw_sizes
+        wire_sizes = corpus.wire_sizes
+        index = thread_id % len(payloads)
+
+        # Live counters, summed by get_metrics while the worker runs
+        counters = self.counter_slot(thread_id)
+        # Time from handing a batch to the stream until its ack arrives
+        latency = self.latency_histogram(thread_id)
+
+        pacer = self.pacer(args, batch_interval)
         while not self.stop_event.is_set():
+            window = threading.Semaphore(max_in_flight)
+            # batch_id -> (items, bytes, wire bytes, send time) of batches
+            # awaiting their ack
+            pending: dict = {}
+            call: list = []
+
+            def batches():
+                # Runs on a gRPC thread, feeding the stream until stopped.
+                nonlocal index
+                batch_id = 0
+                while not self.stop_event.is_set():
+                    if not window.acquire(timeout=0.1):
+                        continue
+                    # The schedule doesn't move while the window is full, so
+                    # in open mode that wait counts towards ack latency.
+                    intended, late = pacer.wait()
+                    if self.stop_event.is_set():
+                        window.release()
+                        break
+                    if late:
+                        counters[LATE_BATCHES] += 1
+                    payload = payloads[index]
+                    if batch_id == 0:
+                        # The first batch of a stream carries the schemas.
+                        payload = otap.with_stream_schemas(payload)
+                    message = otap.batch_arrow_records(batch_id, payload)
+                    # Framing and schemas are added to the entry uncompressed.
+                    overhead = len(message) - len(payloads[index])
+                    pending[batch_id] = (
+                        item_counts[index],
+                        overhead + raw_sizes[index],
+                        overhead + wire_sizes[index],
+                        pacer.latency_start(intended),
+                    )
+                    index = (index + 1) % len(payloads)
+                    batch_id += 1
+                    yield message
+
+                # Closing the request side lets the receiver finish acking.
+                # Don't wait forever on one that never does.
+                if call:
+                    timer = threading.Timer(OTAP_DRAIN_TIMEOUT, call[0].cancel)
+                    timer.daemon = True
+                    timer.start()
+
             try:
-                stub.Export(logs_request)
-                total_sent += args["batch_size"]
-                total_bytes_sent += logs_request.ByteSize()
-            except Exception as e:
-                print(f"Thread {thread_id}: Failed to send log batch: {e}")
-                total_failed += args["batch_size"]
-
-            # If we're targeting a specific rate we do additional calculations
-            # to ensure we're not exceeding it via sleep. If we're not reaching
-            # the target rate (e.g. we're sending without sleep and it's
-            # still too slow), we increment a metric to inform observers.
-            if batch_interval:
-                now = time.perf_counter()
-                sleep_time = next_send_time - now
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                elif now - next_send_time > batch_interval:
-                    # More than 1 interval behind
-                    total_late_batches += 1
-                next_send_time += batch_interval
-
-        # Update global metrics once when thread exits
-        if total_sent > 0 or total_failed > 0 or total_late_batches > 0:
-            updates = {}
-            if total_sent > 0:
-                updates["sent"] = total_sent
-                updates["bytes_sent"] = total_bytes_sent
-            if total_failed > 0:
-                updates["failed"] = total_failed
-            if total_late_batches > 0:
-                updates["late_batches"] = total_late_batches
-            self.update_metrics(**updates)
+                responses = arrow_logs(batches())
+                call.append(responses)
+                for batch_id, status_code, message in responses:
+                    ack_time = time.perf_counter()
+                    items, size, wire_size, sent_at = pending.pop(
+                        batch_id, (0, 0, 0, ack_time)
+                    )
+                    window.release()
+                    if status_code == otap.STATUS_OK:
+                        latency.record(ack_time - sent_at)
+                        counters[SENT] += items
+                        counters[BYTES_SENT] += size
+                        counters[WIRE_BYTES_SENT] += wire_size
+                    else:
+                        print(
+                            f"Thread {thread_id}: Batch {batch_id} rejected "
+                            f"with status {status_code}: {message}"
+                        )
+                        counters[FAILED] += items
+            except grpc.RpcError as e:
+                if not self.stop_event.is_set():
+                    print(f"Thread {thread_id}: Arrow stream failed: {e}")
+
+            # Batches left without an ack when the stream ended are lost.
+            counters[FAILED] += sum(items for items, *_ in pending.values())
+            if not self.stop_event.is_set():
+                self.stop_event.wait(1)
+
+        channel.close()
+
+        # Fold the worker's counters into the run totals
+        self.release_counter_slot(counters)
+
+    def syslog_socket(self, thread_id: int, kind: int, args: dict) -> socket.socket:
+        """
+        Create a syslog socket, with its send buffer sized if configured.
+        """
+        sock = socket.socket(socket.AF_INET, kind)
+        send_buffer = args.get("syslog_send_buffer")
+        if send_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer)
+        recv_buf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        send_buf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        print(
+            f"Thread {thread_id}: Send buffer: {send_buf} bytes, Recv buffer: {recv_buf} bytes"
+        )
+        return sock
 
     def syslog_tcp_worker_thread(self, thread_id: int, args: dict) -> None:
         """
@@ -273,7 +2509,7 @@ class LoadGenerator:
         syslog_port = int(os.getenv("SYSLOG_PORT", "514"))
 
         # Create TCP socket for syslog
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock = self.syslog_socket(thread_id, socket.SOCK_STREAM, args)
         sock.settimeout(5)
 
         try:
@@ -295,6 +2531,12 @@ class LoadGenerator:
                 f"Thread {thread_id} started with rate limit: {thread_rate} "
                 f"logs/sec (interval: {batch_interval:.4f}s)"
             )
+        elif args.get("load_profile"):
+            batch_interval = None
+            print(
+                f"Thread {thread_id} started with load profile "
+                f"{args['load_profile']}"
+            )
         else:
             batch_interval = None
             print(f"Thread {thread_id} started with no rate limit")
@@ -302,74 +2544,58 @@ class LoadGenerator:
         hostname = socket.gethostname()
 
         # Pre-generate syslog messages batch (similar to OTLP log_batch)
-        syslog_batch = []
-        for _ in range(batch_size):
-            syslog_message = self.create_syslog_message(
-                hostname=hostname,
-                body_size=args["body_size"]
-            )
-            syslog_batch.append(syslog_message)
+        syslog_batch = self.create_syslog_batch(
+            hostname=hostname,
+            batch_size=batch_size,
+            body_size=args["body_size"],
+            syslog_format=args.get("syslog_format", "rfc3164"),
+            framing=args.get("syslog_framing", "newline"),
+        )
 
         # Combine all messages into a single buffer for efficient sending
         batch_buffer = b''.join(syslog_batch)
         batch_total_size = len(batch_buffer)
 
-        # Accumulate metrics locally to avoid lock contention
-        total_sent = 0
-        total_failed = 0
-        total_bytes_sent = 0
-        total_late_batches = 0
+        # Live counters, summed by get_metrics while the worker runs
+        counters = self.counter_slot(thread_id)
 
-        next_send_time = time.perf_counter()
+        pacer = self.pacer(args, batch_interval)
         while not self.stop_event.is_set():
+            _, late = pacer.wait()
+            if self.stop_event.is_set():
+                break
+            if late:
+                counters[LATE_BATCHES] += 1
             try:
                 sock.sendall(batch_buffer)
-                total_sent += args["batch_size"]
-                total_bytes_sent += batch_total_size
+                counters[SENT] += args["batch_size"]
+                counters[BYTES_SENT] += batch_total_size
+                counters[WIRE_BYTES_SENT] += batch_total_size
             except Exception as e:
                 print(f"Thread {thread_id}: Failed to send syslog batch: {e}")
-                total_failed += args["batch_size"]
+                counters[FAILED] += args["batch_size"]
                 # Try to reconnect
                 try:
                     sock.close()
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock = self.syslog_socket(thread_id, socket.SOCK_STREAM, args)
                     sock.settimeout(5)
                     sock.connect((syslog_server, syslog_port))
                 except Exception as reconnect_error:
                     print(f"Thread {thread_id}: Reconnection failed: {reconnect_error}")
                     break
 
-            # If we're targeting a specific rate we do additional calculations
-            # to ensure we're not exceeding it via sleep. If we're not reaching
-            # the target rate (e.g. we're sending without sleep and it's
-            # still too slow), we increment a metric to inform observers.
-            if batch_interval:
-                now = time.perf_counter()
-                sleep_time = next_send_time - now
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                elif now - next_send_time > batch_interval:
-                    # More than 1 interval behind
-                    total_late_batches += 1
-                next_send_time += batch_interval
-
-        # Update global metrics once when thread exits
-        if total_sent > 0 or total_failed > 0 or total_late_batches > 0:
-            updates = {}
-            if total_sent > 0:
-                updates["sent"] = total_sent
-                updates["bytes_sent"] = total_bytes_sent
-            if total_failed > 0:
-                updates["failed"] = total_failed
-            if total_late_batches > 0:
-                updates["late_batches"] = total_late_batches
-            self.update_metrics(**updates)
+        # Fold the worker's counters into the run totals
+        self.release_counter_slot(counters)
 
         sock.close()
 
     def syslog_udp_worker_thread(self, thread_id: int, args: dict) -> None:
         """
         Worker thread that sends syslog messages to a syslog server via UDP.
+
+        Each batch is sent with sendmmsg where available. When the socket send
+        buffer is full the worker waits for it to drain rather than dropping
+        messages.
         """
         syslog_server = os.getenv("SYSLOG_SERVER", "localhost")
         syslog_port = int(os.getenv("SYSLOG_PORT", "514"))
@@ -377,13 +2603,8 @@ class LoadGenerator:
         print(f"Thread {thread_id}: Using UDP transport to syslog server {syslog_server}:{syslog_port}")
 
         # Create UDP socket for syslog
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        # TODO: We need to find the right values
-        # sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024*1024)
+        sock = self.syslog_socket(thread_id, socket.SOCK_DGRAM, args)
         sock.setblocking(False)
-        recv_buf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
-        send_buf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
-        print(f"Thread {thread_id}: UDP Send buffer: {send_buf} bytes, Recv buffer: {recv_buf} bytes")
 
         batch_size = args["batch_size"]
         thread_count = args["threads"]
@@ -396,63 +2617,62 @@ class LoadGenerator:
                 f"Thread {thread_id} started with rate limit: {thread_rate} "
                 f"logs/sec (interval: {batch_interval:.4f}s)"
             )
+        elif args.get("load_profile"):
+            batch_interval = None
+            print(
+                f"Thread {thread_id} started with load profile "
+                f"{args['load_profile']}"
+            )
         else:
             batch_interval = None
             print(f"Thread {thread_id} started with no rate limit")
 
         hostname = socket.gethostname()
 
-        # Pre-generate syslog messages batch
-        syslog_batch = []
-        for _ in range(batch_size):
-            syslog_message = self.create_syslog_message(
-                hostname=hostname,
-                body_size=args["body_size"],
-            )
-            syslog_batch.append(syslog_message)
+        # Pre-generate syslog messages batch. A datagram holds one message, so
+        # octet counting is left to stream transports.
+        framing = args.get("syslog_framing", "newline")
+        syslog_batch = self.create_syslog_batch(
+            hostname=hostname,
+            batch_size=batch_size,
+            body_size=args["body_size"],
+            syslog_format=args.get("syslog_format", "rfc3164"),
+            framing="newline" if framing == "newline" else None,
+        )
+        sender = DatagramSender(
+            sock, (syslog_server, syslog_port), syslog_batch, stop_event=self.stop_event
+        )
+        print(
+            f"Thread {thread_id}: Sending batches with "
+            f"{'sendmmsg' if sender.batched else 'sendto'}"
+        )
 
-        # Accumulate metrics locally to avoid lock contention
-        total_sent = 0
-        total_failed = 0
-        total_bytes_sent = 0
-        total_late_batches = 0
+        # Live counters, summed by get_metrics while the worker runs
+        counters = self.counter_slot(thread_id)
 
-        next_send_time = time.perf_counter()
+        pacer = self.pacer(args, batch_interval)
         while not self.stop_event.is_set():
-            # UDP: Send individual messages instead of single batch of messages
-            for message in syslog_batch:
-                try:
-                    bytes_sent = sock.sendto(message, (syslog_server, syslog_port))
-                    total_sent += 1
-                    total_bytes_sent += bytes_sent
-                except Exception as e:
-                    total_failed += 1
-                    # Only print first few errors to avoid spam
-                    if total_failed <= 3:
-                        print(f"Thread {thread_id}: Failed to send syslog message via UDP: {e}")
-
             # Rate limiting logic
-            if batch_interval:
-                now = time.perf_counter()
-                sleep_time = next_send_time - now
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                elif now - next_send_time > batch_interval:
-                    # More than 1 interval behind
-                    total_late_batches += 1
-                next_send_time += batch_interval
-
-        # Update global metrics once when thread exits
-        if total_sent > 0 or total_failed > 0 or total_late_batches > 0:
-            updates = {}
-            if total_sent > 0:
-                updates["sent"] = total_sent
-                updates["bytes_sent"] = total_bytes_sent
-            if total_failed > 0:
-                updates["failed"] = total_failed
-            if total_late_batches > 0:
-                updates["late_batches"] = total_late_batches
-            self.update_metrics(**updates)
+            _, late = pacer.wait()
+            if self.stop_event.is_set():
+                break
+            if late:
+                counters[LATE_BATCHES] += 1
+            sent, sent_bytes, failed = sender.send_batch()
+            counters[SENT] += sent
+            counters[BYTES_SENT] += sent_bytes
+            counters[WIRE_BYTES_SENT] += sent_bytes
+            if failed:
+                # Only print first few errors to avoid spam
+                if counters[FAILED] < 3:
+                    print(
+                        f"Thread {thread_id}: Failed to send syslog message "
+                        f"via UDP: {sender.last_error}"
+                    )
+                counters[FAILED] += failed
+
+        # Fold the worker's counters into the run totals
+        self.release_counter_slot(counters)
 
         sock.close()
         print(f"Thread {thread_id}: Syslog UDP worker exiting")
@@ -461,24 +2681,40 @@ class LoadGenerator:
         self,
         hostname: str,
         body_size: int = 25,
+        syslog_format: str = "rfc3164",
+        framing: Optional[str] = "newline",
     ) -> bytes:
         """
         Create a single syslog message with structure similar to OTLP log record.
         """
-        # Pre-generate static parts of the message
-        pri = "<134>"  # local0.info = 16*8+6 = 134
-        tag = "loadgen"
-
-        # Generate timestamp (RFC3164 format with space-padded day)
-        utc_time = dt.now(timezone.utc)
-        day = utc_time.day
-        timestamp = utc_time.strftime(f"%b {day:2d} %H:%M:%S")
+        header = syslog_header(syslog_format, hostname, dt.now(timezone.utc))
 
         # Create log message body (similar to OTLP body)
         log_message = self.generate_random_string(body_size)
 
-        syslog_message = f"{pri}{timestamp} {hostname} {tag}: {log_message}\n"
-        return syslog_message.encode('utf-8')
+        return frame(header + log_message.encode("utf-8"), framing)
+
+    def create_syslog_batch(
+        self,
+        hostname: str,
+        batch_size: int,
+        body_size: int = 25,
+        syslog_format: str = "rfc3164",
+        framing: Optional[str] = "newline",
+    ) -> list:
+        """
+        Create batch_size syslog messages in the format of create_syslog_message.
+
+        The header is formatted once for the batch and all bodies are cut
+        from a single random buffer.
+        """
+        header = syslog_header(syslog_format, hostname, dt.now(timezone.utc))
+
+        bodies = self.generate_random_string(batch_size * body_size).encode("ascii")
+        return [
+            frame(header + bodies[i : i + body_size], framing)
+            for i in range(0, batch_size * body_size, body_size)
+        ]
 
     def run_loadgen(self, args_dict):
         """
@@ -486,11 +2722,42 @@ class LoadGenerator:
         Chooses between OTLP and syslog workers based on configuration.
         """
         with self.lock:
-            self.metrics.update({"sent": 0, "failed": 0, "bytes_sent": 0})
+            self.metrics.update(
+                {"sent": 0, "failed": 0, "bytes_sent": 0, "wire_bytes_sent": 0}
+            )
+            self.metrics.update(dict.fromkeys(RETRY_COUNTER_NAMES, 0))
+            self.metrics.update(dict.fromkeys(ENDPOINT_COUNTER_NAMES, 0))
+            self.latency_histograms = []
+            self.corpus = None
+            self.recording = None
+            self.timestamp_layout = None
+            self.cpu_placement = {}
+            self.cpu_clocks = {}
+            self.cpu_usage = {}
+            self.workers_share_process = (
+                args_dict.get("workers", "threads") != "processes"
+            )
+            self.in_warmup = args_dict.get("warmup_seconds", 0) > 0
+            self.measure_from = 0.0
+            self.warmup_metrics = None
+            self.warmup_latency = None
+            self.endpoints = (
+                self.otlp_endpoints(args_dict)
+                if args_dict.get("load_type", "otlp") != "syslog"
+                else []
+            )
+            self.outstanding = []
 
         # Determine which worker thread to use based on configuration
         load_type = args_dict.get("load_type", "otlp").lower()
 
+        if load_type in OTLP_EXPORT_METHODS or load_type == "otap":
+            # Serialize the corpus once, up front, for all workers of the run.
+            self.get_corpus(args_dict)
+        if load_type == "replay":
+            # Read the recording's timing before the replay clock starts.
+            self.get_recording(args_dict)
+
         if load_type == "syslog":
             syslog_transport = os.getenv("SYSLOG_TRANSPORT", "udp").lower()
 
@@ -502,20 +2769,138 @@ class LoadGenerator:
                 worker_func = self.syslog_udp_worker_thread
             else:
                 worker_func = self.syslog_tcp_worker_thread
+        elif load_type == "otap":
+            worker_func = self.otap_worker_thread
+        elif load_type == "replay":
+            worker_func = self.replay_worker_thread
+        elif args_dict.get("sender", "sync") == "async":
+            worker_func = self.async_worker_thread
         else:
             worker_func = self.worker_thread
 
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=args_dict.get("threads", 4)
-        ) as executor:
-            futures = [
-                executor.submit(worker_func, i, args_dict)
-                for i in range(args_dict.get("threads", 4))
-            ]
-            concurrent.futures.wait(futures)
+        if args_dict.get("workers", "threads") != "processes":
+            # Worker threads can send as soon as they are created. Worker
+            # processes start the clock once they are ready.
+            args_dict = self.begin_run(args_dict)
+
+        if args_dict.get("workers", "threads") == "processes":
+            self.run_worker_processes(worker_func.__name__, args_dict)
+        elif worker_func == self.async_worker_thread:
+            # grpc.aio polls a single per-process completion queue, so all
+            # async workers share one event loop rather than one loop per
+            # thread. Use worker processes to spread them over more cores.
+            if args_dict.get("cpu_affinity"):
+                # The loop runs on this thread, on all of the workers' CPUs.
+                cpus = parse_cpu_list(args_dict["cpu_affinity"])
+                for i in range(args_dict.get("threads", 4)):
+                    self.pin_worker(i, args_dict, cpus)
+            # The event loop thread runs every worker, measured as worker 0.
+            self.run_measured(0, asyncio.run, self.run_async_workers(args_dict))
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=args_dict.get("threads", 4)
+            ) as executor:
+                futures = [
+                    executor.submit(self.run_pinned_worker, worker_func, i, args_dict)
+                    for i in range(args_dict.get("threads", 4))
+                ]
+                concurrent.futures.wait(futures)
 
         with self.lock:
             self.current_config["metrics"] = self.metrics.copy()
+            self.rate_schedule = None
+            # Release any shared memory or file mapping held by the corpus.
+            if self.corpus is not None:
+                self.corpus.close()
+                self.corpus = None
+            self.recording = None
+            self.timestamp_layout = None
+
+    def begin_run(self, args_dict: dict) -> dict:
+        """
+        Start the clock of a run once its corpus is built and its workers are
+        ready, returning the run's arguments with its started_at and
+        measure_from times.
+
+        Load profiles and replay timing run from started_at, which is the
+        agreed start time of a coordinated run, and the warmup ends
+        warmup_seconds after the start.
+        """
+        start_at = args_dict.get("start_at")
+        if start_at:
+            # Hold the workers until the agreed start time of a coordinated run.
+            self.stop_event.wait(max(0.0, start_at - time.time()))
+        now = time.time()
+        args_dict = {
+            **args_dict,
+            "started_at": start_at or now,
+            "measure_from": now + args_dict.get("warmup_seconds", 0),
+        }
+        with self.lock:
+            self.rate_schedule = self.target_rate_schedule(args_dict)
+            self.run_started_at = args_dict["started_at"]
+            self.measure_from = args_dict["measure_from"]
+        self.start_warmup(args_dict)
+        return args_dict
+
+    def run_worker_processes(self, worker_name: str, args_dict: dict) -> None:
+        """
+        Run each worker in its own OS process and aggregate their metrics.
+
+        Processes are spawned rather than forked so that no gRPC or Flask state
+        leaks into the children. Every process builds its own channel, which
+        keeps the tcp_connection_per_thread semantics per process. Metrics are
+        gathered through shared memory counters that get_metrics sums while
+        the run is in progress and that are folded into self.metrics at exit.
+        """
+        num_workers = args_dict.get("threads", 4)
+        ctx = multiprocessing.get_context("spawn")
+        counters = SharedCounters(num_workers, ctx)
+        run_start = RunStart(num_workers, ctx)
+        stop_event = ctx.Event()
+        corpus_handle = self.corpus.share() if self.corpus is not None else None
+        processes = [
+            ctx.Process(
+                target=process_worker_main,
+                args=(
+                    worker_name,
+                    i,
+                    args_dict,
+                    stop_event,
+                    counters,
+                    run_start,
+                    corpus_handle,
+                ),
+                name=f"loadgen-worker-{i}",
+                daemon=True,
+            )
+            for i in range(num_workers)
+        ]
+
+        with self.lock:
+            self.shared_counters = counters
+        for process in processes:
+            process.start()
+        run_start.wait_ready(processes, self.stop_event)
+        run_clock = self.begin_run(args_dict)
+        run_start.start(run_clock["started_at"], run_clock["measure_from"])
+
+        # Relay the stop request to the children, or return early if every
+        # worker exited on its own (e.g. failed to connect).
+        while any(process.is_alive() for process in processes):
+            if self.stop_event.wait(0.1):
+                stop_event.set()
+                break
+        for process in processes:
+            process.join()
+
+        with self.lock:
+            for key, amount in counters.totals().items():
+                self.metrics[key] += amount
+            self.latency_histograms.append(counters.latency())
+            self.cpu_placement.update(counters.cpu_placement())
+            self.cpu_usage.update(counters.cpu_usage())
+            self.shared_counters = None
 
     def start(self, config: LoadGenConfig):
         """
@@ -525,6 +2910,11 @@ class LoadGenerator:
 
         if self.controller_thread and self.controller_thread.is_alive():
             return {"error": "Load generation already running"}, 400
+        if config.cpu_affinity:
+            try:
+                check_cpus_available(parse_cpu_list(config.cpu_affinity))
+            except ValueError as e:
+                return {"error": str(e)}, 400
 
         self.stop_event.clear()
         with self.lock:
@@ -552,16 +2942,222 @@ class LoadGenerator:
             self.current_config["running"] = False
         return {"status": "stopped"}, 200
 
+    def counter_totals(self) -> dict:
+        """
+        Sum the counters of the current (or last) run, including the live
+        counters of running worker threads and the shared counters of any
+        worker processes that are still running.
+        """
+        with self.lock:
+            metrics = self.metrics.copy()
+            for slot in self.live_counters:
+                for name, amount in zip(COUNTER_NAMES, slot):
+                    metrics[name] += amount
+            if self.shared_counters is not None:
+                for key, amount in self.shared_counters.totals().items():
+                    metrics[key] += amount
+            return metrics
+
+    def measured_counters(self) -> Tuple[dict, dict]:
+        """
+        Split the counters of the current (or last) run into those of the
+        load sent since its warmup, and during it.
+        """
+        totals = self.counter_totals()
+        with self.lock:
+            in_warmup, warmup = self.in_warmup, self.warmup_metrics
+        if in_warmup:
+            return dict.fromkeys(totals, 0), totals
+        if warmup is not None:
+            return {name: totals[name] - warmup[name] for name in totals}, warmup
+        return totals, dict.fromkeys(totals, 0)
+
     def get_metrics(self):
         """
-        Get a copy of the current metrics.
+        Get a copy of the current metrics: the counters of the load sent
+        since the warmup, and of the load sent during it as warmup_*.
+        Per-endpoint counters are read with get_endpoint_metrics.
+        """
+        measured, warmup = self.measured_counters()
+        # Per-endpoint counters come last
+        metrics = {name: measured[name] for name in COUNTER_NAMES[:ENDPOINT_SENT]}
+        for name in WARMUP_COUNTER_NAMES:
+            metrics[name] = warmup[name[len("warmup_") :]]
+        return metrics
+
+    def get_endpoint_metrics(self) -> Dict[str, dict]:
+        """
+        Get the items sent and failed, and the number and total latency in
+        seconds of successful exports, of each endpoint of the current (or
+        last) run, since its warmup.
+        """
+        measured, _ = self.measured_counters()
+        with self.lock:
+            endpoints = list(self.endpoints)
+        return {
+            endpoint: {
+                "sent": measured[COUNTER_NAMES[ENDPOINT_SENT + i]],
+                "failed": measured[COUNTER_NAMES[ENDPOINT_FAILED + i]],
+                "export_latency_seconds_count": measured[
+                    COUNTER_NAMES[ENDPOINT_REQUESTS + i]
+                ],
+                "export_latency_seconds_sum": measured[
+                    COUNTER_NAMES[ENDPOINT_LATENCY_US + i]
+                ]
+                / 1e6,
+            }
+            for i, endpoint in enumerate(endpoints)
+        }
+
+    def latency_totals(self) -> LatencyHistogram:
+        """
+        Merge the export latency histograms of every worker of the current
+        (or last) run, including any running worker processes.
+        """
+        with self.lock:
+            histograms = list(self.latency_histograms)
+            if self.shared_counters is not None:
+                histograms.append(self.shared_counters.latency())
+        return LatencyHistogram.merged(histograms)
+
+    def get_latency(self) -> LatencyHistogram:
+        """
+        Get the export latency histogram of the current (or last) run,
+        without the requests sent during its warmup.
+        """
+        with self.lock:
+            in_warmup, warmup = self.in_warmup, self.warmup_latency
+        if in_warmup:
+            return LatencyHistogram()
+        latency = self.latency_totals()
+        if warmup is not None:
+            latency.subtract(warmup)
+        return latency
+
+    def get_measure_from(self) -> float:
+        """
+        Get the Unix time measurement of the current (or last) run started,
+        at the end of its warmup. 0 before the run's workers start.
+        """
+        with self.lock:
+            return self.measure_from
+
+    def get_cpu_placement(self) -> Dict[int, List[int]]:
+        """
+        Get the CPUs each pinned worker of the current (or last) run is on,
+        including those of worker processes.
+        """
+        with self.lock:
+            placement = dict(self.cpu_placement)
+            if self.shared_counters is not None:
+                placement.update(self.shared_counters.cpu_placement())
+        return placement
+
+    def get_cpu_usage(self) -> Dict[int, Tuple[float, float]]:
+        """
+        Get the (CPU seconds, wall seconds) each worker of the current (or
+        last) run has used: the CPU time of its thread, or of its process
+        for worker processes.
         """
         with self.lock:
-            return self.metrics.copy()
+            clocks = dict(self.cpu_clocks)
+            usage = dict(self.cpu_usage)
+            if self.shared_counters is not None:
+                usage.update(self.shared_counters.cpu_usage())
+        usage.update((worker_id, clock.read()) for worker_id, clock in clocks.items())
+        return usage
+
+    def get_cpu_headroom(self) -> Optional[float]:
+        """
+        Get the share of a CPU the busiest interpreter of the current (or
+        last) run left unused, averaged over the run. Close to 0 means the
+        load generator, not the pipeline, limited the load. None before any
+        worker has run.
+        """
+        return cpu_headroom(self.get_cpu_usage(), self.workers_share_process)
+
+    def calibrate(
+        self, config: LoadGenConfig, duration: float = CALIBRATION_SECONDS
+    ) -> Tuple[dict, int]:
+        """
+        Measure the load generator's own ceiling for a configuration.
+
+        The configured workers send as fast as they can, ignoring any target
+        rate or load profile, to a NullSink that acknowledges every request
+        at once. Throughput is measured over duration seconds, starting once
+        the corpus is built and the first batches are sent.
+        Returns a tuple of (response_dict, status_code).
+        """
+        if config.load_type not in CALIBRATION_LOAD_TYPES:
+            return {
+                "error": f"Calibration supports load types {CALIBRATION_LOAD_TYPES}"
+            }, 400
+        if self.controller_thread and self.controller_thread.is_alive():
+            return {"error": "Load generation already running"}, 400
+
+        args = {
+            **config.model_dump(),
+            "target_rate": None,
+            "load_profile": None,
+            "start_at": None,
+            "warmup_seconds": 0.0,
+        }
+        with NullSink() as sink:
+            args["otlp_endpoint"] = sink.grpc_endpoint
+            args["otlp_http_endpoint"] = sink.http_endpoint
+            self.stop_event.clear()
+            self.controller_thread = threading.Thread(
+                target=self.run_loadgen, args=(args,)
+            )
+            self.controller_thread.start()
+            while self.controller_thread.is_alive() and not self.get_metrics()["sent"]:
+                self.stop_event.wait(0.05)
+
+            before = self.get_metrics()
+            started = time.perf_counter()
+            self.stop_event.wait(duration)
+            after = self.get_metrics()
+            elapsed = time.perf_counter() - started
+            with self.corpus_lock:
+                corpus = self.corpus
+                items_per_batch = (
+                    sum(corpus.item_counts) / len(corpus) if corpus else 1.0
+                )
+            self.stop()
+
+        rates = {
+            name: (after[name] - before[name]) / elapsed
+            for name in ("sent", "bytes_sent", "wire_bytes_sent")
+        }
+        result = {
+            "status": "calibrated",
+            "duration": elapsed,
+            "items_per_second": rates["sent"],
+            "batches_per_second": rates["sent"] / items_per_batch,
+            "bytes_per_second": rates["bytes_sent"],
+            "wire_bytes_per_second": rates["wire_bytes_sent"],
+            "failed": after["failed"] - before["failed"],
+            "cpu_headroom": self.get_cpu_headroom(),
+        }
+        if not after["sent"]:
+            return {"error": "No batches were sent to the null sink", **result}, 500
+        return result, 200
+
+    def get_target_rate(self) -> float:
+        """
+        Get the current target rate in items per second, following the load
+        profile if there is one. 0 when no run is rate limited.
+        """
+        with self.lock:
+            schedule = self.rate_schedule
+            started_at = self.run_started_at
+        if schedule is None:
+            return 0.0
+        return schedule(time.time() - started_at)
 
 
 # Create a global LoadGenerator instance for the Flask app to use
-loadgen = LoadGenerator()
+loadgen: Union[LoadGenerator, Coordinator] = LoadGenerator()
 
 
 @app.route("/start", methods=["POST"])
@@ -578,6 +3174,23 @@ def start():
     return jsonify(resp), code
 
 
+@app.route("/calibrate", methods=["POST"])
+def calibrate():
+    try:
+        config_data = request.get_json()
+        duration = float(config_data.pop("duration", CALIBRATION_SECONDS))
+        config = LoadGenConfig(**config_data)
+    except ValidationError as e:
+        return jsonify({"error": e.errors()}), 400
+    except Exception:
+        return jsonify({"error": "Invalid JSON or missing data"}), 400
+    if duration <= 0:
+        return jsonify({"error": "duration must be greater than 0"}), 400
+
+    resp, code = loadgen.calibrate(config, duration)
+    return jsonify(resp), code
+
+
 @app.route("/stop", methods=["POST"])
 def stop():
     resp, code = loadgen.stop()
@@ -587,7 +3200,33 @@ def stop():
 @app.route("/metrics", methods=["GET"])
 def metrics_endpoint():
     metrics = loadgen.get_metrics()
-    lines = [f"{k} {v}" for k, v in metrics.items()]
+    # Retry counters are only listed for the status codes that occurred.
+    lines = [f"{k} {v}" for k, v in metrics.items() if v or "{" not in k]
+    lines.extend(
+        loadgen.get_latency().prometheus_lines(
+            "export_latency_seconds", "Export round-trip latency in seconds"
+        )
+    )
+    lines.append(f"target_rate {loadgen.get_target_rate()}")
+    for endpoint, endpoint_metrics in loadgen.get_endpoint_metrics().items():
+        for name, value in endpoint_metrics.items():
+            lines.append(f'endpoint_{name}{{endpoint="{endpoint}"}} {value}')
+    measure_from = loadgen.get_measure_from()
+    if measure_from:
+        lines.append(f"measurement_start_time_seconds {measure_from:.3f}")
+    for worker_id, cpus in sorted(loadgen.get_cpu_placement().items()):
+        lines.append(
+            f'worker_cpus{{worker="{worker_id}",cpus="{format_cpu_list(cpus)}"}} '
+            f"{len(cpus)}"
+        )
+    for worker_id, (cpu, wall) in sorted(loadgen.get_cpu_usage().items()):
+        lines.append(
+            f'worker_cpu_utilization{{worker="{worker_id}"}} '
+            f"{cpu / wall if wall else 0.0:.4f}"
+        )
+    headroom = loadgen.get_cpu_headroom()
+    if headroom is not None:
+        lines.append(f"cpu_headroom {headroom:.4f}")
     return "\n".join(lines), 200
 
 
@@ -617,9 +3256,36 @@ def main():
         default=FLASK_PORT,
         help=f"Server port to listen on (default {FLASK_PORT})",
     )
+    parser.add_argument(
+        "--coordinate",
+        type=str,
+        default=None,
+        help=(
+            "Comma separated base URLs of load generators (started with "
+            "--serve) to drive as one, instead of generating load here"
+        ),
+    )
+    parser.add_argument(
+        "--coordinate-start-delay",
+        type=float,
+        default=START_DELAY,
+        help=(
+            "Seconds from start to the common start time of coordinated load "
+            f"generators (default {START_DELAY})"
+        ),
+    )
     parser.add_argument(
         "--duration", type=int, default=15, help="Duration in seconds (default: 15)"
     )
+    parser.add_argument(
+        "--calibrate",
+        action="store_true",
+        help=(
+            "Measure the load generator's own ceiling for the configuration "
+            "against an in-process null sink, for --duration seconds "
+            "(default: False)"
+        ),
+    )
     parser.add_argument(
         "--body-size",
         type=int,
@@ -682,27 +3348,378 @@ def main():
         type=str,
         default=get_default_value("load_type"),
         help=(
-            "Load generation type: 'otlp' or 'syslog' (default "
-            f"{get_default_value('load_type')})"
+            "Load generation type: 'otlp', 'traces', 'metrics', 'otap', 'replay' "
+            "or 'syslog' "
+            f"(default {get_default_value('load_type')})"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=str,
+        default=get_default_value("workers"),
+        help=(
+            "Worker execution model: 'threads' or 'processes' (default "
+            f"{get_default_value('workers')})"
+        ),
+    )
+    parser.add_argument(
+        "--sender",
+        type=str,
+        default=get_default_value("sender"),
+        help=(
+            "OTLP sender implementation: 'sync' or 'async' (default "
+            f"{get_default_value('sender')})"
+        ),
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=get_default_value("max_in_flight"),
+        help=(
+            "Maximum outstanding Export calls per connection with the async "
+            "sender, or unacknowledged batches per stream with --load-type otap "
+            f"(default {get_default_value('max_in_flight')})"
+        ),
+    )
+    parser.add_argument(
+        "--transport",
+        type=str,
+        default=get_default_value("transport"),
+        help=(
+            "OTLP transport: 'grpc' (OTLP_ENDPOINT) or 'otlp_http' "
+            f"(OTLP_HTTP_ENDPOINT) (default {get_default_value('transport')})"
+        ),
+    )
+    parser.add_argument(
+        "--http-encoding",
+        type=str,
+        default=get_default_value("http_encoding"),
+        help=(
+            "OTLP/HTTP body encoding: 'protobuf' or 'json' "
+            f"(default {get_default_value('http_encoding')})"
+        ),
+    )
+    parser.add_argument(
+        "--compression",
+        type=str,
+        default=get_default_value("compression"),
+        help=(
+            "Payload compression: 'none', 'gzip' or 'zstd'. zstd needs the "
+            "otlp_http transport, or compresses Arrow IPC buffers for otap "
+            f"(default {get_default_value('compression')})"
+        ),
+    )
+    parser.add_argument(
+        "--corpus-size",
+        type=int,
+        default=get_default_value("corpus_size"),
+        help=(
+            "Number of distinct batches senders cycle through "
+            f"(default {get_default_value('corpus_size')})"
+        ),
+    )
+    parser.add_argument(
+        "--corpus-path",
+        type=str,
+        default=get_default_value("corpus_path"),
+        help=(
+            "File of length-delimited OTLP Export requests to use as the "
+            "corpus, or the recording to replay (default: generate one)"
+        ),
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=get_default_value("replay_speed"),
+        help=(
+            "Replay speed relative to the recorded timing "
+            f"(default {get_default_value('replay_speed')})"
+        ),
+    )
+    parser.add_argument(
+        "--fresh-timestamps",
+        action=argparse.BooleanOptionalAction,
+        default=get_default_value("fresh_timestamps"),
+        help=(
+            "Move the timestamps of every OTLP batch to its send time "
+            f"(default {get_default_value('fresh_timestamps')})"
+        ),
+    )
+    parser.add_argument(
+        "--spans-per-trace",
+        type=int,
+        default=get_default_value("spans_per_trace"),
+        help=(
+            "Number of spans in each trace with --load-type traces "
+            f"(default {get_default_value('spans_per_trace')})"
+        ),
+    )
+    parser.add_argument(
+        "--trace-depth",
+        type=int,
+        default=get_default_value("trace_depth"),
+        help=(
+            "Maximum depth of each trace's span tree "
+            f"(default {get_default_value('trace_depth')})"
+        ),
+    )
+    parser.add_argument(
+        "--span-events",
+        type=int,
+        default=get_default_value("span_events"),
+        help=f"Number of events per span (default {get_default_value('span_events')})",
+    )
+    parser.add_argument(
+        "--span-links",
+        type=int,
+        default=get_default_value("span_links"),
+        help=f"Number of links per span (default {get_default_value('span_links')})",
+    )
+    parser.add_argument(
+        "--data-shape",
+        type=str,
+        default=get_default_value("data_shape"),
+        help=(
+            "Shape of generated log batches: a preset ('k8s', 'wide' or "
+            "'structured'), inline JSON or a JSON file (default: random strings "
+            "of --body-size and --attribute-value-size)"
+        ),
+    )
+    parser.add_argument(
+        "--metric-mix",
+        type=str,
+        default=get_default_value("metric_mix"),
+        help=(
+            "Metric type weights as type=weight pairs, types being gauge, sum, "
+            "histogram and exponential_histogram "
+            f"(default {get_default_value('metric_mix')})"
+        ),
+    )
+    parser.add_argument(
+        "--metric-series",
+        type=int,
+        default=get_default_value("metric_series"),
+        help=(
+            "Number of distinct metric series with --load-type metrics "
+            f"(default {get_default_value('metric_series')})"
+        ),
+    )
+    parser.add_argument(
+        "--points-per-series",
+        type=int,
+        default=get_default_value("points_per_series"),
+        help=(
+            "Data points per series in each batch "
+            f"(default {get_default_value('points_per_series')})"
+        ),
+    )
+    parser.add_argument(
+        "--pacing",
+        type=str,
+        default=get_default_value("pacing"),
+        help=(
+            "Rate pacing with --target-rate: 'closed' or 'open' (fixed arrival "
+            "schedule, latency measured from the intended send time) "
+            f"(default {get_default_value('pacing')})"
+        ),
+    )
+    parser.add_argument(
+        "--arrivals",
+        type=str,
+        default=get_default_value("arrivals"),
+        help=(
+            "Open-loop arrival process: 'uniform' or 'poisson' "
+            f"(default {get_default_value('arrivals')})"
+        ),
+    )
+    parser.add_argument(
+        "--load-profile",
+        type=str,
+        default=get_default_value("load_profile"),
+        help=(
+            "Time-varying target rate overriding --target-rate, e.g. "
+            "'ramp:from=1000,to=100000,over=60', "
+            "'steps:start=10000,step=10000,every=30,count=10', "
+            "'spike:base=10000,peak=100000,every=60,for=5' or "
+            "'csv:path=rates.csv,scale=1,speed=1' "
+            f"(default {get_default_value('load_profile')})"
+        ),
+    )
+    parser.add_argument(
+        "--syslog-format",
+        type=str,
+        default=get_default_value("syslog_format"),
+        help=(
+            "Syslog message format: 'rfc3164' or 'rfc5424' "
+            f"(default {get_default_value('syslog_format')})"
+        ),
+    )
+    parser.add_argument(
+        "--syslog-framing",
+        type=str,
+        default=get_default_value("syslog_framing"),
+        help=(
+            "Syslog TCP framing: 'newline' or 'octet' (octet counting) "
+            f"(default {get_default_value('syslog_framing')})"
+        ),
+    )
+    parser.add_argument(
+        "--syslog-send-buffer",
+        type=int,
+        default=get_default_value("syslog_send_buffer"),
+        help=(
+            "SO_SNDBUF size in bytes for syslog sockets "
+            f"(default {get_default_value('syslog_send_buffer')}, the OS default)"
+        ),
+    )
+    parser.add_argument(
+        "--cpu-affinity",
+        type=str,
+        default=get_default_value("cpu_affinity"),
+        help=(
+            "CPUs to pin the workers to, e.g. '2-5,8' "
+            f"(default {get_default_value('cpu_affinity')}, not pinned)"
+        ),
+    )
+    parser.add_argument(
+        "--warmup-seconds",
+        type=float,
+        default=get_default_value("warmup_seconds"),
+        help=(
+            "Seconds at the start of the run counted apart from the results "
+            f"(default {get_default_value('warmup_seconds')})"
+        ),
+    )
+    parser.add_argument(
+        "--endpoints",
+        type=str,
+        default=get_default_value("endpoints"),
+        help=(
+            "Comma separated OTLP endpoints to spread the load over, e.g. "
+            "'host1:4317,host2:4317' (default: OTLP_ENDPOINT)"
+        ),
+    )
+    parser.add_argument(
+        "--endpoint-policy",
+        choices=ENDPOINT_POLICIES,
+        default=get_default_value("endpoint_policy"),
+        help=(
+            "How workers spread exports over the endpoints "
+            f"(default {get_default_value('endpoint_policy')})"
+        ),
+    )
+    parser.add_argument(
+        "--retry-on-failure",
+        action=argparse.BooleanOptionalAction,
+        default=get_default_value("retry_on_failure"),
+        help=(
+            "Retry batches rejected with a retryable status, with exponential "
+            f"backoff (default {get_default_value('retry_on_failure')})"
+        ),
+    )
+    parser.add_argument(
+        "--retry-queue-size",
+        type=int,
+        default=get_default_value("retry_queue_size"),
+        help=(
+            "Batches each worker holds for retry "
+            f"(default {get_default_value('retry_queue_size')})"
+        ),
+    )
+    parser.add_argument(
+        "--retry-initial-interval",
+        type=float,
+        default=get_default_value("retry_initial_interval"),
+        help=(
+            "Seconds before the first retry of a batch "
+            f"(default {get_default_value('retry_initial_interval')})"
+        ),
+    )
+    parser.add_argument(
+        "--retry-max-interval",
+        type=float,
+        default=get_default_value("retry_max_interval"),
+        help=(
+            "Upper bound on the backoff between retries, in seconds "
+            f"(default {get_default_value('retry_max_interval')})"
+        ),
+    )
+    parser.add_argument(
+        "--retry-max-elapsed-time",
+        type=float,
+        default=get_default_value("retry_max_elapsed_time"),
+        help=(
+            "Seconds after its first failure a batch is dropped "
+            f"(default {get_default_value('retry_max_elapsed_time')})"
         ),
     )
     args = parser.parse_args()
 
+    global loadgen
+    if args.coordinate:
+        endpoints = [e.strip() for e in args.coordinate.split(",") if e.strip()]
+        loadgen = Coordinator(endpoints, start_delay=args.coordinate_start_delay)
+        print(f"Coordinating {len(endpoints)} load generators: {args.coordinate}")
+
     if args.serve:
-        if is_port_in_use(FLASK_PORT):
-            raise RuntimeError(f"Port {FLASK_PORT} is already in use.")
+        if is_port_in_use(args.serve_port):
+            raise RuntimeError(f"Port {args.serve_port} is already in use.")
         app.run(host="0.0.0.0", port=args.serve_port)
         return
 
     print("Starting load generator with configuration:")
     print(f"- Duration: {args.duration} seconds")
+    if args.warmup_seconds:
+        print(f"- Warmup: {args.warmup_seconds} seconds")
     print(f"- Load type: {args.load_type}")
     print(f"- Batch size: {args.batch_size} logs")
     print(f"- Threads: {args.threads}")
-    print(f"- Target Rate: {args.target_rate}")
-    print(f"- Log body size: {args.body_size} characters")
-    print(f"- Attributes per log: {args.num_attributes}")
-    print(f"- Attribute value size: {args.attribute_value_size} characters")
+    print(f"- Workers: {args.workers}")
+    if args.cpu_affinity:
+        print(f"- CPU affinity: {args.cpu_affinity}")
+    print(f"- Sender: {args.sender} (max in flight: {args.max_in_flight})")
+    if args.transport == "otlp_http":
+        print(f"- Transport: otlp_http ({args.http_encoding})")
+    else:
+        print(f"- Transport: {args.transport}")
+    print(f"- Compression: {args.compression}")
+    if args.endpoints:
+        print(f"- Endpoints: {args.endpoints} ({args.endpoint_policy})")
+    print(f"- Corpus: {args.corpus_path or f'{args.corpus_size} batches'}")
+    if args.load_profile:
+        print(f"- Load profile: {args.load_profile}")
+    else:
+        print(f"- Target Rate: {args.target_rate}")
+    if args.target_rate or args.load_profile:
+        print(f"- Pacing: {args.pacing} loop ({args.arrivals} arrivals)")
+    if args.data_shape:
+        print(f"- Data shape: {args.data_shape}")
+    else:
+        print(f"- Log body size: {args.body_size} characters")
+        print(f"- Attributes per log: {args.num_attributes}")
+        print(f"- Attribute value size: {args.attribute_value_size} characters")
+    if args.load_type == "traces":
+        print(
+            f"- Traces: {args.spans_per_trace} spans, depth {args.trace_depth}, "
+            f"{args.span_events} events, {args.span_links} links per span"
+        )
+    if args.load_type == "metrics":
+        print(
+            f"- Metrics: {args.metric_mix}, {args.metric_series} series, "
+            f"{args.points_per_series} points per series"
+        )
+    if args.load_type == "syslog":
+        print(f"- Syslog: {args.syslog_format}, {args.syslog_framing} framing")
+    if args.load_type == "replay":
+        print(f"- Replay speed: {args.replay_speed}x")
+    elif args.load_type in OTLP_TIMESTAMP_FIELDS:
+        print(f"- Fresh timestamps: {args.fresh_timestamps}")
+    if args.retry_on_failure:
+        print(
+            f"- Retries: queue of {args.retry_queue_size} batches, backoff "
+            f"{args.retry_initial_interval}s to {args.retry_max_interval}s, "
+            f"for up to {args.retry_max_elapsed_time}s"
+        )
 
     config = LoadGenConfig(
         body_size=args.body_size,
@@ -712,9 +3729,58 @@ def main():
         threads=args.threads,
         target_rate=args.target_rate,
         load_type=args.load_type,
+        workers=args.workers,
+        sender=args.sender,
+        max_in_flight=args.max_in_flight,
+        transport=args.transport,
+        http_encoding=args.http_encoding,
+        compression=args.compression,
+        corpus_size=args.corpus_size,
+        corpus_path=args.corpus_path,
+        replay_speed=args.replay_speed,
+        fresh_timestamps=args.fresh_timestamps,
+        spans_per_trace=args.spans_per_trace,
+        trace_depth=args.trace_depth,
+        span_events=args.span_events,
+        span_links=args.span_links,
+        data_shape=args.data_shape,
+        metric_mix=args.metric_mix,
+        metric_series=args.metric_series,
+        points_per_series=args.points_per_series,
+        pacing=args.pacing,
+        arrivals=args.arrivals,
+        load_profile=args.load_profile,
+        syslog_format=args.syslog_format,
+        syslog_framing=args.syslog_framing,
+        syslog_send_buffer=args.syslog_send_buffer,
+        cpu_affinity=args.cpu_affinity,
+        warmup_seconds=args.warmup_seconds,
+        endpoints=args.endpoints,
+        endpoint_policy=args.endpoint_policy,
+        retry_on_failure=args.retry_on_failure,
+        retry_queue_size=args.retry_queue_size,
+        retry_initial_interval=args.retry_initial_interval,
+        retry_max_interval=args.retry_max_interval,
+        retry_max_elapsed_time=args.retry_max_elapsed_time,
     )
 
-    loadgen.start(config=config)
+    if args.calibrate:
+        resp, code = loadgen.calibrate(config, args.duration)
+        if code != 200:
+            print(f"Failed to calibrate: {resp}")
+            return
+        print(f'LOADGEN_MAX_ITEMS_PER_SECOND: {resp["items_per_second"]:.0f}')
+        print(f'LOADGEN_MAX_BATCHES_PER_SECOND: {resp["batches_per_second"]:.1f}')
+        print(f'LOADGEN_MAX_BYTES_PER_SECOND: {resp["bytes_per_second"]:.0f}')
+        print(f'LOADGEN_MAX_WIRE_BYTES_PER_SECOND: {resp["wire_bytes_per_second"]:.0f}')
+        if resp["cpu_headroom"] is not None:
+            print(f'LOADGEN_CPU_HEADROOM: {resp["cpu_headroom"]:.3f}')
+        return
+
+    resp, code = loadgen.start(config=config)
+    if code != 200:
+        print(f"Failed to start load generation: {resp}")
+        return
 
     try:
         time.sleep(args.duration)
@@ -723,9 +3789,37 @@ def main():
 
     loadgen.stop()
 
-    print(f'LOADGEN_LOGS_SENT: {loadgen.metrics.get("sent", 0)}')
-    print(f'LOADGEN_LOGS_FAILED: {loadgen.metrics.get("failed", 0)}')
-    print(f'LOADGEN_BYTES_SENT: {loadgen.metrics.get("bytes_sent", 0)} bytes')
+    metrics = loadgen.get_metrics()
+    print(f'LOADGEN_LOGS_SENT: {metrics.get("sent", 0)}')
+    print(f'LOADGEN_LOGS_FAILED: {metrics.get("failed", 0)}')
+    print(f'LOADGEN_BYTES_SENT: {metrics.get("bytes_sent", 0)} bytes')
+    print(f'LOADGEN_WIRE_BYTES_SENT: {metrics.get("wire_bytes_sent", 0)} bytes')
+    if args.warmup_seconds:
+        print(f'LOADGEN_WARMUP_LOGS_SENT: {metrics.get("warmup_sent", 0)}')
+        print(f"LOADGEN_MEASUREMENT_START: {loadgen.get_measure_from():.3f}")
+    if args.retry_on_failure:
+        for outcome in RETRY_OUTCOMES:
+            total = sum(
+                metrics.get(f'{outcome}{{code="{code}"}}', 0)
+                for code in RETRY_STATUS_CODES
+            )
+            print(f"LOADGEN_BATCHES_{outcome.upper()}: {total}")
+    for endpoint, counts in loadgen.get_endpoint_metrics().items():
+        exports = counts["export_latency_seconds_count"]
+        mean = counts["export_latency_seconds_sum"] / exports if exports else 0.0
+        print(
+            f'LOADGEN_ENDPOINT {endpoint}: {counts["sent"]} sent, '
+            f'{counts["failed"]} failed, {mean * 1000:.3f} ms mean latency'
+        )
+    headroom = loadgen.get_cpu_headroom()
+    if headroom is not None:
+        print(f"LOADGEN_CPU_HEADROOM: {headroom:.3f}")
+    latency = loadgen.get_latency()
+    if latency.count:
+        for suffix, q in LATENCY_QUANTILES.items():
+            print(
+                f"LOADGEN_LATENCY_{suffix.upper()}: {latency.quantile(q) * 1000:.3f} ms"
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+"""
+Null sink receiver for calibrating the load generator.
+
+A NullSink is a local OTLP receiver that acknowledges every Export call (and
+OTLP/HTTP request) as soon as it arrives, without decoding it. Running the
+load generator's workers against it, unthrottled, measures the load
+generator's own ceiling for a configuration: any run of the same
+configuration against a real pipeline that gets close to that ceiling was
+limited by the load generator rather than by the pipeline.
+
+The sink is served from its own process, so that its request handlers don't
+compete with thread workers for the GIL of the load generator's process.
+"""
+
+import concurrent.futures
+import multiprocessing
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc  # type: ignore
+
+# Handler threads of the sink's gRPC server
+SINK_THREADS = 16
+# Seconds to wait for the sink process to come up
+SINK_START_TIMEOUT = 30.0
+
+
+class _AckEveryCall(grpc.GenericRpcHandler):
+    """Answers every unary call with an empty (valid) protobuf response."""
+
+    def __init__(self):
+        self.handler = grpc.unary_unary_rpc_method_handler(
+            lambda request, context: b"",
+            request_deserializer=None,
+            response_serializer=None,
+        )
+
+    def service(self, handler_call_details):
+        return self.handler
+
+
+class _AckEveryPost(BaseHTTPRequestHandler):
+    """Drains every POST body and answers with an empty protobuf response."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_null_sink(conn, stop_event) -> None:
+    """
+    Serve the sink until stop_event is set, sending the gRPC and HTTP ports
+    it listens on over conn once it is ready.
+    """
+    server = grpc.server(
+        concurrent.futures.ThreadPoolExecutor(SINK_THREADS),
+        handlers=[_AckEveryCall()],
+    )
+    grpc_port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), _AckEveryPost)
+    http_server.daemon_threads = True
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    conn.send((grpc_port, http_server.server_address[1]))
+    stop_event.wait()
+    http_server.shutdown()
+    server.stop(grace=None)
+
+
+class NullSink:
+    """
+    A null sink running in a child process, used as a context manager.
+
+    Attributes:
+        grpc_endpoint: host:port of the sink's OTLP/gRPC receiver.
+        http_endpoint: Base URL of the sink's OTLP/HTTP receiver.
+    """
+
+    def __init__(self):
+        self.grpc_endpoint = ""
+        self.http_endpoint = ""
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._process = None
+
+    def start(self) -> None:
+        """Start the sink process and wait until it listens."""
+        parent_conn, child_conn = self._ctx.Pipe(duplex=False)
+        self._process = self._ctx.Process(
+            target=serve_null_sink,
+            args=(child_conn, self._stop_event),
+            name="loadgen-null-sink",
+            daemon=True,
+        )
+        self._process.start()
+        if not parent_conn.poll(SINK_START_TIMEOUT):
+            self.stop()
+            raise RuntimeError("Null sink failed to start")
+        grpc_port, http_port = parent_conn.recv()
+        self.grpc_endpoint = f"127.0.0.1:{grpc_port}"
+        self.http_endpoint = f"http://127.0.0.1:{http_port}"
+
+    def stop(self) -> None:
+        """Stop the sink process."""
+        if self._process is None:
+            return
+        self._stop_event.set()
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.kill()
+        self._process = None
+
+    def __enter__(self) -> "NullSink":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,287 @@
+"""
+OTAP (OpenTelemetry Protocol with Apache Arrow) encoding for the load generator.
+
+A batch of log records is encoded as two Arrow record batches: LOGS, with one
+row per log record, and LOG_ATTRS, with one row per attribute. Attribute keys
+and severity texts are dictionary-encoded. Both are sent as ArrowPayloads of a
+BatchArrowRecords message on the ArrowLogsService bidirectional stream.
+
+Each payload's record holds Arrow IPC stream messages. Receivers keep one IPC
+reader per schema_id for the life of a gRPC stream. The schema message is
+therefore sent once, in the first batch of a stream, and later batches carry
+only their dictionary and record batch messages. Every batch carries its own
+dictionaries, so the batches of a corpus can be sent in any order.
+
+Record and dictionary batch buffers can be zstd-compressed by the IPC writer,
+which receivers decompress transparently. The schema message is never
+compressed, so it is the same with or without buffer compression.
+
+The experimental Arrow protos are not part of opentelemetry-proto, so the
+BatchArrowRecords and BatchStatus messages are encoded by hand.
+"""
+
+import functools
+import io
+from typing import List, Sequence, Tuple
+
+import pyarrow as pa  # type: ignore
+
+from corpus import decode_varint, encode_varint, iter_fields
+
+ARROW_LOGS_METHOD = (
+    "/opentelemetry.proto.experimental.arrow.v1.ArrowLogsService/ArrowLogs"
+)
+
+# ArrowPayloadType values from arrow_service.proto
+PAYLOAD_TYPE_LOGS = 30
+PAYLOAD_TYPE_LOG_ATTRS = 31
+
+# BatchStatus StatusCode value of a successfully processed batch
+STATUS_OK = 0
+
+# AttributeValueType of string attribute values and log bodies
+ATTRIBUTE_TYPE_STR = 1
+
+# Largest batch the uint16 log record ids and attribute parent ids can address
+MAX_LOGS_BATCH_SIZE = 1 << 16
+
+# Largest number of attribute keys the uint8 key dictionary can index
+MAX_ATTRIBUTE_KEYS = 1 << 8
+
+# Ids use the default delta encoding, which every receiver decodes (the Go
+# receiver ignores the "plain" encoding field metadata).
+LOGS_SCHEMA = pa.schema(
+    [
+        pa.field("id", pa.uint16()),
+        pa.field("resource", pa.struct([pa.field("id", pa.uint16())])),
+        pa.field(
+            "scope",
+            pa.struct([pa.field("id", pa.uint16()), pa.field("name", pa.utf8())]),
+        ),
+        pa.field("time_unix_nano", pa.timestamp("ns"), nullable=False),
+        pa.field("observed_time_unix_nano", pa.timestamp("ns"), nullable=False),
+        pa.field("severity_number", pa.int32()),
+        pa.field("severity_text", pa.dictionary(pa.uint8(), pa.utf8())),
+        pa.field(
+            "body",
+            pa.struct([pa.field("type", pa.uint8()), pa.field("str", pa.utf8())]),
+        ),
+    ]
+)
+
+LOG_ATTRS_SCHEMA = pa.schema(
+    [
+        pa.field("parent_id", pa.uint16(), nullable=False),
+        pa.field("key", pa.dictionary(pa.uint8(), pa.utf8()), nullable=False),
+        pa.field("type", pa.uint8(), nullable=False),
+        pa.field("str", pa.utf8()),
+    ]
+)
+
+SCHEMAS = {
+    PAYLOAD_TYPE_LOGS: ("logs", LOGS_SCHEMA),
+    PAYLOAD_TYPE_LOG_ATTRS: ("log_attrs", LOG_ATTRS_SCHEMA),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def schema_message(payload_type: int) -> bytes:
+    """
+    Return the IPC schema message that opens the stream of a payload type.
+    """
+    return SCHEMAS[payload_type][1].serialize().to_pybytes()
+
+
+def ipc_record(
+    payload_type: int, record_batch: pa.RecordBatch, compression: str = "none"
+) -> bytes:
+    """
+    Serialize a record batch as IPC stream messages, without the schema.
+
+    A fresh writer is used for every batch so the output always starts with
+    the full dictionaries of the batch rather than deltas against the
+    previous one. With compression 'zstd' the buffers of the dictionary and
+    record batch messages are zstd-compressed.
+    """
+    options = pa.ipc.IpcWriteOptions(
+        compression="zstd" if compression == "zstd" else None
+    )
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, record_batch.schema, options=options) as writer:
+        writer.write_batch(record_batch)
+        data = sink.getvalue()
+    schema = schema_message(payload_type)
+    if not data.startswith(schema):
+        raise ValueError("Record batch schema does not match its payload type")
+    return data.removeprefix(schema)
+
+
+def encode_arrow_payload(payload_type: int, record: bytes) -> bytes:
+    """
+    Encode an ArrowPayload as a field of a BatchArrowRecords message.
+    """
+    schema_id = SCHEMAS[payload_type][0].encode()
+    message = b"".join(
+        (
+            b"\x0a",
+            encode_varint(len(schema_id)),
+            schema_id,
+            b"\x10",
+            encode_varint(payload_type),
+            b"\x1a",
+            encode_varint(len(record)),
+            record,
+        )
+    )
+    return b"\x12" + encode_varint(len(message)) + message
+
+
+def encode_logs_payloads(
+    bodies: Sequence[str],
+    attribute_keys: Sequence[str],
+    attribute_values: Sequence[str],
+    time_unix_nano: int,
+    severity_number: int,
+    severity_text: str,
+    compression: str = "none",
+) -> bytes:
+    """
+    Encode a batch of log records as the ArrowPayloads of a BatchArrowRecords.
+
+    attribute_values holds len(attribute_keys) string values per log record,
+    in record order. The result is sent on its own with batch_arrow_records,
+    or with with_stream_schemas as the first batch of a stream. compression
+    is passed on to ipc_record.
+    """
+    count = len(bodies)
+    if count > MAX_LOGS_BATCH_SIZE:
+        raise ValueError(f"OTAP log batches hold at most {MAX_LOGS_BATCH_SIZE} logs")
+    num_attributes = len(attribute_keys)
+    if num_attributes > MAX_ATTRIBUTE_KEYS:
+        raise ValueError(
+            f"OTAP log batches hold at most {MAX_ATTRIBUTE_KEYS} attribute keys"
+        )
+    # Delta encoded record ids 0, 1, 2, ...
+    ids = pa.array([0] + [1] * (count - 1) if count else [], pa.uint16())
+    zeros = pa.array([0] * count, pa.uint16())
+    timestamps = pa.array([time_unix_nano] * count, pa.timestamp("ns"))
+
+    logs = pa.record_batch(
+        [
+            ids,
+            pa.StructArray.from_arrays([zeros], fields=list(LOGS_SCHEMA[1].type)),
+            pa.StructArray.from_arrays(
+                [zeros, pa.array(["loadgen"] * count)],
+                fields=list(LOGS_SCHEMA[2].type),
+            ),
+            timestamps,
+            timestamps,
+            pa.array([severity_number] * count, pa.int32()),
+            pa.DictionaryArray.from_arrays(
+                pa.array([0] * count, pa.uint8()), pa.array([severity_text])
+            ),
+            pa.StructArray.from_arrays(
+                [
+                    pa.array([ATTRIBUTE_TYPE_STR] * count, pa.uint8()),
+                    pa.array(bodies, pa.utf8()),
+                ],
+                fields=list(LOGS_SCHEMA[7].type),
+            ),
+        ],
+        schema=LOGS_SCHEMA,
+    )
+
+    # Rows are grouped by key, as the Go producer sorts them. A parent id is
+    # stored as a delta from the previous row when both rows have the same
+    # key and value, the "quasi-delta" encoding receivers decode.
+    parent_ids: List[int] = []
+    key_indices: List[int] = []
+    values: List[str] = []
+    for key_index in range(num_attributes):
+        previous_value = None
+        previous_parent = 0
+        for parent in range(count):
+            value = attribute_values[parent * num_attributes + key_index]
+            if value == previous_value:
+                parent_ids.append(parent - previous_parent)
+            else:
+                parent_ids.append(parent)
+            previous_value = value
+            previous_parent = parent
+            key_indices.append(key_index)
+            values.append(value)
+
+    rows = len(values)
+    log_attrs = pa.record_batch(
+        [
+            pa.array(parent_ids, pa.uint16()),
+            pa.DictionaryArray.from_arrays(
+                pa.array(key_indices, pa.uint8()), pa.array(list(attribute_keys))
+            ),
+            pa.array([ATTRIBUTE_TYPE_STR] * rows, pa.uint8()),
+            pa.array(values, pa.utf8()),
+        ],
+        schema=LOG_ATTRS_SCHEMA,
+    )
+
+    return encode_arrow_payload(
+        PAYLOAD_TYPE_LOGS, ipc_record(PAYLOAD_TYPE_LOGS, logs, compression)
+    ) + encode_arrow_payload(
+        PAYLOAD_TYPE_LOG_ATTRS,
+        ipc_record(PAYLOAD_TYPE_LOG_ATTRS, log_attrs, compression),
+    )
+
+
+def batch_arrow_records(batch_id: int, payloads) -> bytes:
+    """
+    Build a serialized BatchArrowRecords from encoded ArrowPayloads.
+
+    Protobuf fields may appear in any order, so the batch id is simply
+    prepended to the pre-encoded payloads.
+    """
+    return b"".join((b"\x08", encode_varint(batch_id), payloads))
+
+
+def read_arrow_payload(buf, start: int, end: int) -> Tuple[int, bytes]:
+    """
+    Decode the ArrowPayload serialized in buf[start:end] into its payload
+    type and its record bytes.
+    """
+    payload_type, record = 0, b""
+    for field, _, value_start, value_end in iter_fields(buf, start, end):
+        if field == 2:
+            payload_type = decode_varint(buf, value_start)[0]
+        elif field == 3:
+            record = bytes(buf[value_start:value_end])
+    return payload_type, record
+
+
+def with_stream_schemas(payloads) -> bytes:
+    """
+    Prefix every ArrowPayload record with its schema message, as required
+    for the first batch sent on a stream.
+    """
+    out = []
+    for field, _, start, end in iter_fields(payloads, 0, len(payloads)):
+        if field != 2:
+            continue
+        payload_type, record = read_arrow_payload(payloads, start, end)
+        out.append(
+            encode_arrow_payload(payload_type, schema_message(payload_type) + record)
+        )
+    return b"".join(out)
+
+
+def decode_batch_status(data: bytes) -> Tuple[int, int, str]:
+    """
+    Decode a serialized BatchStatus into (batch_id, status_code, message).
+    """
+    batch_id, status_code, message = 0, STATUS_OK, b""
+    for field, _, start, end in iter_fields(data, 0, len(data)):
+        if field == 1:
+            batch_id = decode_varint(data, start)[0]
+        elif field == 2:
+            status_code = decode_varint(data, start)[0]
+        elif field == 3:
+            message = bytes(data[start:end])
+    return batch_id, status_code, message.decode("utf-8", "replace")
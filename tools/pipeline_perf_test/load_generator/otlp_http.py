@@ -0,0 +1,198 @@
+"""
+OTLP/HTTP export for the load generator.
+
+Request bodies are encoded once, as binary protobuf or OTLP JSON, and
+compressed once when the corpus is built (see corpus.compress). They are then
+POSTed as-is, with the matching Content-Encoding header. Each exporter keeps a pool
+of keep-alive connections, so steady-state sends reuse open TCP connections
+instead of paying a handshake per request.
+"""
+
+import base64
+import http.client
+import json
+import queue
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from google.protobuf import json_format  # type: ignore
+
+# Request path of each OTLP load type
+OTLP_HTTP_PATHS = {
+    "otlp": "/v1/logs",
+    "replay": "/v1/logs",
+    "traces": "/v1/traces",
+    "metrics": "/v1/metrics",
+}
+
+CONTENT_TYPES = {
+    "protobuf": "application/x-protobuf",
+    "json": "application/json",
+}
+
+# OTLP JSON carries trace and span ids as hex strings, not base64.
+HEX_ID_FIELDS = ("traceId", "spanId", "parentSpanId")
+
+
+class HttpExportError(Exception):
+    """Raised when an OTLP/HTTP export is answered with a non-2xx status."""
+
+    def __init__(self, status: int, reason: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header, in seconds or as an HTTP date, into the
+    seconds to wait. Returns None if it is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _hex_ids(value: Any) -> Any:
+    """
+    Rewrite the base64 ids of a json_format dict as hex, in place.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in HEX_ID_FIELDS and isinstance(item, str):
+                value[key] = base64.b64decode(item).hex()
+            else:
+                _hex_ids(item)
+    elif isinstance(value, list):
+        for item in value:
+            _hex_ids(item)
+    return value
+
+
+def to_otlp_json(message) -> bytes:
+    """
+    Encode an OTLP Export request as OTLP JSON.
+
+    Field names are lowerCamelCase, enums are integers and trace and span ids
+    are hex strings, as required by the OTLP/HTTP specification.
+    """
+    data = json_format.MessageToDict(message, use_integers_for_enums=True)
+    return json.dumps(_hex_ids(data), separators=(",", ":")).encode()
+
+
+def _base64_ids(value: Any) -> Any:
+    """
+    Rewrite the hex ids of an OTLP JSON dict as base64, in place.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in HEX_ID_FIELDS and isinstance(item, str):
+                value[key] = base64.b64encode(bytes.fromhex(item)).decode()
+            else:
+                _base64_ids(item)
+    elif isinstance(value, list):
+        for item in value:
+            _base64_ids(item)
+    return value
+
+
+def from_otlp_json(data, message_type):
+    """
+    Decode an OTLP JSON document into a message of message_type.
+    """
+    message = message_type()
+    json_format.ParseDict(_base64_ids(json.loads(data)), message)
+    return message
+
+
+def encode_body(message, encoding: str = "protobuf") -> bytes:
+    """
+    Encode an OTLP Export request as an uncompressed OTLP/HTTP request body.
+    """
+    if encoding == "json":
+        return to_otlp_json(message)
+    return message.SerializeToString()
+
+
+class HttpExporter:
+    """
+    POSTs pre-encoded OTLP request bodies over pooled keep-alive connections.
+
+    A connection is taken from the pool for each request and returned once
+    the response has been read in full, so the pool grows to the number of
+    concurrent exports and no further. Connections that fail or that the
+    server asks to close are dropped.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        path: str,
+        encoding: str = "protobuf",
+        compression: str = "none",
+        timeout: float = 30.0,
+    ):
+        url = urlsplit(endpoint)
+        self.https = url.scheme == "https"
+        self.host = url.hostname or "localhost"
+        self.port = url.port or (443 if self.https else 80)
+        self.path = url.path.rstrip("/") + path
+        self.timeout = timeout
+        self.headers = {"Content-Type": CONTENT_TYPES[encoding]}
+        if compression != "none":
+            self.headers["Content-Encoding"] = compression
+        self.pool: queue.LifoQueue = queue.LifoQueue()
+        self.connections_opened = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.connections_opened += 1
+        if self.https:
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def export(self, body) -> None:
+        """
+        Send one request body, raising HttpExportError on a non-2xx status.
+        """
+        try:
+            conn = self.pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            conn.request("POST", self.path, body=body, headers=self.headers)
+            response = conn.getresponse()
+            # The response must be drained before the connection is reused.
+            response.read()
+        except Exception:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self.pool.put(conn)
+        if not 200 <= response.status < 300:
+            raise HttpExportError(
+                response.status,
+                response.reason,
+                parse_retry_after(response.getheader("Retry-After")),
+            )
+
+    def close(self) -> None:
+        """
+        Close every pooled connection.
+        """
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
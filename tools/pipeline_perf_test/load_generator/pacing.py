@@ -0,0 +1,156 @@
+"""
+Send pacing for the load generator.
+
+A Pacer hands out send times on a fixed schedule, one batch interval apart on
+average. Workers call wait() before each send and are held until their slot.
+
+Two modes are supported:
+
+- closed: the schedule advances by exactly one interval per send and the
+    wait is a plain sleep. A slow send delays the ones after it, which then
+    go out back to back until the schedule is caught up. Latency is measured
+    from when a request actually leaves.
+- open: arrivals are uniform or Poisson distributed around the target rate,
+    waits sleep until shortly before the slot and then spin for
+    sub-millisecond precision, and latency is measured from the intended send
+    time. A stalled send then shows up in the latency of every request that
+    queued behind it, rather than being hidden by coordinated omission.
+
+The interval can also be a function of the time since the run started, to
+follow a load profile. Where it returns None the target rate is zero and the
+pacer idles, re-reading the profile every IDLE_STEP seconds.
+"""
+
+import asyncio
+import random
+import time
+from typing import Callable, Optional, Tuple, Union
+
+PACING_MODES = ("closed", "open")
+ARRIVAL_PROCESSES = ("uniform", "poisson")
+
+# Waits shorter than this are spun rather than slept in open mode, since
+# sleeps overshoot by tens to hundreds of microseconds.
+SPIN_THRESHOLD = 0.0005
+
+# How often an idle pacer re-reads a profile whose rate is zero
+IDLE_STEP = 0.1
+
+# Interval as a function of seconds since the run started, None when idle
+IntervalSchedule = Callable[[float], Optional[float]]
+
+
+class Pacer:
+    """
+    Schedules the sends of one worker at interval seconds per batch.
+
+    An interval of None disables pacing: wait() returns immediately. A
+    callable interval is read at each slot, with elapsed the number of
+    seconds the run had been going when the pacer was created. When a
+    stop_event is given, waits return early once it is set.
+    """
+
+    def __init__(
+        self,
+        interval: Union[None, float, IntervalSchedule],
+        mode: str = "closed",
+        arrivals: str = "uniform",
+        seed: Optional[int] = None,
+        elapsed: float = 0.0,
+        stop_event=None,
+    ):
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode '{mode}'")
+        if arrivals not in ARRIVAL_PROCESSES:
+            raise ValueError(f"Unknown arrival process '{arrivals}'")
+        self.schedule: Optional[IntervalSchedule] = None
+        self.interval: Optional[float] = None
+        if callable(interval):
+            self.schedule = interval
+        else:
+            self.interval = interval
+        self.paced = bool(self.schedule or interval)
+        self.open = mode == "open"
+        self.poisson = self.open and arrivals == "poisson"
+        self.rng = random.Random(seed)
+        self.stop_event = stop_event
+        self.next_send_time = time.perf_counter()
+        self.start_time = self.next_send_time - elapsed
+
+    def _advance(self) -> Tuple[float, Optional[float], bool]:
+        """
+        Take the next slot, returning (slot time, interval, late).
+
+        A send is late when it is more than one interval behind its slot. An
+        interval of None marks an idle slot, in which nothing is sent.
+        """
+        slot = self.next_send_time
+        if self.schedule:
+            interval = self.schedule(slot - self.start_time)
+        else:
+            interval = self.interval
+        if interval is None:
+            self.next_send_time += IDLE_STEP
+            return slot, None, False
+        if self.poisson:
+            self.next_send_time += self.rng.expovariate(1.0 / interval)
+        else:
+            self.next_send_time += interval
+        return slot, interval, time.perf_counter() - slot > interval
+
+    def _stopped(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def wait(self) -> Tuple[float, bool]:
+        """
+        Block until the next send slot.
+
+        Returns the slot's intended send time and whether the send is late.
+        """
+        if not self.paced:
+            return time.perf_counter(), False
+        while True:
+            slot, interval, late = self._advance()
+            now = time.perf_counter()
+            sleep = slot - now - (SPIN_THRESHOLD if self.open else 0)
+            if sleep > 0:
+                if self.stop_event is not None:
+                    self.stop_event.wait(sleep)
+                else:
+                    time.sleep(sleep)
+            if self.open:
+                # time.sleep(0) releases the GIL so other workers keep running.
+                while time.perf_counter() < slot and not self._stopped():
+                    time.sleep(0)
+            if interval is not None or self._stopped():
+                return slot, late
+
+    async def wait_async(self) -> Tuple[float, bool]:
+        """
+        Same as wait(), without blocking the event loop.
+        """
+        if not self.paced:
+            return time.perf_counter(), False
+        while True:
+            slot, interval, late = self._advance()
+            margin = SPIN_THRESHOLD if self.open else 0
+            # Sleep in steps so a set stop_event is noticed.
+            while not self._stopped():
+                sleep = slot - time.perf_counter() - margin
+                if sleep <= 0:
+                    break
+                await asyncio.sleep(min(sleep, IDLE_STEP))
+            if self.open:
+                while time.perf_counter() < slot and not self._stopped():
+                    await asyncio.sleep(0)
+            if interval is not None or self._stopped():
+                return slot, late
+
+    def latency_start(self, intended: float) -> float:
+        """
+        Return the time a send's latency is measured from: its intended send
+        time in open mode, or the current time in closed mode.
+        """
+        if self.open and self.paced:
+            return intended
+        return time.perf_counter()
@@ -0,0 +1,148 @@
+"""
+Time-varying load profiles for the load generator.
+
+A load profile gives the target rate, in items per second across all
+workers, at each point of a run. It is written as a kind followed by
+comma separated key=value parameters:
+
+- ramp:from=1000,to=100000,over=60
+    Linear ramp from one rate to another over a number of seconds, then hold.
+- steps:start=10000,step=10000,every=30,count=10
+    Staircase of count steps, each every seconds long and step higher than
+    the last, then hold the last step.
+- spike:base=10000,peak=100000,every=60,for=5
+    Periodic spikes: every seconds, of which the last for seconds run at peak.
+- csv:path=diurnal.csv,scale=0.5,speed=60
+    Rates replayed from a CSV file of (offset seconds, rate) rows, linearly
+    interpolated and held after the last row. Rates are multiplied by scale
+    and offsets divided by speed, so a day-long production curve can be
+    replayed in minutes at a fraction of its volume.
+
+Every profile is held as the points of a piecewise linear curve, optionally
+repeating with a period. A step is two points at the same offset.
+"""
+
+import bisect
+import csv
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# Parameters of each profile kind and their defaults, None when required
+ProfileParameter = Union[None, str, float]
+PROFILE_PARAMETERS: Dict[str, Dict[str, ProfileParameter]] = {
+    "ramp": {"from": None, "to": None, "over": None},
+    "steps": {"start": None, "step": None, "every": None, "count": 10},
+    "spike": {"base": None, "peak": None, "every": None, "for": None},
+    "csv": {"path": None, "scale": 1.0, "speed": 1.0},
+}
+
+
+class RateProfile:
+    """
+    A target rate curve through (offset seconds, rate) points.
+
+    Rates are interpolated linearly between points and held before the first
+    and after the last. With a period, the curve repeats every period seconds.
+    """
+
+    def __init__(
+        self, points: Sequence[Tuple[float, float]], period: Optional[float] = None
+    ):
+        if not points:
+            raise ValueError("Load profile needs at least one point")
+        if any(b[0] < a[0] for a, b in zip(points, points[1:])):
+            raise ValueError("Load profile offsets must not decrease")
+        if any(rate < 0 for _, rate in points):
+            raise ValueError("Load profile rates must not be negative")
+        self.times: List[float] = [float(t) for t, _ in points]
+        self.rates: List[float] = [float(r) for _, r in points]
+        self.period = period
+
+    def rate_at(self, elapsed: float) -> float:
+        """Return the target rate elapsed seconds into the run."""
+        if self.period:
+            elapsed %= self.period
+        i = bisect.bisect_right(self.times, elapsed)
+        if i == 0:
+            return self.rates[0]
+        if i == len(self.times):
+            return self.rates[-1]
+        t0, t1 = self.times[i - 1], self.times[i]
+        r0, r1 = self.rates[i - 1], self.rates[i]
+        return r0 + (r1 - r0) * (elapsed - t0) / (t1 - t0)
+
+
+def read_rate_csv(path: str) -> List[Tuple[float, float]]:
+    """
+    Read (offset, rate) rows from a CSV file, skipping a header row, blank
+    lines and lines starting with '#'.
+    """
+    points = []
+    try:
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+    except OSError as e:
+        raise ValueError(f"Cannot read load profile {path}: {e}")
+    for row in rows:
+        if not row or row[0].strip().startswith("#"):
+            continue
+        try:
+            points.append((float(row[0]), float(row[1])))
+        except (ValueError, IndexError):
+            if points:
+                raise ValueError(f"Invalid load profile row in {path}: {row}")
+    return points
+
+
+def parse_load_profile(spec: str) -> RateProfile:
+    """
+    Parse a load profile specification into a RateProfile.
+    """
+    kind, _, params = spec.strip().partition(":")
+    kind = kind.strip().lower()
+    if kind not in PROFILE_PARAMETERS:
+        raise ValueError(
+            f"Unknown load profile '{kind}', expected one of "
+            + ", ".join(PROFILE_PARAMETERS)
+        )
+    values = dict(PROFILE_PARAMETERS[kind])
+    for item in filter(None, (p.strip() for p in params.split(","))):
+        key, sep, value = item.partition("=")
+        key = key.strip().lower()
+        if not sep or key not in values:
+            raise ValueError(f"Invalid '{kind}' load profile parameter '{item}'")
+        values[key] = value.strip()
+    missing = [key for key, value in values.items() if value is None]
+    if missing:
+        raise ValueError(f"'{kind}' load profile needs {', '.join(missing)}")
+    given = {key: value for key, value in values.items() if value is not None}
+
+    if kind == "csv":
+        scale, speed = float(given["scale"]), float(given["speed"])
+        if speed <= 0:
+            raise ValueError("csv load profile speed must be positive")
+        points = read_rate_csv(str(given["path"]))
+        return RateProfile([(t / speed, rate * scale) for t, rate in points])
+
+    num = {key: float(value) for key, value in given.items()}
+    if kind == "ramp":
+        if num["over"] <= 0:
+            raise ValueError("ramp load profile 'over' must be positive")
+        return RateProfile([(0, num["from"]), (num["over"], num["to"])])
+    if kind == "steps":
+        every, count = num["every"], int(num["count"])
+        if every <= 0 or count <= 0:
+            raise ValueError("steps load profile 'every' and 'count' must be > 0")
+        points = []
+        for i in range(count):
+            rate = num["start"] + i * num["step"]
+            points += [(i * every, rate), ((i + 1) * every, rate)]
+        return RateProfile(points)
+    # spike
+    every, length = num["every"], num["for"]
+    if not 0 < length <= every:
+        raise ValueError("spike load profile needs 0 < 'for' <= 'every'")
+    rise = every - length
+    base, peak = num["base"], num["peak"]
+    return RateProfile(
+        [(0, base), (rise, base), (rise, peak), (every, peak)], period=every
+    )
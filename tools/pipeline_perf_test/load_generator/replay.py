@@ -0,0 +1,121 @@
+"""
+Replay of recorded OTLP logs traffic for the load generator.
+
+A recording is a file of ExportLogsServiceRequest messages, either
+length-delimited protobuf (as read for corpus_path) or OTLP JSON, one request
+per line. Either way the file is read through a memory map. Protobuf
+recordings are sent straight from the map; JSON lines are converted to
+protobuf once, when the recording is loaded.
+
+Requests are replayed at the times they were originally sent, taken from the
+earliest timestamp of their log records, optionally sped up or slowed down,
+and the recording loops for runs longer than it. A recording without timing
+(a single request, or requests without timestamps) is sent once every
+UNTIMED_PERIOD seconds. Each request's timestamps
+are moved just before it is sent so that its latest is the time of sending,
+so the records look fresh to time-based processors while keeping their
+spacing within the request.
+"""
+
+import mmap
+from typing import Callable, List, Union
+
+from google.protobuf import json_format  # type: ignore
+from opentelemetry.proto.collector.logs.v1 import logs_service_pb2
+
+from corpus import PayloadCorpus
+from otlp_http import from_otlp_json
+from timestamps import (
+    LOG_TIMESTAMP_FIELDS,
+    earliest_timestamp,
+    find_timestamps,
+    latest_timestamp,
+)
+
+# Seconds between passes over a recording that carries no timing
+UNTIMED_PERIOD = 1.0
+
+# Seconds behind schedule a replayed request may be sent, beyond its gap to
+# the request before it, without counting as late
+LATE_TOLERANCE = 0.01
+
+
+def is_json_lines(path: str) -> bool:
+    """
+    Tell whether a recording is OTLP JSON lines rather than protobuf.
+    """
+    with open(path, "rb") as f:
+        return f.read(64).lstrip().startswith(b"{")
+
+
+def read_recording(
+    path: str, count_items: Callable[[Union[bytes, memoryview]], int]
+) -> PayloadCorpus:
+    """
+    Load a recording of ExportLogsServiceRequest messages as a corpus, in
+    recorded order.
+    """
+    if not is_json_lines(path):
+        return PayloadCorpus.from_file(path, count_items=count_items)
+    payloads = []
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        for number, line in enumerate(iter(mapped.readline, b""), 1):
+            if not line.strip():
+                continue
+            try:
+                request = from_otlp_json(
+                    line, logs_service_pb2.ExportLogsServiceRequest
+                )
+            except (ValueError, json_format.Error) as e:
+                raise ValueError(f"Invalid OTLP JSON on line {number} of {path}: {e}")
+            payloads.append(request.SerializeToString())
+    if not payloads:
+        raise ValueError(f"Recording {path} contains no requests")
+    return PayloadCorpus(payloads, [count_items(p) for p in payloads])
+
+
+class Recording:
+    """
+    Timing and timestamp offsets of the requests of a recording.
+
+    Attributes:
+        corpus: The recorded requests.
+        timestamps: Offsets of the non-zero timestamps of each request.
+        recorded_at: Time each request was recorded, in Unix nanoseconds.
+        latest: Latest timestamp of each request, in Unix nanoseconds.
+        offsets: Seconds from the first request to each request, never
+            decreasing, so out of order requests are sent right away.
+        period: Length of one pass over the recording in seconds: the time
+            to the last request plus the mean gap between requests, or
+            UNTIMED_PERIOD when the recording carries no timing.
+    """
+
+    def __init__(self, corpus: PayloadCorpus):
+        self.corpus = corpus
+        self.timestamps: List[List[int]] = []
+        self.recorded_at: List[int] = []
+        self.latest: List[int] = []
+        for payload in corpus.payloads:
+            offsets = find_timestamps(payload, LOG_TIMESTAMP_FIELDS)
+            self.timestamps.append(offsets)
+            self.recorded_at.append(earliest_timestamp(payload, offsets))
+            self.latest.append(latest_timestamp(payload, offsets))
+
+        # Requests without timestamps go out with the request before them.
+        first = next((t for t in self.recorded_at if t), 0)
+        self.offsets: List[float] = []
+        latest = 0.0
+        for recorded_at in self.recorded_at:
+            if recorded_at:
+                latest = max(latest, (recorded_at - first) / 1e9)
+            self.offsets.append(latest)
+        count = len(self.offsets)
+        if latest:
+            self.period = latest + latest / (count - 1)
+        else:
+            self.period = UNTIMED_PERIOD
+
+    def __len__(self) -> int:
+        return len(self.offsets)
@@ -0,0 +1,221 @@
+"""
+Exporter-like retries for the load generator.
+
+By default a failed export counts its batch as failed and the worker moves
+on. With retry_on_failure, workers behave like the collector's exporters
+instead: a batch rejected with a retryable status (e.g. UNAVAILABLE or
+RESOURCE_EXHAUSTED over gRPC, 429 or 503 over HTTP) goes into the worker's
+bounded retry queue and is sent again after an exponential backoff with
+jitter, or after the delay the server asked for (a gRPC RetryInfo detail or
+an HTTP Retry-After header). New batches keep going out meanwhile, so a
+pipeline under sustained backpressure sees the retry traffic on top of the
+offered load, as it would in production. At most RETRIES_PER_BATCH due
+retries go out ahead of each new batch, so a backlog of retries adds to the
+offered load rather than holding off new batches.
+
+A batch counts as failed once it is given up on: when its retries would run
+past max_elapsed_time, when the retry queue is full, when the error is not
+retryable, or when the run stops while it waits.
+"""
+
+import heapq
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import grpc  # type: ignore
+
+from corpus import decode_varint, iter_fields
+from otlp_http import HttpExportError
+
+# gRPC codes exporters retry on, per the OTLP specification, plus
+# RESOURCE_EXHAUSTED, which receivers such as the memory limiter return to
+# push back.
+RETRYABLE_GRPC_CODES = (
+    "CANCELLED",
+    "DEADLINE_EXCEEDED",
+    "RESOURCE_EXHAUSTED",
+    "ABORTED",
+    "OUT_OF_RANGE",
+    "UNAVAILABLE",
+    "DATA_LOSS",
+)
+RETRYABLE_HTTP_STATUSES = (429, 502, 503, 504)
+# Status codes retry counters are kept for. Connection failures count as
+# UNAVAILABLE.
+RETRY_STATUS_CODES = RETRYABLE_GRPC_CODES + tuple(
+    str(status) for status in RETRYABLE_HTTP_STATUSES
+)
+# Outcomes of a retryable failure, each counted per status code
+RETRIED, DROPPED_AFTER_RETRY, QUEUE_FULL = (
+    "retried",
+    "dropped_after_retry",
+    "queue_full",
+)
+RETRY_OUTCOMES = (RETRIED, DROPPED_AFTER_RETRY, QUEUE_FULL)
+
+# Most due retries a worker sends ahead of each new batch
+RETRIES_PER_BATCH = 1
+
+# Backoff growth per attempt and jitter, as in the collector's exporters
+BACKOFF_MULTIPLIER = 1.5
+BACKOFF_RANDOMIZATION = 0.5
+
+STATUS_DETAILS_KEY = "grpc-status-details-bin"
+RETRY_INFO_TYPE = "type.googleapis.com/google.rpc.RetryInfo"
+
+
+def parse_retry_info(details: bytes) -> Optional[float]:
+    """
+    Return the retry delay, in seconds, of the RetryInfo detail of a
+    serialized google.rpc.Status, or None if it carries none.
+    """
+    # Status.details (3) -> Any type_url (1), value (2) ->
+    # RetryInfo.retry_delay (1) -> Duration seconds (1), nanos (2)
+    for field_number, _, start, end in iter_fields(details, 0, len(details)):
+        if field_number != 3:
+            continue
+        type_url, value = b"", None
+        for any_field, _, any_start, any_end in iter_fields(details, start, end):
+            if any_field == 1:
+                type_url = bytes(details[any_start:any_end])
+            elif any_field == 2:
+                value = (any_start, any_end)
+        if type_url.decode() != RETRY_INFO_TYPE or value is None:
+            continue
+        for info_field, _, delay_start, delay_end in iter_fields(details, *value):
+            if info_field != 1:
+                continue
+            parts = {1: 0, 2: 0}
+            for part, _, part_start, _ in iter_fields(details, delay_start, delay_end):
+                parts[part] = decode_varint(details, part_start)[0]
+            return parts[1] + parts[2] / 1e9
+    return None
+
+
+def classify_error(error: Exception) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Return the status code an export failed with, if it is retryable (else
+    None), and the delay in seconds the server asked to retry after, if any.
+    """
+    if isinstance(error, grpc.RpcError) and hasattr(error, "code"):
+        code = error.code().name
+        if code not in RETRYABLE_GRPC_CODES:
+            return None, None
+        for key, value in error.trailing_metadata() or ():
+            if key == STATUS_DETAILS_KEY:
+                try:
+                    return code, parse_retry_info(value)
+                except ValueError:
+                    break
+        return code, None
+    if isinstance(error, HttpExportError):
+        if error.status not in RETRYABLE_HTTP_STATUSES:
+            return None, None
+        return str(error.status), error.retry_after
+    if isinstance(error, OSError):
+        return "UNAVAILABLE", None
+    return None, None
+
+
+@dataclass(order=True)
+class PendingRetry:
+    """
+    A batch waiting in a retry queue.
+
+    Attributes:
+        due: perf_counter time of its next attempt.
+        index: Corpus index of the batch.
+        items: Number of items in the batch.
+        code: Status code of its last failure.
+        first_failed_at: perf_counter time of its first failure.
+        attempts: Number of retries scheduled so far.
+    """
+
+    due: float
+    index: int = field(compare=False)
+    items: int = field(compare=False)
+    code: str = field(compare=False)
+    first_failed_at: float = field(compare=False)
+    attempts: int = field(compare=False, default=1)
+
+
+class RetryQueue:
+    """
+    A worker's bounded queue of batches waiting to be retried, ordered by
+    the time of their next attempt.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        initial_interval: float = 5.0,
+        max_interval: float = 30.0,
+        max_elapsed_time: float = 300.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.size = size
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.max_elapsed_time = max_elapsed_time
+        self.rng = rng or random.Random()
+        self.pending: List[PendingRetry] = []
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Return the delay before retry number attempt (from 1): the initial
+        interval grown by BACKOFF_MULTIPLIER per attempt up to max_interval,
+        randomized by +/- BACKOFF_RANDOMIZATION.
+        """
+        interval = min(
+            self.initial_interval * BACKOFF_MULTIPLIER ** (attempt - 1),
+            self.max_interval,
+        )
+        jitter = BACKOFF_RANDOMIZATION * (2 * self.rng.random() - 1)
+        return interval * (1 + jitter)
+
+    def add(
+        self,
+        index: int,
+        items: int,
+        code: str,
+        now: float,
+        retry_after: Optional[float] = None,
+        previous: Optional[PendingRetry] = None,
+    ) -> str:
+        """
+        Schedule a retry of a batch that failed with a retryable code, after
+        retry_after seconds if the server gave a delay, else after the next
+        backoff. previous is the queue entry of the attempt that failed, for
+        a batch that was already being retried.
+
+        Returns RETRIED, or DROPPED_AFTER_RETRY if the retry would run past
+        max_elapsed_time, or QUEUE_FULL if the queue has no room for it.
+        """
+        attempts = previous.attempts + 1 if previous else 1
+        first_failed_at = previous.first_failed_at if previous else now
+        delay = retry_after if retry_after is not None else self.backoff(attempts)
+        if now + delay - first_failed_at > self.max_elapsed_time:
+            return DROPPED_AFTER_RETRY
+        if len(self.pending) >= self.size:
+            return QUEUE_FULL
+        heapq.heappush(
+            self.pending,
+            PendingRetry(now + delay, index, items, code, first_failed_at, attempts),
+        )
+        return RETRIED
+
+    def pop_due(self, now: float) -> Optional[PendingRetry]:
+        """Remove and return the earliest batch due by now, if any."""
+        if self.pending and self.pending[0].due <= now:
+            return heapq.heappop(self.pending)
+        return None
+
+    def drain(self) -> int:
+        """Empty the queue, returning the number of items it held."""
+        items = sum(retry.items for retry in self.pending)
+        self.pending = []
+        return items
@@ -0,0 +1,337 @@
+"""
+Data-shape profiles for generated log batches.
+
+The cost of processing logs depends on their shape as much as on their
+volume: how many resources and scopes a request is split into, how many
+distinct attribute keys and values there are, what types the values and
+bodies have and how their sizes vary. A DataShape declares these, as a named
+preset, inline JSON or a JSON file, for example:
+
+    {
+        "resources": 10, "scopes": 2, "resource_attributes": 5,
+        "attributes": 8, "attribute_keys": 40, "attribute_values": 200,
+        "value_types": {"string": 6, "int": 2, "double": 1, "bool": 1},
+        "value_size": "lognormal:12,0.5",
+        "body_types": {"string": 9, "kvlist": 1},
+        "body_size": "uniform:20,400",
+        "bodies": 1000
+    }
+
+Sizes are either fixed ("25") or drawn from a distribution: "uniform:MIN,MAX",
+"normal:MEAN,STDDEV" or "lognormal:MEDIAN,SIGMA".
+
+Keys, values, bodies, resources and scopes are generated once per shape, into
+bounded pools whose sizes set the cardinality the backend sees. Each key has
+one value type, as in real telemetry. Batches are then assembled by picking
+from the pools, so no value is generated per record, and batches are
+serialized once into the corpus as usual.
+"""
+
+import functools
+import json
+import math
+import random
+import string
+from typing import Dict, List, Tuple
+
+from opentelemetry.proto.collector.logs.v1 import logs_service_pb2
+from opentelemetry.proto.common.v1 import common_pb2
+from opentelemetry.proto.resource.v1 import resource_pb2
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+SIZE_DISTRIBUTIONS = ("uniform", "normal", "lognormal")
+VALUE_TYPES = ("string", "int", "double", "bool", "bytes", "kvlist", "array")
+BODY_TYPES = ("string", "kvlist", "bytes")
+# Entries of generated kvlist and array values, which share the value size
+COMPOSITE_ENTRIES = 4
+
+_TEXT_TABLE = bytes(
+    (string.ascii_letters + string.digits).encode()[i % 62] for i in range(256)
+)
+
+PRESETS: Dict[str, dict] = {
+    # Many pods sending through an agent: several resources per request,
+    # mid-sized attribute sets and mostly plain text bodies.
+    "k8s": {
+        "resources": 20,
+        "scopes": 2,
+        "resource_attributes": 8,
+        "attributes": 6,
+        "attribute_keys": 30,
+        "attribute_values": 500,
+        "value_types": {"string": 6, "int": 2, "double": 1, "bool": 1},
+        "value_size": "lognormal:12,0.5",
+        "body_types": {"string": 9, "kvlist": 1},
+        "body_size": "lognormal:120,0.8",
+        "bodies": 5000,
+    },
+    # Wide events with many high-cardinality attributes
+    "wide": {
+        "attributes": 40,
+        "attribute_keys": 100,
+        "attribute_values": 1000,
+        "value_types": {"string": 4, "int": 3, "double": 2, "bool": 1},
+        "value_size": "uniform:4,64",
+        "body_size": "uniform:0,64",
+    },
+    # Structured logs with map bodies and nested attribute values
+    "structured": {
+        "attributes": 4,
+        "attribute_keys": 8,
+        "value_types": {"string": 4, "kvlist": 1, "array": 1},
+        "body_types": {"kvlist": 1},
+        "body_size": "normal:400,100",
+    },
+}
+
+
+def parse_size(spec: str) -> Tuple[str, float, float]:
+    """
+    Parse a size specification into (distribution, a, b). Fixed sizes are
+    returned as ('fixed', size, 0).
+    """
+    kind, sep, params = spec.strip().partition(":")
+    if not sep:
+        try:
+            size = int(kind)
+        except ValueError:
+            raise ValueError(f"Invalid size '{spec}'")
+        if size < 0:
+            raise ValueError(f"Size must not be negative: '{spec}'")
+        return "fixed", size, 0
+    kind = kind.strip().lower()
+    if kind not in SIZE_DISTRIBUTIONS:
+        raise ValueError(
+            f"Unknown size distribution '{kind}', expected one of {SIZE_DISTRIBUTIONS}"
+        )
+    try:
+        a, b = (float(p) for p in params.split(","))
+    except ValueError:
+        raise ValueError(f"'{kind}' size needs two numbers: '{spec}'")
+    if a < 0 or b < 0 or (kind == "uniform" and b < a):
+        raise ValueError(f"Invalid '{kind}' size: '{spec}'")
+    if kind == "lognormal" and a <= 0:
+        raise ValueError(f"lognormal size median must be positive: '{spec}'")
+    return kind, a, b
+
+
+def sample_size(size: Tuple[str, float, float], rng: random.Random) -> int:
+    """Draw a size from a parsed size specification."""
+    kind, a, b = size
+    if kind == "fixed":
+        return int(a)
+    if kind == "uniform":
+        value = rng.uniform(a, b)
+    elif kind == "normal":
+        value = rng.gauss(a, b)
+    else:
+        value = rng.lognormvariate(math.log(a), b)
+    return max(0, round(value))
+
+
+def _check_weights(weights: Dict[str, float], types: tuple) -> Dict[str, float]:
+    weights = {k.lower(): v for k, v in weights.items()}
+    unknown = set(weights) - set(types)
+    if unknown:
+        raise ValueError(f"Unknown types {sorted(unknown)}, expected {types}")
+    if any(v < 0 for v in weights.values()) or not any(weights.values()):
+        raise ValueError("Type weights must not be negative, and one must be > 0")
+    return weights
+
+
+class DataShape(BaseModel):
+    """
+    The shape of generated log batches. Cardinalities are per shape, counts
+    are per request or record.
+    """
+
+    resources: int = Field(
+        default=1, gt=0, description="Distinct resources per request"
+    )
+    scopes: int = Field(default=1, gt=0, description="Scopes per resource")
+    resource_attributes: int = Field(
+        default=1, ge=0, description="Attributes per resource, with values unique to it"
+    )
+    attributes: int = Field(default=2, ge=0, description="Attributes per log record")
+    attribute_keys: int = Field(default=2, gt=0, description="Distinct attribute keys")
+    attribute_values: int = Field(
+        default=100, gt=0, description="Distinct values per attribute key"
+    )
+    value_types: Dict[str, float] = Field(
+        default={"string": 1.0}, description="Relative weights of attribute value types"
+    )
+    value_size: str = Field(
+        default="15", description="Size of string and bytes values, in characters"
+    )
+    body_types: Dict[str, float] = Field(
+        default={"string": 1.0}, description="Relative weights of body types"
+    )
+    body_size: str = Field(default="25", description="Size of bodies, in characters")
+    bodies: int = Field(default=1000, gt=0, description="Distinct bodies")
+
+    @field_validator("value_types")
+    def validate_value_types(cls, v):
+        return _check_weights(v, VALUE_TYPES)
+
+    @field_validator("body_types")
+    def validate_body_types(cls, v):
+        return _check_weights(v, BODY_TYPES)
+
+    @field_validator("value_size", "body_size")
+    def validate_size(cls, v):
+        parse_size(v)
+        return v
+
+    @field_validator("attribute_keys")
+    def validate_attribute_keys(cls, v, info):
+        if v < info.data.get("attributes", 0):
+            raise ValueError("attribute_keys must be at least attributes")
+        return v
+
+
+def load_data_shape(spec: str) -> DataShape:
+    """
+    Load a data shape from a preset name, inline JSON or a JSON file.
+    """
+    spec = spec.strip()
+    if spec.lower() in PRESETS:
+        return DataShape(**PRESETS[spec.lower()])
+    try:
+        if spec.startswith("{"):
+            return DataShape.model_validate_json(spec)
+        with open(spec) as f:
+            return DataShape(**json.load(f))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(
+            f"Data shape must be one of {sorted(PRESETS)}, inline JSON or a JSON "
+            f"file: {e}"
+        )
+    except ValidationError as e:
+        raise ValueError(f"Invalid data shape: {e}")
+
+
+def _pick_type(weights: Dict[str, float], rng: random.Random) -> str:
+    names = list(weights)
+    return rng.choices(names, weights=[weights[n] for n in names])[0]
+
+
+class ShapePools:
+    """
+    Pre-generated values of a data shape, and batch assembly from them.
+    """
+
+    def __init__(self, shape: DataShape, seed: int = 0):
+        self.shape = shape
+        rng = random.Random(seed)
+        self.rng = random.Random(seed + 1)
+        value_size = parse_size(shape.value_size)
+        body_size = parse_size(shape.body_size)
+
+        self.keys = [f"attribute.{i + 1}" for i in range(shape.attribute_keys)]
+        self.values: List[List[common_pb2.AnyValue]] = []
+        for _ in self.keys:
+            value_type = _pick_type(shape.value_types, rng)
+            self.values.append(
+                [
+                    self._value(value_type, sample_size(value_size, rng), rng)
+                    for _ in range(shape.attribute_values)
+                ]
+            )
+        self.bodies = [
+            self._value(
+                _pick_type(shape.body_types, rng), sample_size(body_size, rng), rng
+            )
+            for _ in range(shape.bodies)
+        ]
+        self.resources = [
+            resource_pb2.Resource(
+                attributes=[
+                    common_pb2.KeyValue(
+                        key=f"resource.{j + 1}",
+                        value=common_pb2.AnyValue(string_value=f"resource-{i}-{j}"),
+                    )
+                    for j in range(shape.resource_attributes)
+                ]
+            )
+            for i in range(shape.resources)
+        ]
+        self.scopes = [
+            common_pb2.InstrumentationScope(name=f"scope.{j + 1}", version="1.0.0")
+            for j in range(shape.scopes)
+        ]
+
+    @staticmethod
+    def _text(size: int, rng: random.Random) -> str:
+        return rng.randbytes(size).translate(_TEXT_TABLE).decode("ascii")
+
+    def _value(
+        self, value_type: str, size: int, rng: random.Random
+    ) -> common_pb2.AnyValue:
+        if value_type == "string":
+            return common_pb2.AnyValue(string_value=self._text(size, rng))
+        if value_type == "bytes":
+            return common_pb2.AnyValue(bytes_value=rng.randbytes(size))
+        if value_type == "int":
+            return common_pb2.AnyValue(int_value=rng.getrandbits(63))
+        if value_type == "double":
+            return common_pb2.AnyValue(double_value=rng.random() * 1e6)
+        if value_type == "bool":
+            return common_pb2.AnyValue(bool_value=rng.random() < 0.5)
+        # Composite values split their size across their entries
+        part = size // COMPOSITE_ENTRIES
+        entries = [
+            common_pb2.AnyValue(string_value=self._text(part, rng))
+            for _ in range(COMPOSITE_ENTRIES)
+        ]
+        if value_type == "array":
+            return common_pb2.AnyValue(
+                array_value=common_pb2.ArrayValue(values=entries)
+            )
+        return common_pb2.AnyValue(
+            kvlist_value=common_pb2.KeyValueList(
+                values=[
+                    common_pb2.KeyValue(key=f"field.{i + 1}", value=value)
+                    for i, value in enumerate(entries)
+                ]
+            )
+        )
+
+    def build_logs_request(
+        self, batch_size: int, **record_fields
+    ) -> logs_service_pb2.ExportLogsServiceRequest:
+        """
+        Assemble a request of batch_size log records from the pools, spread
+        evenly over every scope of every resource. record_fields (e.g. the
+        timestamp and severity) are set on every record.
+        """
+        shape = self.shape
+        rng = self.rng
+        request = logs_service_pb2.ExportLogsServiceRequest()
+        groups = []
+        for resource in self.resources:
+            resource_logs = request.resource_logs.add()
+            resource_logs.resource.CopyFrom(resource)
+            for scope in self.scopes:
+                scope_logs = resource_logs.scope_logs.add()
+                scope_logs.scope.CopyFrom(scope)
+                groups.append(scope_logs.log_records)
+
+        key_indexes = range(len(self.keys))
+        for i in range(batch_size):
+            record = groups[i % len(groups)].add(**record_fields)
+            record.body.CopyFrom(self.bodies[rng.randrange(shape.bodies)])
+            attributes = record.attributes
+            for k in rng.sample(key_indexes, shape.attributes):
+                attribute = attributes.add(key=self.keys[k])
+                attribute.value.CopyFrom(
+                    self.values[k][rng.randrange(shape.attribute_values)]
+                )
+        return request
+
+
+@functools.lru_cache(maxsize=8)
+def shape_pools(spec: str) -> ShapePools:
+    """
+    Return the pools of a data shape specification, generated on first use.
+    """
+    return ShapePools(load_data_shape(spec))
@@ -0,0 +1,229 @@
+"""
+Syslog message formatting and batched datagram sending for the load generator.
+
+Messages are formatted as RFC3164 (BSD) or RFC5424 syslog, and framed for TCP
+either by a trailing newline or by octet counting (RFC6587: the message length
+in decimal and a space before each message). UDP datagrams carry one message
+each, so they need no framing beyond the datagram itself.
+
+On Linux, a batch of datagrams is handed to the kernel with sendmmsg, called
+through ctypes, rather than with one sendto syscall per message. Elsewhere it
+falls back to sendto. A full socket send buffer is waited out rather than
+counted as failed sends, so the sender is paced by the kernel instead of
+dropping messages.
+"""
+
+import ctypes
+import errno
+import os
+import select
+import socket
+import sys
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+SYSLOG_FORMATS = ("rfc3164", "rfc5424")
+SYSLOG_FRAMINGS = ("newline", "octet")
+
+PRI = 134  # local0.info = 16*8+6 = 134
+TAG = "loadgen"
+
+# Errors meaning the send buffer is full, retried once the socket is writable
+RETRY_ERRNOS = (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS)
+
+# Longest wait for a writable socket between checks of the stop event
+BACKPRESSURE_WAIT = 0.1
+
+
+def syslog_header(syslog_format: str, hostname: str, now: datetime) -> bytes:
+    """
+    Format the part of a message before its body: priority, timestamp,
+    hostname and tag (app name, process id and message id for RFC5424).
+    """
+    if syslog_format == "rfc5424":
+        timestamp = now.isoformat(timespec="microseconds").replace("+00:00", "Z")
+        return f"<{PRI}>1 {timestamp} {hostname} {TAG} {os.getpid()} - - ".encode()
+    # RFC3164 timestamps have a space-padded day
+    timestamp = now.strftime(f"%b {now.day:2d} %H:%M:%S")
+    return f"<{PRI}>{timestamp} {hostname} {TAG}: ".encode()
+
+
+def frame(message: bytes, framing: Optional[str]) -> bytes:
+    """
+    Frame a message for a stream: 'newline' appends a newline, 'octet'
+    prefixes the message length. None leaves the message as-is.
+    """
+    if framing == "octet":
+        return b"%d " % len(message) + message
+    if framing == "newline":
+        return message + b"\n"
+    return message
+
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_uint8 * 4),
+        ("sin_zero", ctypes.c_uint8 * 8),
+    ]
+
+
+def _load_sendmmsg():
+    """Return libc's sendmmsg, or None where it isn't available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).sendmmsg
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_sendmmsg = _load_sendmmsg()
+
+
+class DatagramSender:
+    """
+    Sends a fixed batch of datagrams to one IPv4 address, with sendmmsg when
+    available.
+
+    The socket should be non-blocking. Messages are copied once into a single
+    buffer, and the message headers pointing into it are built once, so every
+    send of the batch reuses them.
+
+    Attributes:
+        batched: Whether batches are sent with sendmmsg.
+        last_error: The last error that failed a message, if any.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        address: Tuple[str, int],
+        messages: Sequence[bytes],
+        stop_event=None,
+        batched: bool = True,
+    ):
+        sockaddr = socket.getaddrinfo(
+            address[0], address[1], socket.AF_INET, socket.SOCK_DGRAM
+        )[0][4]
+        self.sock = sock
+        # An AF_INET sockaddr is (host, port)
+        self.address: Tuple[str, int] = (str(sockaddr[0]), int(sockaddr[1]))
+        self.messages: List[bytes] = list(messages)
+        self.stop_event = stop_event
+        self.last_error: Optional[OSError] = None
+        # offsets[i] is the number of bytes before message i
+        self.offsets = [0]
+        for message in self.messages:
+            self.offsets.append(self.offsets[-1] + len(message))
+        self.batched = batched and _sendmmsg is not None
+        if self.batched:
+            self._build_headers()
+
+    def _build_headers(self) -> None:
+        count = len(self.messages)
+        self._buffer = ctypes.create_string_buffer(b"".join(self.messages))
+        self._addr = _SockAddrIn(
+            sin_family=socket.AF_INET,
+            sin_port=socket.htons(self.address[1]),
+            sin_addr=(ctypes.c_uint8 * 4)(*socket.inet_aton(self.address[0])),
+        )
+        self._iovecs = (_IoVec * count)()
+        self._headers = (_MMsgHdr * count)()
+        base = ctypes.addressof(self._buffer)
+        for i, message in enumerate(self.messages):
+            self._iovecs[i].iov_base = base + self.offsets[i]
+            self._iovecs[i].iov_len = len(message)
+            header = self._headers[i].msg_hdr
+            header.msg_name = ctypes.addressof(self._addr)
+            header.msg_namelen = ctypes.sizeof(self._addr)
+            header.msg_iov = ctypes.pointer(self._iovecs[i])
+            header.msg_iovlen = 1
+
+    def _stopped(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def _wait_writable(self) -> bool:
+        """
+        Wait for room in the socket send buffer. Returns False if stopped.
+        """
+        while not self._stopped():
+            _, writable, _ = select.select([], [self.sock], [], BACKPRESSURE_WAIT)
+            if writable:
+                return True
+        return False
+
+    def send_batch(self) -> Tuple[int, int, int]:
+        """
+        Send every message of the batch, waiting whenever the send buffer is
+        full. Returns the number of messages sent, the bytes sent and the
+        number of messages that failed. Messages left unsent when the stop
+        event is set are counted as neither.
+        """
+        if self.batched:
+            return self._send_mmsg()
+        sent = failed = sent_bytes = 0
+        i = 0
+        while i < len(self.messages):
+            try:
+                sent_bytes += self.sock.sendto(self.messages[i], self.address)
+                sent += 1
+            except OSError as e:
+                if e.errno in RETRY_ERRNOS:
+                    if not self._wait_writable():
+                        break
+                    continue
+                failed += 1
+                self.last_error = e
+            i += 1
+        return sent, sent_bytes, failed
+
+    def _send_mmsg(self) -> Tuple[int, int, int]:
+        fd = self.sock.fileno()
+        size = ctypes.sizeof(_MMsgHdr)
+        count = len(self.messages)
+        sent = failed = sent_bytes = 0
+        i = 0
+        while i < count:
+            n = _sendmmsg(fd, ctypes.byref(self._headers, i * size), count - i, 0)
+            if n >= 0:
+                sent += n
+                sent_bytes += self.offsets[i + n] - self.offsets[i]
+                i += n
+                continue
+            err = ctypes.get_errno()
+            if err == errno.EINTR:
+                continue
+            if err in RETRY_ERRNOS:
+                if not self._wait_writable():
+                    break
+                continue
+            # The first message of the remaining batch failed; skip it.
+            failed += 1
+            self.last_error = OSError(err, os.strerror(err))
+            i += 1
+        return sent, sent_bytes, failed
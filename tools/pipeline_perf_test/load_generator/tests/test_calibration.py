@@ -0,0 +1,73 @@
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from loadgen import (  # noqa: E402
+    LoadGenConfig,
+    LoadGenerator,
+    ThreadCpuClock,
+    cpu_headroom,
+)
+
+
+def test_cpu_headroom():
+    usage = {0: (0.3, 1.0), 1: (0.5, 1.0)}
+
+    # Threads share one interpreter, processes each have their own.
+    assert cpu_headroom(usage, share_process=True) == pytest.approx(0.2)
+    assert cpu_headroom(usage, share_process=False) == pytest.approx(0.5)
+    assert cpu_headroom({0: (3.0, 2.0)}, share_process=False) == 0.0
+    assert cpu_headroom({}, share_process=True) is None
+
+
+def test_thread_cpu_clock_measures_its_own_thread():
+    clocks = []
+
+    def busy():
+        clock = ThreadCpuClock()
+        clocks.append(clock)
+        deadline = time.monotonic() + 0.2
+        while time.monotonic() < deadline:
+            pass
+        time.sleep(0.2)
+        clock.stop()
+
+    thread = threading.Thread(target=busy)
+    thread.start()
+    thread.join()
+
+    cpu, wall = clocks[0].read()
+    assert 0.4 <= wall < 1.0
+    # Busy for half the time, asleep for the rest
+    assert 0.05 < cpu / wall < 0.6
+
+
+@pytest.mark.parametrize("transport", ["grpc", "otlp_http"])
+def test_calibration_against_null_sink(transport):
+    generator = LoadGenerator()
+    config = LoadGenConfig(
+        batch_size=100, threads=2, target_rate=10, transport=transport
+    )
+
+    resp, code = generator.calibrate(config, duration=0.5)
+
+    assert code == 200
+    # The target rate is ignored
+    assert resp["items_per_second"] > 1000
+    assert resp["batches_per_second"] == pytest.approx(resp["items_per_second"] / 100)
+    assert resp["bytes_per_second"] > resp["items_per_second"]
+    assert resp["failed"] == 0
+    assert 0 <= resp["cpu_headroom"] < 1
+    assert 0.5 <= resp["duration"] < 1.0
+    assert not generator.controller_thread
+
+
+def test_calibration_rejects_unsupported_load_types():
+    resp, code = LoadGenerator().calibrate(LoadGenConfig(load_type="syslog"), 1.0)
+
+    assert code == 400
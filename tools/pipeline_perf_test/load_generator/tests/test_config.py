@@ -1,11 +1,19 @@
 import sys
 import os
+from typing import Any, Dict
+
 import pytest
 from pydantic import ValidationError
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from loadgen import LoadGenConfig  # noqa: E402
+from loadgen import (  # noqa: E402
+    LoadGenConfig,
+    LoadGenerator,
+    format_cpu_list,
+    parse_cpu_list,
+    worker_cpus,
+)
 
 
 def test_valid_config():
@@ -32,7 +40,7 @@ def test_valid_config():
     ],
 )
 def test_invalid_config_values(field, value):
-    kwargs = {
+    kwargs: Dict[str, Any] = {
         "body_size": 25,
         "num_attributes": 2,
         "attribute_value_size": 15,
@@ -43,3 +51,108 @@ def test_invalid_config_values(field, value):
     kwargs[field] = value
     with pytest.raises(ValidationError):
         LoadGenConfig(**kwargs)
+
+
+def test_zstd_requires_otlp_http_for_otlp_load_types():
+    with pytest.raises(ValidationError):
+        LoadGenConfig(load_type="traces", compression="zstd")
+
+    assert (
+        LoadGenConfig(transport="otlp_http", compression="ZSTD").compression == "zstd"
+    )
+    assert LoadGenConfig(load_type="otap", compression="zstd").compression == "zstd"
+
+
+def test_poisson_arrivals_require_open_loop_pacing():
+    with pytest.raises(ValidationError):
+        LoadGenConfig(arrivals="poisson")
+
+    config = LoadGenConfig(pacing="Open", arrivals="POISSON")
+    assert (config.pacing, config.arrivals) == ("open", "poisson")
+
+
+def test_metric_mix_is_normalized():
+    config = LoadGenConfig(load_type="METRICS", metric_mix="Gauge, histogram=2.5")
+    assert config.load_type == "metrics"
+    assert config.metric_mix == "gauge=1,histogram=2.5"
+
+
+@pytest.mark.parametrize(
+    "mix", ["summary=1", "gauge=x", "gauge=-1", "gauge=0,sum=0", ""]
+)
+def test_invalid_metric_mix(mix):
+    with pytest.raises(ValidationError):
+        LoadGenConfig(metric_mix=mix)
+
+
+def test_load_profile_is_validated():
+    config = LoadGenConfig(load_profile="ramp:from=0,to=1000,over=10")
+    assert config.load_profile == "ramp:from=0,to=1000,over=10"
+
+    with pytest.raises(ValidationError):
+        LoadGenConfig(load_profile="ramp:from=0,to=1000")
+    with pytest.raises(ValidationError):
+        LoadGenConfig(load_profile="csv:path=/nonexistent/rates.csv")
+
+
+def test_syslog_options_are_validated():
+    config = LoadGenConfig(syslog_format="RFC5424", syslog_framing="Octet")
+    assert (config.syslog_format, config.syslog_framing) == ("rfc5424", "octet")
+
+    with pytest.raises(ValidationError):
+        LoadGenConfig(syslog_format="cef")
+    with pytest.raises(ValidationError):
+        LoadGenConfig(syslog_framing="nul")
+    with pytest.raises(ValidationError):
+        LoadGenConfig(syslog_send_buffer=0)
+
+
+def test_replay_requires_a_recording_and_its_timing():
+    config = LoadGenConfig(load_type="replay", corpus_path="recording.bin")
+    assert config.replay_speed == 1.0
+
+    with pytest.raises(ValidationError):
+        LoadGenConfig(load_type="replay")
+    with pytest.raises(ValidationError):
+        LoadGenConfig(load_type="replay", corpus_path="recording.bin", target_rate=10)
+    with pytest.raises(ValidationError):
+        LoadGenConfig(load_type="replay", corpus_path="recording.bin", replay_speed=0)
+    with pytest.raises(ValidationError):
+        LoadGenConfig(
+            load_type="replay",
+            corpus_path="recording.bin",
+            transport="otlp_http",
+            compression="gzip",
+        )
+
+
+def test_cpu_lists():
+    assert parse_cpu_list("8, 2-4,3") == [2, 3, 4, 8]
+    assert format_cpu_list([0, 1, 2, 5, 7, 8]) == "0-2,5,7-8"
+    for spec in ["", "a", "3-1", "-1"]:
+        with pytest.raises(ValueError):
+            parse_cpu_list(spec)
+
+
+def test_workers_get_dedicated_cpus_when_there_are_enough():
+    cpus = [2, 3, 4, 5, 6]
+    assert [worker_cpus(cpus, i, 2) for i in range(2)] == [[2, 3, 4], [5, 6]]
+    assert [worker_cpus(cpus, i, 5) for i in range(5)] == [[c] for c in cpus]
+    assert [worker_cpus([0, 1], i, 3) for i in range(3)] == [[0], [1], [0]]
+
+
+def test_cpu_affinity_is_validated():
+    cpu = min(os.sched_getaffinity(0))
+    assert LoadGenConfig(cpu_affinity=f" {cpu}-{cpu}").cpu_affinity == str(cpu)
+
+    with pytest.raises(ValidationError):
+        LoadGenConfig(cpu_affinity="0-x")
+    # CPUs of another host are accepted, as a coordinator relays configs
+    assert LoadGenConfig(cpu_affinity="4096,4098-4099").cpu_affinity == "4096,4098-4099"
+
+
+def test_start_rejects_unavailable_cpus():
+    missing = max(os.sched_getaffinity(0)) + 64
+    resp, code = LoadGenerator().start(LoadGenConfig(cpu_affinity=str(missing)))
+    assert code == 400
+    assert str(missing) in resp["error"]
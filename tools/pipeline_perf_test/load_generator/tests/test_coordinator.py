@@ -0,0 +1,184 @@
+import json
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from coordinator import Coordinator, split_rate  # noqa: E402
+from latency import LatencyHistogram  # noqa: E402
+from loadgen import LoadGenConfig, LoadGenerator  # noqa: E402
+
+
+class FakeServer(ThreadingHTTPServer):
+    requests: list
+    metrics: str
+    calibration: dict
+
+
+class FakeLoadGenerator(BaseHTTPRequestHandler):
+    """Records start and stop requests, and serves canned /metrics."""
+
+    server: FakeServer
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((self.path, json.loads(body)))
+        if self.path == "/calibrate":
+            self.respond(json.dumps(self.server.calibration).encode())
+        else:
+            self.respond(b'{"status": "ok"}')
+
+    def do_GET(self):
+        self.respond(self.server.metrics.encode())
+
+    def respond(self, body):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def metrics_text(sent, latencies, target_rate, headroom, measure_from):
+    histogram = LatencyHistogram()
+    for seconds in latencies:
+        histogram.record(seconds)
+    lines = [f"sent {sent}", "failed 1"]
+    lines += histogram.prometheus_lines("export_latency_seconds")
+    lines.append(f"target_rate {target_rate}")
+    lines.append(f"cpu_headroom {headroom}")
+    lines.append(f"measurement_start_time_seconds {measure_from}")
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def instances():
+    servers = []
+    for sent, latency, headroom, measure_from in (
+        (100, 0.001, 0.5, 1000.5),
+        (300, 0.1, 0.2, 1000.0),
+    ):
+        server = FakeServer(("127.0.0.1", 0), FakeLoadGenerator)
+        server.requests = []
+        server.metrics = metrics_text(
+            sent, [latency] * 10, 500.0, headroom, measure_from
+        )
+        server.calibration = {
+            "status": "calibrated",
+            "items_per_second": sent * 1000.0,
+            "batches_per_second": sent / 10,
+            "bytes_per_second": sent * 1e5,
+            "wire_bytes_per_second": sent * 1e4,
+            "failed": 0,
+            "cpu_headroom": headroom,
+        }
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def url(server):
+    return "http://%s:%d" % server.server_address
+
+
+def test_split_rate():
+    assert split_rate(1001, 2) == [501, 500]
+    assert split_rate(10, 3) == [4, 3, 3]
+    assert sum(split_rate(99991, 7)) == 99991
+
+
+def test_start_splits_the_rate_at_a_common_start_time(instances):
+    coordinator = Coordinator([url(s) for s in instances], start_delay=2.0)
+
+    resp, code = coordinator.start(LoadGenConfig(target_rate=1001, threads=2))
+
+    assert code == 200
+    bodies = [s.requests[0][1] for s in instances]
+    assert [s.requests[0][0] for s in instances] == ["/start", "/start"]
+    assert [b["target_rate"] for b in bodies] == [501, 500]
+    assert all(b["threads"] == 2 for b in bodies)
+    assert bodies[0]["start_at"] == bodies[1]["start_at"] == resp["start_at"]
+    assert resp["start_at"] > time.time() + 1
+
+    assert coordinator.stop() == ({"status": "stopped"}, 200)
+    assert all(s.requests[-1][0] == "/stop" for s in instances)
+
+
+def test_metrics_are_merged(instances):
+    coordinator = Coordinator([url(s) for s in instances])
+
+    assert coordinator.get_metrics() == {"sent": 400, "failed": 2, "instances_up": 2}
+    latency = coordinator.get_latency()
+    assert latency.count == 20
+    # Half the combined requests took 100ms
+    assert latency.quantile(0.9) > 0.05
+    assert coordinator.get_target_rate() == 1000.0
+    # The instance with the least headroom limits the combined load
+    assert coordinator.get_cpu_headroom() == 0.2
+    # Measurement starts when the last instance has warmed up
+    assert coordinator.get_measure_from() == 1000.5
+
+
+def test_instance_with_another_bucket_layout_is_counted_as_down(instances, capsys):
+    lines = instances[1].metrics.splitlines()
+    instances[1].metrics = "\n".join(line for line in lines if 'le="+Inf"' not in line)
+    coordinator = Coordinator([url(s) for s in instances])
+
+    assert coordinator.get_metrics() == {"sent": 100, "failed": 1, "instances_up": 1}
+    assert coordinator.get_latency().count == 10
+    assert f"Skipping the metrics of {url(instances[1])}" in capsys.readouterr().out
+
+
+def test_calibration_sums_the_instances_ceilings(instances):
+    coordinator = Coordinator([url(s) for s in instances])
+
+    resp, code = coordinator.calibrate(LoadGenConfig(threads=2), 5.0)
+
+    assert code == 200
+    assert resp["items_per_second"] == 400_000
+    assert resp["wire_bytes_per_second"] == 4_000_000
+    assert resp["cpu_headroom"] == 0.2
+    # Every instance is calibrated with the full configuration
+    bodies = [s.requests[0] for s in instances]
+    assert all(path == "/calibrate" for path, _ in bodies)
+    assert all(body["threads"] == 2 and body["duration"] == 5.0 for _, body in bodies)
+
+
+def test_failed_start_stops_the_other_instances(instances):
+    instances[1].shutdown()
+    instances[1].server_close()
+    coordinator = Coordinator([url(s) for s in instances], timeout=1)
+
+    resp, code = coordinator.start(LoadGenConfig())
+
+    assert code == 502
+    assert url(instances[1]) in resp
+    assert [path for path, _ in instances[0].requests] == ["/start", "/stop"]
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_run_waits_for_start_at(mock_channel):
+    sends = []
+    mock_channel.return_value.unary_unary.return_value = MagicMock(
+        side_effect=lambda payload: sends.append(time.time())
+    )
+    generator = LoadGenerator()
+    start_at = time.time() + 0.3
+    config = LoadGenConfig(threads=1, batch_size=10, target_rate=100, start_at=start_at)
+
+    generator.start(config)
+    time.sleep(0.5)
+    generator.stop()
+
+    assert sends and sends[0] >= start_at
@@ -0,0 +1,80 @@
+import gzip
+import sys
+import os
+
+import pytest
+import zstandard
+
+# Add root dir to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from corpus import (  # noqa: E402
+    PayloadCorpus,
+    compress,
+    decode_varint,
+    encode_varint,
+    write_length_delimited,
+)
+from loadgen import LoadGenerator, count_log_records  # noqa: E402
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2**32, 2**63 - 1])
+def test_varint_roundtrip(value):
+    encoded = encode_varint(value)
+    assert decode_varint(encoded, 0) == (value, len(encoded))
+
+
+def test_generate_corpus():
+    corpus = PayloadCorpus.generate(3, lambda i: (bytes([i]) * (i + 1), i + 10))
+
+    assert len(corpus) == 3
+    assert corpus.payloads == [b"\x00", b"\x01\x01", b"\x02\x02\x02"]
+    assert corpus.item_counts == [10, 11, 12]
+    assert corpus.nbytes == 6
+    assert corpus.raw_sizes == corpus.wire_sizes == [1, 2, 3]
+    assert corpus.bytes_backed
+
+
+def test_compress_round_trip():
+    payload = b"log record " * 100
+
+    assert gzip.decompress(compress(payload, "gzip")) == payload
+    assert zstandard.ZstdDecompressor().decompress(compress(payload, "zstd")) == payload
+    assert compress(payload, "none") == payload
+    # Compressing the same entry twice gives the same bytes
+    assert compress(payload, "gzip") == compress(payload, "gzip")
+
+
+def test_from_file_counts_log_records(tmp_path):
+    generator = LoadGenerator()
+    args = {"body_size": 5, "num_attributes": 1, "attribute_value_size": 5}
+    requests = [
+        generator.build_logs_request({**args, "batch_size": n}).SerializeToString()
+        for n in (1, 4, 2)
+    ]
+    path = tmp_path / "corpus.bin"
+    write_length_delimited(str(path), requests)
+
+    corpus = PayloadCorpus.from_file(str(path), count_items=count_log_records)
+    try:
+        assert [bytes(p) for p in corpus.payloads] == requests
+        assert corpus.item_counts == [1, 4, 2]
+        assert not corpus.bytes_backed
+    finally:
+        corpus.close()
+
+
+def test_share_and_attach_generated_corpus():
+    corpus = PayloadCorpus.generate(
+        2, lambda i: (f"payload-{i}".encode(), 1, 100 + i, 5)
+    )
+    handle = corpus.share()
+    try:
+        attached = PayloadCorpus.attach(handle)
+        assert [bytes(p) for p in attached.payloads] == [b"payload-0", b"payload-1"]
+        assert attached.item_counts == [1, 1]
+        assert attached.raw_sizes == [100, 101]
+        assert attached.wire_sizes == [5, 5]
+        attached.close()
+    finally:
+        corpus.close()
@@ -0,0 +1,130 @@
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import loadgen  # noqa: E402
+from endpoints import MAX_ENDPOINTS, EndpointBalancer, parse_endpoints  # noqa: E402
+from loadgen import LoadGenConfig, LoadGenerator  # noqa: E402
+
+
+def test_parse_endpoints():
+    assert parse_endpoints(" a:4317, ,b:4317 ") == ["a:4317", "b:4317"]
+    with pytest.raises(ValueError, match="No endpoints"):
+        parse_endpoints(" , ")
+    with pytest.raises(ValueError, match="At most"):
+        parse_endpoints(",".join(f"h{i}:4317" for i in range(MAX_ENDPOINTS + 1)))
+
+
+def test_round_robin_rotates_from_the_worker_id():
+    balancer = EndpointBalancer(3, "round_robin", worker_id=1)
+    targets = []
+    for _ in range(6):
+        target = balancer.acquire()
+        balancer.release(target)
+        targets.append(target)
+    assert targets == [1, 2, 0, 1, 2, 0]
+    assert balancer.candidates() == [0, 1, 2]
+
+
+def test_hash_sticks_to_one_endpoint_per_worker():
+    balancers = [EndpointBalancer(3, "hash", worker_id=i) for i in range(4)]
+    assert [b.candidates() for b in balancers] == [[0], [1], [2], [0]]
+    assert {balancers[1].acquire() for _ in range(5)} == {1}
+
+
+def test_least_outstanding_picks_the_least_busy_endpoint():
+    outstanding = [0, 0, 0]
+    first = EndpointBalancer(3, "least_outstanding", 0, outstanding)
+    second = EndpointBalancer(3, "least_outstanding", 0, outstanding)
+
+    # Exports in flight from every balancer sharing the counts are avoided
+    assert [first.acquire(), first.acquire()] == [0, 1]
+    assert second.acquire() == 2
+    assert outstanding == [1, 1, 1]
+
+    first.release(1)
+    assert second.acquire() == 1
+    assert outstanding == [1, 1, 1]
+
+
+def test_least_outstanding_counts_are_kept_across_threads():
+    outstanding = [0, 0, 0, 0]
+    lock = threading.Lock()
+    balancers = [
+        EndpointBalancer(4, "least_outstanding", i, outstanding, lock) for i in range(8)
+    ]
+
+    def run(balancer):
+        for _ in range(5000):
+            target = balancer.acquire()
+            assert outstanding[target] > 0
+            balancer.release(target)
+
+    threads = [threading.Thread(target=run, args=(b,)) for b in balancers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outstanding == [0, 0, 0, 0]
+
+
+def test_config_validates_endpoints():
+    with pytest.raises(ValueError, match="endpoint_policy"):
+        LoadGenConfig(endpoint_policy="random")
+    with pytest.raises(ValueError, match="No endpoints"):
+        LoadGenConfig(endpoints=",")
+    with pytest.raises(ValueError, match="syslog"):
+        LoadGenConfig(load_type="syslog", endpoints="a:514")
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_spreads_exports_over_endpoints(mock_channel):
+    exports = {}
+
+    def channel(endpoint, **kwargs):
+        exports[endpoint] = MagicMock(return_value=None)
+        mock = MagicMock()
+        mock.unary_unary.return_value = exports[endpoint]
+        return mock
+
+    mock_channel.side_effect = channel
+    generator = LoadGenerator()
+    generator.endpoints = ["a:4317", "b:4317"]
+    args = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 1,
+        "target_rate": 300,
+        "endpoints": "a:4317,b:4317",
+    }
+
+    thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(0.3)
+    generator.stop_event.set()
+    thread.join()
+
+    calls = {endpoint: export.call_count for endpoint, export in exports.items()}
+    assert set(calls) == {"a:4317", "b:4317"}
+    assert abs(calls["a:4317"] - calls["b:4317"]) <= 1
+
+    endpoint_metrics = generator.get_endpoint_metrics()
+    assert list(endpoint_metrics) == ["a:4317", "b:4317"]
+    for endpoint, counts in endpoint_metrics.items():
+        assert counts["sent"] == calls[endpoint] * 3
+        assert counts["failed"] == 0
+        assert counts["export_latency_seconds_count"] == calls[endpoint]
+    assert generator.get_metrics()["sent"] == sum(calls.values()) * 3
+
+    with patch.object(loadgen, "loadgen", generator):
+        with loadgen.app.test_client() as client:
+            text = client.get("/metrics").get_data(as_text=True)
+    assert f'endpoint_sent{{endpoint="b:4317"}} {calls["b:4317"] * 3}' in text
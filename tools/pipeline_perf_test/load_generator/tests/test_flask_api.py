@@ -1,12 +1,14 @@
 import sys
 import os
 import time
+from unittest.mock import patch
+
 import pytest
 
 # Add root dir to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from loadgen import app  # noqa: E402
+from loadgen import LoadGenerator, app  # noqa: E402
 
 
 @pytest.fixture
@@ -109,3 +111,90 @@ def test_metrics_endpoint(client):
     assert "sent" in keys
     assert "failed" in keys
     assert "bytes_sent" in keys
+    assert 'export_latency_seconds_bucket{le="+Inf"}' in keys
+    assert "export_latency_p99_seconds" in keys
+    assert "target_rate" in keys
+
+
+def test_metrics_report_load_profile_target_rate(client):
+    config = {
+        "batch_size": 2,
+        "threads": 1,
+        "load_profile": "ramp:from=1000,to=2000,over=100",
+    }
+
+    client.post("/start", json=config)
+    time.sleep(0.2)
+    body = client.get("/metrics").data.decode("utf-8")
+    client.post("/stop")
+
+    rates = [
+        line.split()[1] for line in body.splitlines() if line.startswith("target_rate ")
+    ]
+    assert 1000 < float(rates[0]) < 1020
+
+
+def test_load_profile_starts_once_the_corpus_is_built(client):
+    build_corpus = LoadGenerator.get_corpus
+
+    def slow_get_corpus(self, args):
+        if self.corpus is None:
+            time.sleep(0.5)
+        return build_corpus(self, args)
+
+    config = {
+        "batch_size": 2,
+        "threads": 1,
+        "load_profile": "ramp:from=1000,to=101000,over=10",
+    }
+    with patch.object(LoadGenerator, "get_corpus", slow_get_corpus):
+        client.post("/start", json=config)
+        time.sleep(0.7)
+        body = client.get("/metrics").data.decode("utf-8")
+        client.post("/stop")
+
+    # The ramp runs from when the workers can send, not from the request
+    rates = [
+        line.split()[1] for line in body.splitlines() if line.startswith("target_rate ")
+    ]
+    assert 1000 < float(rates[0]) < 4000
+
+
+def test_metrics_report_pinned_worker_cpus(client):
+    cpu = min(os.sched_getaffinity(0))
+    config = {"batch_size": 2, "threads": 2, "cpu_affinity": str(cpu)}
+
+    client.post("/start", json=config)
+    time.sleep(0.2)
+    body = client.get("/metrics").data.decode("utf-8")
+    client.post("/stop")
+
+    # Both workers share the only CPU given
+    assert f'worker_cpus{{worker="0",cpus="{cpu}"}} 1' in body.splitlines()
+    assert f'worker_cpus{{worker="1",cpus="{cpu}"}} 1' in body.splitlines()
+
+
+def test_metrics_report_cpu_headroom(client):
+    client.post("/start", json={"batch_size": 2, "threads": 2})
+    time.sleep(0.3)
+    body = client.get("/metrics").data.decode("utf-8")
+    client.post("/stop")
+
+    lines = body.splitlines()
+    utilization = [
+        float(line.split()[1])
+        for line in lines
+        if line.startswith("worker_cpu_utilization{")
+    ]
+    headroom = [float(line.split()[1]) for line in lines if line.startswith("cpu_")]
+    assert len(utilization) == 2 and all(0 < u <= 1 for u in utilization)
+    # Both worker threads share the GIL
+    assert headroom == [pytest.approx(max(0, 1 - sum(utilization)), abs=0.01)]
+
+
+def test_calibrate_rejects_invalid_requests(client):
+    response = client.post("/calibrate", json={"load_type": "syslog"})
+    assert response.status_code == 400
+
+    response = client.post("/calibrate", json={"duration": 0})
+    assert response.status_code == 400
@@ -0,0 +1,86 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from latency import LATENCY_BOUNDS, LatencyHistogram  # noqa: E402
+
+
+def test_quantiles_are_within_one_bucket():
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.record(i / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.sum == pytest.approx(500.5)
+    for q, expected in [(0.5, 0.5), (0.9, 0.9), (0.99, 0.99), (0.999, 0.999)]:
+        assert histogram.quantile(q) == pytest.approx(expected, rel=0.19)
+    assert LatencyHistogram().quantile(0.99) == 0.0
+
+
+def test_merged_histograms_add_bucket_counts():
+    fast, slow = LatencyHistogram(), LatencyHistogram()
+    for _ in range(90):
+        fast.record(0.001)
+    for _ in range(10):
+        slow.record(1.0)
+    # Overflows land in the last bucket
+    slow.record(LATENCY_BOUNDS[-1] * 2)
+
+    merged = LatencyHistogram.merged([fast, slow])
+
+    assert merged.count == 101
+    assert merged.quantile(0.5) == pytest.approx(0.001, rel=0.19)
+    assert merged.quantile(0.95) == pytest.approx(1.0, rel=0.19)
+    assert merged.quantile(1.0) == LATENCY_BOUNDS[-1]
+    assert fast.count == 90
+
+
+def test_subtract_removes_an_earlier_snapshot():
+    histogram = LatencyHistogram()
+    for _ in range(10):
+        histogram.record(0.001)
+    snapshot = LatencyHistogram.merged([histogram])
+    for _ in range(5):
+        histogram.record(1.0)
+
+    histogram.subtract(snapshot)
+
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(5.0)
+    assert histogram.quantile(0.5) == pytest.approx(1.0, rel=0.19)
+
+
+def test_prometheus_lines_are_cumulative():
+    histogram = LatencyHistogram()
+    histogram.record(0.002)
+    histogram.record(0.2)
+
+    lines = histogram.prometheus_lines("export_latency_seconds")
+
+    assert "# TYPE export_latency_seconds histogram" in lines
+    buckets = [
+        line for line in lines if line.startswith("export_latency_seconds_bucket")
+    ]
+    counts = [int(line.split()[-1]) for line in buckets]
+    assert len(buckets) == len(LATENCY_BOUNDS) + 1
+    assert counts == sorted(counts)
+    assert buckets[-1] == 'export_latency_seconds_bucket{le="+Inf"} 2'
+    assert "export_latency_seconds_count 2" in lines
+    assert any(line.startswith("export_latency_p99_seconds ") for line in lines)
+
+
+def test_histogram_round_trips_through_prometheus_lines():
+    histogram = LatencyHistogram()
+    for seconds in (0.0001, 0.002, 0.002, 0.5, LATENCY_BOUNDS[-1] * 2):
+        histogram.record(seconds)
+    lines = ["sent 5"] + histogram.prometheus_lines("export_latency_seconds")
+
+    parsed = LatencyHistogram.from_prometheus_lines(lines, "export_latency_seconds")
+
+    assert parsed.counts == histogram.counts
+    assert parsed.sum == pytest.approx(histogram.sum)
+    with pytest.raises(ValueError):
+        LatencyHistogram.from_prometheus_lines(["sent 5"], "export_latency_seconds")
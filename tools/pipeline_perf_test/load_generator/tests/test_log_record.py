@@ -1,5 +1,6 @@
 import sys
 import os
+from typing import Dict
 
 # Add root dir to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -35,3 +36,148 @@ def test_create_log_record_structure():
     # Severity checks
     assert record.severity_text == "INFO"
     assert record.severity_number > 0
+
+
+def test_generate_random_strings_are_alphanumeric():
+    generator = LoadGenerator()
+
+    values = generator.generate_random_strings(100, 12)
+
+    assert len(values) == 100
+    assert all(len(v) == 12 for v in values)
+    assert all(v.isascii() and v.isalnum() for v in values)
+    # Strings cut from one buffer are still independent of each other.
+    assert len(set(values)) > 90
+
+
+def test_build_logs_request_batch_structure():
+    generator = LoadGenerator()
+    args = {
+        "batch_size": 4,
+        "body_size": 30,
+        "num_attributes": 3,
+        "attribute_value_size": 7,
+    }
+
+    request = generator.build_logs_request(args)
+    records = request.resource_logs[0].scope_logs[0].log_records
+
+    assert len(records) == 4
+    for record in records:
+        assert len(record.body.string_value) == 30
+        assert [a.key for a in record.attributes] == [
+            "attribute.1",
+            "attribute.2",
+            "attribute.3",
+        ]
+        assert all(len(a.value.string_value) == 7 for a in record.attributes)
+        assert record.severity_text == "INFO"
+        assert record.time_unix_nano > 0
+
+
+def test_build_trace_request_span_trees():
+    generator = LoadGenerator()
+    args = {
+        "batch_size": 24,
+        "num_attributes": 2,
+        "attribute_value_size": 5,
+        "spans_per_trace": 8,
+        "trace_depth": 3,
+        "span_events": 2,
+        "span_links": 1,
+    }
+
+    request = generator.build_trace_request(args)
+    spans = request.resource_spans[0].scope_spans[0].spans
+
+    assert len(spans) == 24
+    traces: Dict[bytes, list] = {}
+    for span in spans:
+        traces.setdefault(span.trace_id, []).append(span)
+    assert len(traces) == 3
+
+    for trace_spans in traces.values():
+        assert len(trace_spans) == 8
+        by_id = {span.span_id: span for span in trace_spans}
+        roots = [span for span in trace_spans if not span.parent_span_id]
+        assert len(roots) == 1
+        for span in trace_spans:
+            assert span.start_time_unix_nano <= span.end_time_unix_nano
+            assert len(span.attributes) == 2
+            assert len(span.events) == 2
+            assert len(span.links) == 1
+            depth = 1
+            parent = by_id.get(span.parent_span_id)
+            while parent is not None:
+                assert parent.start_time_unix_nano <= span.start_time_unix_nano
+                assert span.end_time_unix_nano <= parent.end_time_unix_nano
+                depth += 1
+                parent = by_id.get(parent.parent_span_id)
+            assert depth <= 3
+
+
+def test_build_metrics_request_mix_and_cardinality():
+    generator = LoadGenerator()
+    args = {
+        "batch_size": 40,
+        "num_attributes": 2,
+        "attribute_value_size": 6,
+        "metric_mix": "histogram=1,exponential_histogram=1",
+        "metric_series": 5,
+        "points_per_series": 4,
+    }
+
+    request = generator.build_metrics_request(args)
+    metrics = request.resource_metrics[0].scope_metrics[0].metrics
+
+    assert {m.name for m in metrics} <= {
+        "loadgen.histogram",
+        "loadgen.exponential_histogram",
+    }
+    points = [
+        point
+        for metric in metrics
+        for point in getattr(metric, metric.WhichOneof("data")).data_points
+    ]
+    assert len(points) == 40
+    series = {tuple(str(a.value) for a in point.attributes) for point in points}
+    assert len(series) == 5
+    for metric in metrics:
+        if metric.name == "loadgen.histogram":
+            for point in metric.histogram.data_points:
+                assert len(point.bucket_counts) == len(point.explicit_bounds) + 1
+                assert point.count == sum(point.bucket_counts)
+        else:
+            for point in metric.exponential_histogram.data_points:
+                assert point.count == (
+                    sum(point.positive.bucket_counts) + point.zero_count
+                )
+
+
+def test_create_syslog_batch_messages():
+    generator = LoadGenerator()
+
+    batch = generator.create_syslog_batch("host", batch_size=5, body_size=20)
+
+    assert len(batch) == 5
+    for message in batch:
+        assert message.startswith(b"<134>")
+        assert b" host loadgen: " in message
+        assert message.endswith(b"\n")
+        body = message.split(b"loadgen: ", 1)[1][:-1]
+        assert len(body) == 20
+
+
+def test_create_syslog_batch_rfc5424_octet_counted():
+    generator = LoadGenerator()
+
+    batch = generator.create_syslog_batch(
+        "host", batch_size=3, body_size=8, syslog_format="rfc5424", framing="octet"
+    )
+
+    for message in batch:
+        length, message = message.split(b" ", 1)
+        assert int(length) == len(message)
+        assert message.startswith(b"<134>1 ")
+        assert b" host loadgen " in message
+        assert len(message.rsplit(b" - - ", 1)[1]) == 8
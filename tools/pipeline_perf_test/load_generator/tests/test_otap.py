@@ -0,0 +1,172 @@
+import sys
+import os
+import time
+import threading
+from typing import Dict, List
+from unittest.mock import patch
+
+import pyarrow as pa  # type: ignore
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import otap  # noqa: E402
+from corpus import decode_varint, encode_varint, iter_fields  # noqa: E402
+from loadgen import LoadGenerator  # noqa: E402
+
+
+def read_streams(*messages):
+    """Decode BatchArrowRecords messages sent in order on one stream, the way
+    a receiver does: as one Arrow IPC stream per schema_id."""
+    streams: Dict[int, List[bytes]] = {}
+    for message in messages:
+        for field, _, start, end in iter_fields(message, 0, len(message)):
+            if field != 2:
+                continue
+            payload_type, record = otap.read_arrow_payload(message, start, end)
+            streams.setdefault(payload_type, []).append(record)
+    return {
+        payload_type: list(pa.ipc.open_stream(pa.BufferReader(b"".join(records))))
+        for payload_type, records in streams.items()
+    }
+
+
+def encode(bodies, values, keys=("attribute.1", "attribute.2"), compression="none"):
+    return otap.encode_logs_payloads(
+        bodies=bodies,
+        attribute_keys=list(keys),
+        attribute_values=values,
+        time_unix_nano=1_000,
+        severity_number=9,
+        severity_text="INFO",
+        compression=compression,
+    )
+
+
+def read_stream(*payloads):
+    first = otap.with_stream_schemas(payloads[0])
+    return read_streams(first, *payloads[1:])[otap.PAYLOAD_TYPE_LOG_ATTRS]
+
+
+def test_logs_payloads_decode_as_one_stream_per_schema():
+    first = encode(["a", "b"], ["x1", "y1", "x2", "y2"])
+    second = encode(["c"], ["x3", "y3"])
+
+    attrs = read_stream(first, second)
+
+    assert attrs[0].column("key").type == pa.dictionary(pa.uint8(), pa.utf8())
+    assert attrs[0].column("key").to_pylist() == [
+        "attribute.1",
+        "attribute.1",
+        "attribute.2",
+        "attribute.2",
+    ]
+    assert attrs[0].column("str").to_pylist() == ["x1", "x2", "y1", "y2"]
+    assert attrs[0].column("parent_id").to_pylist() == [0, 1, 0, 1]
+    assert attrs[1].column("str").to_pylist() == ["x3", "y3"]
+
+
+def test_logs_payloads_record_columns():
+    payload = encode(["a", "b", "c"], ["v"] * 6)
+
+    logs = read_streams(otap.with_stream_schemas(payload))[otap.PAYLOAD_TYPE_LOGS][0]
+
+    # Record ids are delta encoded
+    assert logs.column("id").to_pylist() == [0, 1, 1]
+    assert logs.column("severity_text").to_pylist() == ["INFO"] * 3
+    assert logs.column("body").field("str").to_pylist() == ["a", "b", "c"]
+
+
+def test_attribute_parent_ids_are_quasi_delta_encoded():
+    # Repeated key/value pairs store the parent id as a delta
+    payload = encode(["a", "b", "c"], ["same", "u1", "same", "u2", "other", "u3"])
+
+    attrs = read_stream(payload)[0]
+
+    assert attrs.column("str").to_pylist() == [
+        "same",
+        "same",
+        "other",
+        "u1",
+        "u2",
+        "u3",
+    ]
+    assert attrs.column("parent_id").to_pylist() == [0, 1, 2, 0, 1, 2]
+
+
+def test_zstd_payloads_decode_after_uncompressed_schema():
+    bodies = ["same log body"] * 200
+    plain = encode(bodies, ["x", "y"] * 200)
+    compressed = encode(bodies, ["x", "y"] * 200, compression="zstd")
+
+    assert len(compressed) < len(plain)
+    logs = read_streams(otap.with_stream_schemas(compressed), compressed)[
+        otap.PAYLOAD_TYPE_LOGS
+    ]
+    assert [batch.column("body").field("str").to_pylist() for batch in logs] == [
+        bodies,
+        bodies,
+    ]
+
+
+def test_batch_arrow_records_and_status_round_trip():
+    message = otap.batch_arrow_records(300, encode(["a"], ["x", "y"]))
+    fields = list(iter_fields(message, 0, len(message)))
+
+    assert fields[0][:2] == (1, 0)
+    assert decode_varint(message, fields[0][2])[0] == 300
+    assert [f for f, _, _, _ in fields[1:]] == [2, 2]
+
+    status = b"\x08" + encode_varint(300) + b"\x10\x08\x1a\x04full"
+    assert otap.decode_batch_status(status) == (300, 8, "full")
+    assert otap.decode_batch_status(b"\x08\x07") == (7, otap.STATUS_OK, "")
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_otap_worker_counts_acked_batches(mock_channel):
+    generator = LoadGenerator()
+    received = []
+
+    class ArrowLogsCall:
+        """Acks every batch of the stream, rejecting the second one."""
+
+        def __init__(self, requests):
+            self.requests = requests
+
+        def __iter__(self):
+            for request in self.requests:
+                received.append(request)
+                batch_id, _ = decode_varint(request, 1)
+                yield batch_id, 8 if batch_id == 1 else otap.STATUS_OK, ""
+
+        def cancel(self):
+            pass
+
+    mock_channel.return_value.stream_stream.return_value = ArrowLogsCall
+
+    args = {
+        "load_type": "otap",
+        "body_size": 10,
+        "num_attributes": 2,
+        "attribute_value_size": 5,
+        "batch_size": 4,
+        "threads": 1,
+        "target_rate": None,
+        "max_in_flight": 2,
+        "corpus_size": 2,
+    }
+
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.otap_worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(0.2)
+    generator.stop_event.set()
+    thread.join()
+
+    method = mock_channel.return_value.stream_stream.call_args.args[0]
+    assert method == otap.ARROW_LOGS_METHOD
+    assert len(received) > 2
+    # The whole stream decodes with the schemas sent only in the first batch
+    logs = read_streams(*received)[otap.PAYLOAD_TYPE_LOGS]
+    assert [batch.num_rows for batch in logs] == [4] * len(received)
+    assert generator.metrics["failed"] == 4
+    assert generator.metrics["sent"] == (len(received) - 1) * 4
@@ -0,0 +1,203 @@
+import gzip
+import json
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+import zstandard
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import otlp_http  # noqa: E402
+from loadgen import LoadGenerator  # noqa: E402
+from opentelemetry.proto.collector.logs.v1.logs_service_pb2 import (  # noqa: E402
+    ExportLogsServiceRequest,
+)
+
+
+class OtlpHttpServer(ThreadingHTTPServer):
+    requests: list
+    connections: set
+    status: int
+    response_headers: dict
+
+
+class OtlpHttpHandler(BaseHTTPRequestHandler):
+    server: OtlpHttpServer
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((self.path, dict(self.headers), body))
+        self.server.connections.add(self.client_address)
+        status = self.server.status
+        self.send_response(status)
+        for name, value in self.server.response_headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def otlp_http_server():
+    server = OtlpHttpServer(("127.0.0.1", 0), OtlpHttpHandler)
+    server.requests = []
+    server.connections = set()
+    server.status = 200
+    server.response_headers = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_to_otlp_json_uses_hex_ids_and_camel_case():
+    generator = LoadGenerator()
+    request = generator.build_trace_request(
+        {
+            "batch_size": 2,
+            "spans_per_trace": 2,
+            "num_attributes": 1,
+            "attribute_value_size": 4,
+        }
+    )
+
+    data = json.loads(otlp_http.to_otlp_json(request))
+    spans = data["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+    assert (
+        spans[0]["traceId"]
+        == request.resource_spans[0].scope_spans[0].spans[0].trace_id.hex()
+    )
+    assert len(spans[0]["spanId"]) == 16
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert isinstance(spans[0]["kind"], int)
+
+
+def test_http_exporter_reuses_keep_alive_connection(otlp_http_server):
+    host, port = otlp_http_server.server_address
+    exporter = otlp_http.HttpExporter(
+        f"http://{host}:{port}", "/v1/logs", encoding="json", compression="gzip"
+    )
+
+    for _ in range(5):
+        exporter.export(b"payload")
+    exporter.close()
+
+    assert exporter.connections_opened == 1
+    assert len(otlp_http_server.connections) == 1
+    path, headers, body = otlp_http_server.requests[0]
+    assert path == "/v1/logs"
+    assert headers["Content-Type"] == "application/json"
+    assert headers["Content-Encoding"] == "gzip"
+    assert body == b"payload"
+
+
+def test_http_exporter_raises_on_error_status(otlp_http_server):
+    otlp_http_server.status = 503
+    host, port = otlp_http_server.server_address
+    exporter = otlp_http.HttpExporter(f"http://{host}:{port}", "/v1/logs")
+
+    with pytest.raises(otlp_http.HttpExportError) as error:
+        exporter.export(b"payload")
+    assert error.value.status == 503
+    assert error.value.retry_after is None
+
+
+def test_http_exporter_reads_retry_after(otlp_http_server):
+    otlp_http_server.status = 429
+    otlp_http_server.response_headers = {"Retry-After": "7"}
+    host, port = otlp_http_server.server_address
+    exporter = otlp_http.HttpExporter(f"http://{host}:{port}", "/v1/logs")
+
+    with pytest.raises(otlp_http.HttpExportError) as error:
+        exporter.export(b"payload")
+    assert error.value.status == 429
+    assert error.value.retry_after == 7.0
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert otlp_http.parse_retry_after("30") == 30.0
+    assert otlp_http.parse_retry_after(None) is None
+    assert otlp_http.parse_retry_after("soon") is None
+    # A date in the past means retry now
+    assert otlp_http.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    later = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))
+    retry_after = otlp_http.parse_retry_after(later)
+    assert retry_after is not None and 55 < retry_after <= 60
+
+
+def test_worker_thread_sends_gzip_protobuf_over_http(otlp_http_server):
+    host, port = otlp_http_server.server_address
+    generator = LoadGenerator()
+    args = {
+        "transport": "otlp_http",
+        "http_encoding": "protobuf",
+        "compression": "gzip",
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 1,
+        "target_rate": None,
+    }
+
+    with patch.dict(os.environ, {"OTLP_HTTP_ENDPOINT": f"http://{host}:{port}"}):
+        generator.stop_event.clear()
+        thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+        thread.start()
+        time.sleep(0.2)
+        generator.stop_event.set()
+        thread.join()
+
+    requests = otlp_http_server.requests
+    assert requests
+    assert len(otlp_http_server.connections) == 1
+    path, headers, body = requests[0]
+    assert path == "/v1/logs"
+    assert headers["Content-Type"] == "application/x-protobuf"
+    request = ExportLogsServiceRequest.FromString(gzip.decompress(body))
+    assert len(request.resource_logs[0].scope_logs[0].log_records) == 3
+    assert generator.metrics["sent"] == len(requests) * 3
+    assert generator.metrics["bytes_sent"] == len(requests) * len(
+        request.SerializeToString()
+    )
+    assert generator.metrics["wire_bytes_sent"] == len(requests) * len(body)
+    assert generator.metrics["failed"] == 0
+
+
+def test_worker_thread_sends_zstd_json_over_http(otlp_http_server):
+    host, port = otlp_http_server.server_address
+    generator = LoadGenerator()
+    args = {
+        "transport": "otlp_http",
+        "http_encoding": "json",
+        "compression": "zstd",
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 1,
+        "target_rate": None,
+    }
+
+    with patch.dict(os.environ, {"OTLP_HTTP_ENDPOINT": f"http://{host}:{port}"}):
+        generator.stop_event.clear()
+        thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+        thread.start()
+        time.sleep(0.2)
+        generator.stop_event.set()
+        thread.join()
+
+    _, headers, body = otlp_http_server.requests[0]
+    assert headers["Content-Encoding"] == "zstd"
+    data = json.loads(zstandard.ZstdDecompressor().decompress(body))
+    assert len(data["resourceLogs"][0]["scopeLogs"][0]["logRecords"]) == 3
@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pacing import IDLE_STEP, Pacer  # noqa: E402
+
+
+def test_unpaced_wait_returns_immediately():
+    pacer = Pacer(None)
+    before = time.perf_counter()
+    intended, late = pacer.wait()
+
+    assert before <= intended <= time.perf_counter()
+    assert not late
+    assert pacer.latency_start(intended) >= intended
+
+
+@pytest.mark.parametrize("mode", ["closed", "open"])
+def test_uniform_slots_are_one_interval_apart(mode):
+    pacer = Pacer(0.002, mode=mode)
+    start = time.perf_counter()
+    slots = [pacer.wait()[0] for _ in range(50)]
+
+    assert slots[0] == pytest.approx(start, abs=0.001)
+    assert [b - a for a, b in zip(slots, slots[1:])] == pytest.approx(
+        [0.002] * 49, abs=1e-9
+    )
+    # The last slot is only released once its time has come
+    assert time.perf_counter() >= slots[-1]
+
+
+def test_open_loop_spins_to_sub_millisecond_precision():
+    pacer = Pacer(0.001, mode="open")
+    overshoot = []
+    for _ in range(100):
+        intended, _ = pacer.wait()
+        overshoot.append(time.perf_counter() - intended)
+
+    assert min(overshoot) >= 0
+    assert sorted(overshoot)[50] < 0.0005
+
+
+def test_poisson_gaps_average_the_interval():
+    pacer = Pacer(0.01, mode="open", arrivals="poisson", seed=1)
+    slots = []
+    for _ in range(5000):
+        # Only the schedule is under test, so skip the waiting.
+        slots.append(pacer._advance()[0])
+    gaps = [b - a for a, b in zip(slots, slots[1:])]
+
+    assert sum(gaps) / len(gaps) == pytest.approx(0.01, rel=0.05)
+    assert len(set(gaps)) > 1000
+
+
+def test_stalled_send_is_late_and_counted_from_intended_time():
+    pacer = Pacer(0.001, mode="open")
+    pacer.wait()
+    time.sleep(0.02)
+    intended, late = pacer.wait()
+
+    assert late
+    # Latency includes the time the send was held up behind the stall.
+    assert time.perf_counter() - pacer.latency_start(intended) >= 0.018
+    assert Pacer(0.001).latency_start(intended) > intended
+
+
+def test_wait_async_paces_without_blocking():
+    async def run():
+        pacer = Pacer(0.002, mode="open")
+        start = time.perf_counter()
+        for _ in range(25):
+            await pacer.wait_async()
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) == pytest.approx(0.048, abs=0.01)
+
+
+def test_schedule_follows_elapsed_time_and_idles_at_zero_rate():
+    # 10ms batches for the first 50ms of the run, then nothing
+    pacer = Pacer(lambda elapsed: 0.01 if elapsed < 0.05 else None, elapsed=0.02)
+    slots = []
+    for _ in range(3):
+        slots.append(pacer._advance()[:2])
+
+    assert [interval for _, interval in slots] == [0.01, 0.01, 0.01]
+    # Idle slots step by IDLE_STEP and release nothing to send.
+    assert pacer._advance()[1] is None
+    assert pacer.next_send_time - slots[-1][0] == pytest.approx(0.01 + IDLE_STEP)
+
+
+def test_idle_wait_returns_once_stopped():
+    stop_event = threading.Event()
+    pacer = Pacer(lambda elapsed: None, stop_event=stop_event)
+    threading.Timer(0.05, stop_event.set).start()
+    start = time.perf_counter()
+    pacer.wait()
+
+    assert time.perf_counter() - start == pytest.approx(0.05, abs=0.04)
@@ -0,0 +1,68 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from profiles import RateProfile, parse_load_profile  # noqa: E402
+
+
+def test_ramp_interpolates_then_holds():
+    profile = parse_load_profile("ramp:from=1000,to=3000,over=10")
+
+    assert profile.rate_at(0) == 1000
+    assert profile.rate_at(5) == pytest.approx(2000)
+    assert profile.rate_at(60) == 3000
+
+
+def test_steps_jump_at_each_edge():
+    profile = parse_load_profile("steps:start=100,step=50,every=10,count=3")
+
+    assert [profile.rate_at(t) for t in (0, 9.9, 10, 25, 100)] == [
+        100,
+        100,
+        150,
+        200,
+        200,
+    ]
+
+
+def test_spike_repeats_every_period():
+    profile = parse_load_profile("spike:base=10,peak=100,every=60,for=5")
+
+    assert profile.rate_at(30) == 10
+    assert profile.rate_at(56) == 100
+    assert profile.rate_at(61) == 10
+    assert profile.rate_at(119) == 100
+
+
+def test_csv_profile_is_scaled_and_sped_up(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text("# diurnal\noffset,rate\n0,1000\n3600,3000\n")
+    profile = parse_load_profile(f"csv:path={path},scale=0.5,speed=60")
+
+    assert profile.rate_at(0) == 500
+    assert profile.rate_at(30) == pytest.approx(1000)
+    assert profile.rate_at(600) == 1500
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        "sine:period=10",
+        "ramp:from=1,to=2",
+        "ramp:from=1,to=2,over=0",
+        "ramp:from=1,to=x,over=5",
+        "steps:start=1,step=1,every=1,bogus=1",
+        "spike:base=1,peak=2,every=5,for=6",
+    ],
+)
+def test_invalid_profiles(spec):
+    with pytest.raises(ValueError):
+        parse_load_profile(spec)
+
+
+def test_rate_profile_rejects_decreasing_offsets():
+    with pytest.raises(ValueError):
+        RateProfile([(10, 1), (5, 2)])
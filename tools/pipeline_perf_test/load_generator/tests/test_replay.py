@@ -0,0 +1,179 @@
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+# Add root dir to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from corpus import write_length_delimited  # noqa: E402
+from loadgen import LoadGenerator, count_log_records  # noqa: E402
+from opentelemetry.proto.collector.logs.v1.logs_service_pb2 import (  # noqa: E402
+    ExportLogsServiceRequest,
+)
+from opentelemetry.proto.logs.v1 import logs_pb2  # noqa: E402
+from otlp_http import to_otlp_json  # noqa: E402
+from replay import UNTIMED_PERIOD, Recording, read_recording  # noqa: E402
+from timestamps import (  # noqa: E402
+    LOG_TIMESTAMP_FIELDS,
+    find_timestamps,
+    shift_timestamps,
+)
+
+RECORDED_AT = 1_700_000_000_000_000_000
+
+
+def logs_request(*times, observed=0):
+    """Build a request with one log record per time, with ids and a body."""
+    return ExportLogsServiceRequest(
+        resource_logs=[
+            logs_pb2.ResourceLogs(
+                scope_logs=[
+                    logs_pb2.ScopeLogs(
+                        log_records=[
+                            logs_pb2.LogRecord(
+                                time_unix_nano=t,
+                                observed_time_unix_nano=observed,
+                                trace_id=bytes(range(16)),
+                                span_id=bytes(range(8)),
+                            )
+                            for t in times
+                        ]
+                    )
+                ]
+            )
+        ]
+    )
+
+
+def test_timestamps_are_shifted_in_place():
+    request = logs_request(RECORDED_AT, RECORDED_AT + 5, observed=RECORDED_AT + 9)
+    request.resource_logs[0].scope_logs[0].log_records[1].observed_time_unix_nano = 0
+    payload = bytearray(request.SerializeToString())
+
+    offsets = find_timestamps(payload, LOG_TIMESTAMP_FIELDS)
+    shift_timestamps(payload, offsets, 1000)
+
+    # The unset observed time of the second record is left unset.
+    assert len(offsets) == 3
+    records = ExportLogsServiceRequest.FromString(bytes(payload)).resource_logs[0]
+    records = records.scope_logs[0].log_records
+    assert [r.time_unix_nano for r in records] == [
+        RECORDED_AT + 1000,
+        RECORDED_AT + 1005,
+    ]
+    assert [r.observed_time_unix_nano for r in records] == [RECORDED_AT + 1009, 0]
+    assert records[0].trace_id == bytes(range(16))
+
+
+def test_json_lines_recording_matches_protobuf_recording(tmp_path):
+    requests = [logs_request(RECORDED_AT + i * 10**9, RECORDED_AT) for i in range(3)]
+    protobuf_path = str(tmp_path / "recording.bin")
+    json_path = str(tmp_path / "recording.jsonl")
+    write_length_delimited(protobuf_path, [r.SerializeToString() for r in requests])
+    with open(json_path, "wb") as f:
+        f.write(b"\n".join(to_otlp_json(r) for r in requests) + b"\n\n")
+
+    from_protobuf = read_recording(protobuf_path, count_log_records)
+    from_json = read_recording(json_path, count_log_records)
+
+    assert [bytes(p) for p in from_protobuf.payloads] == from_json.payloads
+    assert from_json.item_counts == [2, 2, 2]
+    from_protobuf.close()
+
+
+def test_recording_timing():
+    requests = [
+        logs_request(RECORDED_AT + 2 * 10**9),
+        logs_request(),
+        logs_request(RECORDED_AT + 10**9),
+        logs_request(RECORDED_AT + 4 * 10**9, RECORDED_AT + 3 * 10**9),
+    ]
+    corpus = MagicMock(payloads=[r.SerializeToString() for r in requests])
+
+    recording = Recording(corpus)
+
+    # Untimed and out of order requests go out with the request before them.
+    assert recording.recorded_at[1] == 0
+    assert recording.offsets == [0.0, 0.0, 0.0, 1.0]
+    assert recording.period == 1.0 + 1.0 / 3
+
+
+def test_untimed_recordings_are_sent_once_per_untimed_period():
+    single = MagicMock(payloads=[logs_request(RECORDED_AT).SerializeToString()])
+    untimed = MagicMock(payloads=[logs_request().SerializeToString()] * 2)
+
+    assert Recording(single).period == UNTIMED_PERIOD
+    assert Recording(untimed).offsets == [0.0, 0.0]
+    assert Recording(untimed).period == UNTIMED_PERIOD
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_replay_worker_loops_at_recorded_speed(mock_channel, tmp_path):
+    # Four requests 100ms apart, replayed at twice their speed: one pass
+    # every 200ms.
+    path = str(tmp_path / "recording.bin")
+    requests = [logs_request(RECORDED_AT + i * 10**8) for i in range(4)]
+    write_length_delimited(path, [r.SerializeToString() for r in requests])
+    mock_export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = mock_export
+
+    generator = LoadGenerator()
+    args = {
+        "load_type": "replay",
+        "corpus_path": path,
+        "replay_speed": 2.0,
+        "threads": 1,
+        "started_at": time.time(),
+    }
+    thread = threading.Thread(target=generator.replay_worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(0.45)
+    generator.stop_event.set()
+    thread.join()
+    assert generator.corpus is not None
+    generator.corpus.close()
+
+    sent = [
+        ExportLogsServiceRequest.FromString(call.args[0])
+        for call in mock_export.call_args_list
+    ]
+    times = [
+        r.resource_logs[0].scope_logs[0].log_records[0].time_unix_nano for r in sent
+    ]
+    assert 8 <= len(sent) <= 10
+    assert generator.metrics["sent"] == len(sent)
+    # Every request, including the first, went out on time
+    assert generator.metrics["late_batches"] == 0
+    # Requests are re-timestamped to their replay time, about 50ms apart.
+    assert all(abs(t - time.time_ns()) < 10**9 for t in times)
+    assert all(
+        0.03e9 < later - earlier < 0.07e9 for earlier, later in zip(times, times[1:])
+    )
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_replay_worker_loops_over_a_single_request(mock_channel, tmp_path):
+    path = str(tmp_path / "recording.bin")
+    write_length_delimited(path, [logs_request(RECORDED_AT).SerializeToString()])
+    mock_export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = mock_export
+
+    generator = LoadGenerator()
+    args = {
+        "load_type": "replay",
+        "corpus_path": path,
+        "threads": 1,
+        "started_at": time.time(),
+    }
+    thread = threading.Thread(target=generator.replay_worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(UNTIMED_PERIOD + 0.5)
+    generator.stop_event.set()
+    thread.join()
+    assert generator.corpus is not None
+    generator.corpus.close()
+
+    # Sent at the start and once more after UNTIMED_PERIOD
+    assert mock_export.call_count == 2
@@ -0,0 +1,232 @@
+import sys
+import os
+import random
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import grpc  # type: ignore
+import pytest
+from google.protobuf import any_pb2, duration_pb2  # type: ignore
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from corpus import encode_varint  # noqa: E402
+from loadgen import LoadGenConfig, LoadGenerator  # noqa: E402
+from otlp_http import HttpExportError  # noqa: E402
+from retry import (  # noqa: E402
+    DROPPED_AFTER_RETRY,
+    QUEUE_FULL,
+    RETRIED,
+    RETRY_INFO_TYPE,
+    STATUS_DETAILS_KEY,
+    RetryQueue,
+    classify_error,
+    parse_retry_info,
+)
+
+
+class FakeRpcError(grpc.RpcError):
+    def __init__(self, code, metadata=()):
+        self._code = code
+        self._metadata = metadata
+
+    def code(self):
+        return self._code
+
+    def trailing_metadata(self):
+        return self._metadata
+
+
+def status_details(seconds: int, nanos: int = 0) -> bytes:
+    """A serialized google.rpc.Status carrying a RetryInfo detail."""
+    delay = duration_pb2.Duration(seconds=seconds, nanos=nanos).SerializeToString()
+    retry_info = b"\x0a" + encode_varint(len(delay)) + delay
+    detail = any_pb2.Any(type_url=RETRY_INFO_TYPE, value=retry_info)
+    detail = detail.SerializeToString()
+    return b"\x08\x08" + b"\x1a" + encode_varint(len(detail)) + detail
+
+
+def test_backoff_grows_to_max_interval_with_jitter():
+    queue = RetryQueue(10, initial_interval=1.0, max_interval=4.0)
+    queue.rng = MagicMock(random=MagicMock(return_value=0.5))
+    assert [queue.backoff(attempt) for attempt in (1, 2, 3, 4, 5)] == [
+        1.0,
+        1.5,
+        2.25,
+        3.375,
+        4.0,
+    ]
+    queue.rng = random.Random(1)
+    for _ in range(100):
+        assert 0.5 <= queue.backoff(1) <= 1.5
+
+
+def test_retry_queue_pops_batches_in_due_order():
+    queue = RetryQueue(10, rng=random.Random(0))
+    assert queue.add(1, 3, "UNAVAILABLE", now=0.0, retry_after=2.0) == RETRIED
+    assert queue.add(2, 3, "UNAVAILABLE", now=0.0, retry_after=1.0) == RETRIED
+
+    assert queue.pop_due(0.5) is None
+    retry = queue.pop_due(1.0)
+    assert retry is not None and retry.index == 2
+    retry = queue.pop_due(5.0)
+    assert retry is not None
+    assert (retry.index, retry.items, retry.attempts) == (1, 3, 1)
+    assert len(queue) == 0
+
+
+def test_retry_queue_reports_full_and_drains():
+    queue = RetryQueue(2, initial_interval=1.0)
+    assert queue.add(0, 5, "RESOURCE_EXHAUSTED", now=0.0) == RETRIED
+    assert queue.add(1, 5, "RESOURCE_EXHAUSTED", now=0.0) == RETRIED
+    assert queue.add(2, 5, "RESOURCE_EXHAUSTED", now=0.0) == QUEUE_FULL
+
+    assert queue.drain() == 10
+    assert len(queue) == 0
+
+
+def test_retry_queue_drops_batches_past_max_elapsed_time():
+    queue = RetryQueue(10, initial_interval=1.0, max_elapsed_time=10.0)
+    queue.add(0, 1, "UNAVAILABLE", now=100.0, retry_after=4.0)
+    retry = queue.pop_due(104.0)
+    assert retry is not None
+    assert queue.add(0, 1, "UNAVAILABLE", 104.0, 5.0, retry) == RETRIED
+    retry = queue.pop_due(109.0)
+    assert retry is not None
+    assert retry.attempts == 2
+    assert retry.first_failed_at == 100.0
+
+    assert queue.add(0, 1, "UNAVAILABLE", 109.0, 2.0, retry) == DROPPED_AFTER_RETRY
+
+
+def test_parse_retry_info_reads_the_retry_delay():
+    assert parse_retry_info(status_details(3, 500_000_000)) == pytest.approx(3.5)
+    assert parse_retry_info(b"\x08\x08") is None
+
+
+def test_classify_error():
+    unavailable = FakeRpcError(grpc.StatusCode.UNAVAILABLE)
+    exhausted = FakeRpcError(
+        grpc.StatusCode.RESOURCE_EXHAUSTED, ((STATUS_DETAILS_KEY, status_details(2)),)
+    )
+    invalid = FakeRpcError(grpc.StatusCode.INVALID_ARGUMENT)
+
+    assert classify_error(unavailable) == ("UNAVAILABLE", None)
+    assert classify_error(exhausted) == ("RESOURCE_EXHAUSTED", 2.0)
+    assert classify_error(invalid) == (None, None)
+    assert classify_error(HttpExportError(429, "Too Many", 1.0)) == ("429", 1.0)
+    assert classify_error(HttpExportError(400, "Bad Request")) == (None, None)
+    assert classify_error(ConnectionRefusedError()) == ("UNAVAILABLE", None)
+    assert classify_error(ValueError()) == (None, None)
+
+
+def run_worker(generator: LoadGenerator, args: dict, seconds: float = 0.3) -> None:
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(seconds)
+    generator.stop_event.set()
+    thread.join()
+
+
+WORKER_ARGS = {
+    "body_size": 10,
+    "num_attributes": 1,
+    "attribute_value_size": 5,
+    "batch_size": 3,
+    "threads": 1,
+    "target_rate": None,
+    "retry_on_failure": True,
+    "retry_initial_interval": 0.01,
+    "retry_max_interval": 0.01,
+}
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_retries_a_rejected_batch(mock_channel):
+    generator = LoadGenerator()
+    calls = []
+
+    def export(payload):
+        calls.append(payload)
+        if len(calls) == 1:
+            raise FakeRpcError(grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+    mock_channel.return_value.unary_unary.side_effect = lambda *a, **kw: export
+
+    run_worker(generator, WORKER_ARGS)
+
+    metrics = generator.get_metrics()
+    assert metrics['retried{code="RESOURCE_EXHAUSTED"}'] == 1
+    assert metrics["failed"] == 0
+    assert metrics["sent"] == (len(calls) - 1) * 3
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_counts_queue_full_and_pending_retries_as_failed(mock_channel):
+    generator = LoadGenerator()
+    export = MagicMock(side_effect=FakeRpcError(grpc.StatusCode.UNAVAILABLE))
+    mock_channel.return_value.unary_unary.return_value = export
+    args = {
+        **WORKER_ARGS,
+        "target_rate": 300,
+        "retry_queue_size": 1,
+        "retry_initial_interval": 60.0,
+        "retry_max_interval": 60.0,
+    }
+
+    run_worker(generator, args)
+
+    metrics = generator.get_metrics()
+    assert metrics['retried{code="UNAVAILABLE"}'] == 1
+    assert metrics['queue_full{code="UNAVAILABLE"}'] == export.call_count - 1
+    assert metrics["failed"] == export.call_count * 3
+    assert metrics["sent"] == 0
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_does_not_retry_permanent_errors(mock_channel):
+    generator = LoadGenerator()
+    export = MagicMock(side_effect=FakeRpcError(grpc.StatusCode.INVALID_ARGUMENT))
+    mock_channel.return_value.unary_unary.return_value = export
+
+    run_worker(generator, {**WORKER_ARGS, "target_rate": 300})
+
+    metrics = generator.get_metrics()
+    assert metrics["failed"] == export.call_count * 3
+    assert not any(v for k, v in metrics.items() if "{" in k)
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_keeps_sending_new_batches_under_a_retry_backlog(mock_channel):
+    generator = LoadGenerator()
+
+    def export(payload):
+        # Slower than the retry backoff, so some retry is always due
+        time.sleep(0.002)
+        raise FakeRpcError(grpc.StatusCode.UNAVAILABLE)
+
+    mock_channel.return_value.unary_unary.return_value = export
+    args = {
+        **WORKER_ARGS,
+        "target_rate": 300,
+        "retry_initial_interval": 0.001,
+        "retry_max_interval": 0.001,
+    }
+
+    run_worker(generator, args)
+
+    # Every new batch is still waiting to be retried when the run stops, so
+    # it is counted as failed then.
+    new_batches = generator.get_metrics()["failed"] // 3
+    assert new_batches >= 20
+
+
+def test_config_rejects_retries_for_unsupported_load_types():
+    with pytest.raises(ValueError, match="retry_on_failure"):
+        LoadGenConfig(load_type="syslog", retry_on_failure=True)
+    with pytest.raises(ValueError, match="retry_max_interval"):
+        LoadGenConfig(
+            retry_on_failure=True, retry_initial_interval=10, retry_max_interval=5
+        )
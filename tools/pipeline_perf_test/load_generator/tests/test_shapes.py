@@ -0,0 +1,114 @@
+import json
+import random
+import sys
+import os
+from typing import Dict, Set
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from loadgen import LoadGenConfig, LoadGenerator  # noqa: E402
+from shapes import (  # noqa: E402
+    PRESETS,
+    DataShape,
+    ShapePools,
+    load_data_shape,
+    parse_size,
+    sample_size,
+)
+
+
+def test_sizes():
+    rng = random.Random(1)
+    assert sample_size(parse_size("25"), rng) == 25
+    assert all(
+        10 <= sample_size(parse_size("uniform:10,20"), rng) <= 20 for _ in range(100)
+    )
+    assert all(sample_size(parse_size("normal:5,50"), rng) >= 0 for _ in range(100))
+    sizes = sorted(
+        sample_size(parse_size("lognormal:100,0.5"), rng) for _ in range(999)
+    )
+    assert 80 < sizes[499] < 120
+    for spec in ["-1", "x", "zipf:1,2", "uniform:5", "uniform:9,3", "lognormal:0,1"]:
+        with pytest.raises(ValueError):
+            parse_size(spec)
+
+
+def test_load_data_shape(tmp_path):
+    assert load_data_shape("K8S") == DataShape(**PRESETS["k8s"])
+    assert load_data_shape('{"resources": 3}').resources == 3
+    path = tmp_path / "shape.json"
+    path.write_text(json.dumps({"body_types": {"bytes": 1}}))
+    assert load_data_shape(str(path)).body_types == {"bytes": 1}
+
+    for spec in ["nonexistent", '{"resources": 0}', '{"value_types": {"uuid": 1}}']:
+        with pytest.raises(ValueError):
+            load_data_shape(spec)
+    with pytest.raises(ValueError):
+        load_data_shape('{"attributes": 5, "attribute_keys": 4}')
+
+
+def test_requests_follow_the_shape():
+    shape = DataShape(
+        resources=3,
+        scopes=2,
+        resource_attributes=2,
+        attributes=3,
+        attribute_keys=5,
+        attribute_values=4,
+        value_types={"string": 1, "int": 1, "kvlist": 1, "array": 1},
+        value_size="uniform:8,16",
+        body_types={"kvlist": 1, "bytes": 1},
+        bodies=7,
+    )
+    pools = ShapePools(shape)
+
+    request = pools.build_logs_request(600, time_unix_nano=123)
+
+    assert len(request.resource_logs) == 3
+    assert {
+        r.resource.attributes[0].value.string_value for r in request.resource_logs
+    } == {"resource-0-0", "resource-1-0", "resource-2-0"}
+    groups = [s.log_records for r in request.resource_logs for s in r.scope_logs]
+    assert [len(g) for g in groups] == [100] * 6
+    records = [record for group in groups for record in group]
+    assert all(r.time_unix_nano == 123 for r in records)
+    assert len({r.body.SerializeToString() for r in records}) <= 7
+    assert {r.body.WhichOneof("value") for r in records} <= {
+        "kvlist_value",
+        "bytes_value",
+    }
+
+    values_by_key: Dict[str, Set[bytes]] = {}
+    for record in records:
+        assert len({a.key for a in record.attributes}) == 3
+        for attribute in record.attributes:
+            values_by_key.setdefault(attribute.key, set()).add(
+                attribute.value.SerializeToString()
+            )
+    assert len(values_by_key) == 5
+    assert all(len(values) <= 4 for values in values_by_key.values())
+    # Every key keeps one value type
+    for key, values in values_by_key.items():
+        pool = pools.values[pools.keys.index(key)]
+        assert len({v.WhichOneof("value") for v in pool}) == 1
+
+
+def test_data_shape_is_used_for_generated_logs():
+    generator = LoadGenerator()
+    args = {"batch_size": 40, "data_shape": "k8s"}
+
+    request = generator.build_logs_request(args)
+
+    assert len(request.resource_logs) == 20
+    assert (
+        sum(len(s.log_records) for r in request.resource_logs for s in r.scope_logs)
+        == 40
+    )
+    assert LoadGenConfig(data_shape="wide").data_shape == "wide"
+    with pytest.raises(ValidationError):
+        LoadGenConfig(data_shape="wide", load_type="traces")
+    with pytest.raises(ValidationError):
+        LoadGenConfig(data_shape="tall")
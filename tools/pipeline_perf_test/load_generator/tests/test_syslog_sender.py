@@ -0,0 +1,144 @@
+import errno
+import re
+import socket
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import cast
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import syslog_sender  # noqa: E402
+from loadgen import LoadGenerator  # noqa: E402
+from syslog_sender import DatagramSender, frame, syslog_header  # noqa: E402
+
+
+def test_syslog_headers():
+    now = datetime(2024, 3, 5, 7, 8, 9, 123456, tzinfo=timezone.utc)
+
+    assert (
+        syslog_header("rfc3164", "host", now) == b"<134>Mar  5 07:08:09 host loadgen: "
+    )
+    assert (
+        syslog_header("rfc5424", "host", now)
+        == (
+            f"<134>1 2024-03-05T07:08:09.123456Z host loadgen {os.getpid()} - - "
+        ).encode()
+    )
+
+
+def test_framing():
+    assert frame(b"<134>hello", "newline") == b"<134>hello\n"
+    assert frame(b"<134>hello", "octet") == b"10 <134>hello"
+    assert frame(b"<134>hello", None) == b"<134>hello"
+
+
+@pytest.fixture
+def udp_server():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(1)
+    yield server
+    server.close()
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_datagram_sender_sends_every_message(udp_server, batched):
+    messages = [b"message %d" % i for i in range(2000)]
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    sender = DatagramSender(sock, udp_server.getsockname(), messages, batched=batched)
+
+    sent, sent_bytes, failed = sender.send_batch()
+    received = [udp_server.recv(100) for _ in range(sent)]
+    sock.close()
+
+    assert (sent, failed) == (2000, 0)
+    assert sent_bytes == sum(len(m) for m in messages)
+    assert received == messages
+    assert sender.batched == (batched and syslog_sender._sendmmsg is not None)
+
+
+class FullBufferSocket:
+    """A UDP socket whose send buffer is full for the first few sends."""
+
+    def __init__(self, full_sends):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.full_sends = full_sends
+        self.calls = 0
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def sendto(self, data, address):
+        self.calls += 1
+        if self.calls <= self.full_sends:
+            raise OSError(errno.EAGAIN, "Resource temporarily unavailable")
+        return len(data)
+
+
+def test_datagram_sender_waits_out_a_full_send_buffer(udp_server):
+    sock = FullBufferSocket(full_sends=2)
+    sender = DatagramSender(
+        cast(socket.socket, sock), udp_server.getsockname(), [b"x"], batched=False
+    )
+
+    assert sender.send_batch() == (1, 1, 0)
+    assert sock.calls == 3
+    sock.sock.close()
+
+
+def test_tcp_worker_sends_octet_counted_rfc5424(monkeypatch):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    monkeypatch.setenv("SYSLOG_SERVER", "127.0.0.1")
+    monkeypatch.setenv("SYSLOG_PORT", str(server.getsockname()[1]))
+
+    received = bytearray()
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            while chunk := conn.recv(65536):
+                received.extend(chunk)
+
+    reader = threading.Thread(target=serve)
+    reader.start()
+
+    generator = LoadGenerator()
+    args = {
+        "body_size": 10,
+        "batch_size": 5,
+        "threads": 1,
+        "target_rate": None,
+        "syslog_format": "rfc5424",
+        "syslog_framing": "octet",
+        "syslog_send_buffer": 65536,
+    }
+    worker = threading.Thread(target=generator.syslog_tcp_worker_thread, args=(0, args))
+    worker.start()
+    time.sleep(0.2)
+    generator.stop_event.set()
+    worker.join()
+    reader.join()
+    server.close()
+
+    messages = []
+    pos = 0
+    prefix = re.compile(rb"(\d+) ")
+    while pos < len(received):
+        match = prefix.match(received, pos)
+        assert match is not None
+        pos = match.end() + int(match.group(1))
+        messages.append(bytes(received[match.end() : pos]))  # noqa: E203
+    assert len(messages) == generator.metrics["sent"]
+    assert all(
+        m.startswith(b"<134>1 ") and len(m.split(b" - - ", 1)[1]) == 10
+        for m in messages
+    )
@@ -0,0 +1,95 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from loadgen import LoadGenerator  # noqa: E402
+from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import (  # noqa: E402
+    ExportMetricsServiceRequest,
+)
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (  # noqa: E402
+    ExportTraceServiceRequest,
+)
+from timestamps import (  # noqa: E402
+    METRIC_TIMESTAMP_FIELDS,
+    TRACE_TIMESTAMP_FIELDS,
+    Restamper,
+    earliest_timestamp,
+    find_timestamps,
+    latest_timestamp,
+)
+
+ARGS = {
+    "num_attributes": 1,
+    "attribute_value_size": 5,
+    "batch_size": 20,
+    "span_events": 1,
+}
+
+
+def test_trace_timestamps_are_restamped():
+    payload = LoadGenerator().build_trace_request(ARGS).SerializeToString()
+    offsets = find_timestamps(payload, TRACE_TIMESTAMP_FIELDS)
+    # Start, end and event time of each span
+    assert len(offsets) == 60
+
+    restamper = Restamper([payload], [offsets], [latest_timestamp(payload, offsets)])
+    now = 2 * 10**18
+    stamped = ExportTraceServiceRequest.FromString(bytes(restamper.stamp(0, now)))
+    spans = stamped.resource_spans[0].scope_spans[0].spans
+    original = ExportTraceServiceRequest.FromString(payload)
+    original_spans = original.resource_spans[0].scope_spans[0].spans
+
+    # Spans end, and their events happen, no later than now
+    assert max(s.end_time_unix_nano for s in spans) == now
+    assert max(s.events[0].time_unix_nano for s in spans) <= now
+    for span, original_span in zip(spans, original_spans):
+        shift = span.start_time_unix_nano - original_span.start_time_unix_nano
+        assert span.end_time_unix_nano - original_span.end_time_unix_nano == shift
+        assert (
+            span.events[0].time_unix_nano - original_span.events[0].time_unix_nano
+            == shift
+        )
+        assert span.span_id == original_span.span_id
+
+
+def test_metric_point_times_are_restamped_but_not_start_times():
+    args = {**ARGS, "points_per_series": 2}
+    payload = LoadGenerator().build_metrics_request(args).SerializeToString()
+    offsets = find_timestamps(payload, METRIC_TIMESTAMP_FIELDS)
+    assert len(offsets) == 20
+
+    restamper = Restamper([payload], [offsets], [latest_timestamp(payload, offsets)])
+    restamper.stamp(0, 5 * 10**18)
+    # Each send is patched from the corpus payload, not the previous send
+    now = 5 * 10**18 + 7
+    stamped = ExportMetricsServiceRequest.FromString(bytes(restamper.stamp(0, now)))
+    original = ExportMetricsServiceRequest.FromString(payload)
+    for metric, original_metric in zip(
+        stamped.resource_metrics[0].scope_metrics[0].metrics,
+        original.resource_metrics[0].scope_metrics[0].metrics,
+    ):
+        kind = metric.WhichOneof("data")
+        points = getattr(metric, kind).data_points
+        original_points = getattr(original_metric, kind).data_points
+        assert [p.time_unix_nano - now for p in points] == [
+            p.time_unix_nano - latest_timestamp(payload, offsets)
+            for p in original_points
+        ]
+        assert [p.start_time_unix_nano for p in points] == [
+            p.start_time_unix_nano for p in original_points
+        ]
+
+
+def test_no_stamped_timestamp_is_in_the_future():
+    args = {**ARGS, "points_per_series": 5}
+    payload = LoadGenerator().build_metrics_request(args).SerializeToString()
+    offsets = find_timestamps(payload, METRIC_TIMESTAMP_FIELDS)
+    latest = latest_timestamp(payload, offsets)
+    spread = latest - earliest_timestamp(payload, offsets)
+    assert spread > 0
+
+    now = 3 * 10**18
+    stamped = Restamper([payload], [offsets], [latest]).stamp(0, now)
+    assert latest_timestamp(stamped, offsets) == now
+    assert earliest_timestamp(stamped, offsets) == now - spread
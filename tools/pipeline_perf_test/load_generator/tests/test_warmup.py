@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import loadgen  # noqa: E402
+from loadgen import LoadGenConfig, LoadGenerator  # noqa: E402
+
+CONFIG: Dict[str, Any] = {
+    "body_size": 10,
+    "num_attributes": 1,
+    "attribute_value_size": 5,
+    "batch_size": 3,
+    "threads": 1,
+    "target_rate": 300,
+}
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_warmup_is_counted_apart(mock_channel):
+    export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = export
+    generator = LoadGenerator()
+
+    started = time.time()
+    generator.start(LoadGenConfig(**CONFIG, warmup_seconds=0.3))
+    time.sleep(0.15)
+
+    # Load is sent during the warmup, but only counted as warmup
+    metrics = generator.get_metrics()
+    assert metrics["warmup_sent"] > 0
+    assert metrics["sent"] == 0
+    assert generator.get_latency().count == 0
+
+    time.sleep(0.35)
+    generator.stop()
+
+    metrics = generator.get_metrics()
+    warmup_batches = metrics["warmup_sent"] // 3
+    assert metrics["sent"] > 0
+    assert metrics["sent"] + metrics["warmup_sent"] == export.call_count * 3
+    assert 0 < generator.get_latency().count <= export.call_count - warmup_batches
+    assert started + 0.3 <= generator.get_measure_from() < started + 0.4
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_run_stopped_during_warmup_is_all_warmup(mock_channel):
+    export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = export
+    generator = LoadGenerator()
+
+    generator.start(LoadGenConfig(**CONFIG, warmup_seconds=30))
+    time.sleep(0.15)
+    generator.stop()
+
+    metrics = generator.get_metrics()
+    assert metrics["sent"] == 0
+    assert metrics["warmup_sent"] == export.call_count * 3
+    assert generator.get_latency().count == 0
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_metrics_endpoint_reports_measurement_start(mock_channel):
+    mock_channel.return_value.unary_unary.return_value = MagicMock(return_value=None)
+    generator = LoadGenerator()
+    generator.start(LoadGenConfig(**CONFIG))
+    time.sleep(0.1)
+    generator.stop()
+
+    with patch.object(loadgen, "loadgen", generator):
+        with loadgen.app.test_client() as client:
+            text = client.get("/metrics").get_data(as_text=True)
+
+    lines = dict(line.rsplit(" ", 1) for line in text.splitlines() if line[0] != "#")
+    assert float(lines["measurement_start_time_seconds"]) > 0
+    # Without a warmup, everything is measured
+    assert lines["warmup_sent"] == "0"
+    assert int(lines["sent"]) > 0
@@ -0,0 +1,129 @@
+import sys
+import os
+import threading
+import time
+from typing import Any, Dict
+from unittest.mock import patch
+
+# Add root dir to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import loadgen  # noqa: E402
+from loadgen import COUNTER_NAMES, LoadGenerator, SharedCounters  # noqa: E402
+from null_sink import NullSink  # noqa: E402
+
+
+def test_shared_counters_sum_worker_slots():
+    counters = SharedCounters(3)
+    counters.add(0, {"sent": 10, "bytes_sent": 100})
+    counters.add(2, {"sent": 5, "failed": 2, "late_batches": 1})
+    counters.add(2, {"sent": 5})
+
+    assert counters.totals() == {
+        **dict.fromkeys(COUNTER_NAMES, 0),
+        "sent": 20,
+        "failed": 2,
+        "bytes_sent": 100,
+        "late_batches": 1,
+    }
+
+
+def test_shared_counter_slot_writes_are_visible_in_totals():
+    counters = SharedCounters(2)
+    slot = counters.slot(1)
+    slot[0] += 7
+    slot[4] += 1
+
+    assert counters.totals()["sent"] == 7
+    assert counters.totals()["late_batches"] == 1
+    assert counters.values[len(slot)] == 7
+
+
+def test_shared_latency_slot_records_into_the_merged_histogram():
+    counters = SharedCounters(2)
+    counters.latency_slot(1).record(0.002)
+    counters.latency_slot(1).record(0.004)
+
+    latency = counters.latency()
+    assert latency.count == 2
+    assert abs(latency.sum - 0.006) < 1e-9
+
+
+def test_shared_counters_record_cpu_placement():
+    counters = SharedCounters(3)
+    counters.set_cpus(2, [0])
+
+    assert counters.cpu_placement() == {2: [0]}
+
+
+def test_run_loadgen_with_worker_processes(monkeypatch):
+    # UDP sends succeed without a listener, so no server is needed.
+    monkeypatch.setenv("SYSLOG_SERVER", "127.0.0.1")
+    monkeypatch.setenv("SYSLOG_PORT", "55514")
+    monkeypatch.setenv("SYSLOG_TRANSPORT", "udp")
+
+    generator = LoadGenerator()
+    args: Dict[str, Any] = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 5,
+        "threads": 2,
+        "target_rate": 100,
+        "load_type": "syslog",
+        "workers": "processes",
+        "cpu_affinity": str(min(os.sched_getaffinity(0))),
+    }
+
+    thread = threading.Thread(target=generator.run_loadgen, args=(args,))
+    thread.start()
+
+    # Allow time for the spawned interpreters to start sending.
+    time.sleep(3)
+    # Counters are visible while the workers are still running
+    assert generator.get_metrics()["sent"] > 0
+    generator.stop_event.set()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive()
+    assert generator.shared_counters is None
+    assert generator.metrics["sent"] >= 2 * args["batch_size"]
+    assert generator.metrics["bytes_sent"] > 0
+    # Each worker process pinned itself and reported where it runs
+    cpu = min(os.sched_getaffinity(0))
+    assert generator.get_cpu_placement() == {0: [cpu], 1: [cpu]}
+
+
+def test_worker_process_latency_is_live_on_metrics(monkeypatch):
+    generator = LoadGenerator()
+    args: Dict[str, Any] = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 5,
+        "threads": 2,
+        "target_rate": 1000,
+        "load_type": "otlp",
+        "workers": "processes",
+    }
+
+    with NullSink() as sink:
+        monkeypatch.setenv("OTLP_ENDPOINT", sink.grpc_endpoint)
+        thread = threading.Thread(target=generator.run_loadgen, args=(args,))
+        thread.start()
+        # Allow time for the spawned interpreters to start sending.
+        time.sleep(3)
+        with patch.object(loadgen, "loadgen", generator):
+            with loadgen.app.test_client() as client:
+                text = client.get("/metrics").get_data(as_text=True)
+        generator.stop_event.set()
+        thread.join(timeout=30)
+
+    assert not thread.is_alive()
+    count = next(
+        float(line.split()[-1])
+        for line in text.splitlines()
+        if line.startswith("export_latency_seconds_count")
+    )
+    assert count > 0
+    assert generator.get_latency().count >= count
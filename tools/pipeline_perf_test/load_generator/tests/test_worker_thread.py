@@ -1,24 +1,32 @@
+import asyncio
 import sys
 import os
 import time
 import threading
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
 
 # Add root dir to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from latency import LATENCY_BOUNDS  # noqa: E402
 from loadgen import LoadGenerator  # noqa: E402
+from opentelemetry.proto.collector.logs.v1.logs_service_pb2 import (  # noqa: E402
+    ExportLogsServiceRequest,
+)
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (  # noqa: E402
+    ExportTraceServiceRequest,
+)
 
 
 @patch("loadgen.grpc.insecure_channel")
-@patch("loadgen.logs_service_pb2_grpc.LogsServiceStub")
-def test_worker_thread_sends_logs(mock_stub_class, mock_channel):
+def test_worker_thread_sends_logs(mock_channel):
     generator = LoadGenerator()
 
-    # Mock stub and its Export method
-    mock_stub = MagicMock()
-    mock_stub.Export.return_value = None
-    mock_stub_class.return_value = mock_stub
+    # Mock the pre-serialized Export call
+    mock_export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = mock_export
 
     # Set up args for the worker thread
     args = {
@@ -28,6 +36,7 @@ def test_worker_thread_sends_logs(mock_stub_class, mock_channel):
         "batch_size": 3,
         "threads": 1,
         "target_rate": None,
+        "fresh_timestamps": False,
     }
 
     # Start the thread and stop it shortly after
@@ -40,22 +49,238 @@ def test_worker_thread_sends_logs(mock_stub_class, mock_channel):
     generator.stop_event.set()
     thread.join()
 
-    # Verify Export was called
-    assert mock_stub.Export.called
-    assert generator.metrics["sent"] >= 3
-    assert generator.metrics["bytes_sent"] > 0
+    # Verify Export was called with the cached serialized batch
+    assert mock_export.called
+    payload = mock_export.call_args.args[0]
+    assert isinstance(payload, bytes)
+    assert all(call.args[0] is payload for call in mock_export.call_args_list)
+    assert generator.metrics["sent"] == mock_export.call_count * 3
+    assert generator.metrics["bytes_sent"] == mock_export.call_count * len(payload)
     assert generator.metrics["failed"] == 0
+    assert generator.get_latency().count == mock_export.call_count
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_metrics_are_live_while_worker_runs(mock_channel):
+    generator = LoadGenerator()
+    mock_channel.return_value.unary_unary.return_value = MagicMock(return_value=None)
+    args = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 1,
+        "target_rate": None,
+    }
+
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(0.2)
+
+    # Sent batches are visible before the worker exits
+    assert generator.get_metrics()["sent"] > 0
+    assert generator.metrics["sent"] == 0
+
+    generator.stop_event.set()
+    thread.join()
+
+    assert generator.live_counters == []
+    assert generator.counter_totals() == generator.metrics
+    assert generator.metrics["sent"] > 0
+
+
+@pytest.mark.parametrize("pacing, stalled", [("closed", 1), ("open", 5)])
+@patch("loadgen.grpc.insecure_channel")
+def test_open_loop_latency_includes_backlog_of_stalled_export(
+    mock_channel, pacing, stalled
+):
+    generator = LoadGenerator()
+    calls = []
+
+    def export(payload):
+        calls.append(payload)
+        if len(calls) == 1:
+            # One stalled Export holds up ~20 scheduled sends
+            time.sleep(0.1)
+
+    mock_channel.return_value.unary_unary.return_value = export
+    args = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 1,
+        "threads": 1,
+        # One batch every 5ms
+        "target_rate": 200,
+        "pacing": pacing,
+    }
+
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(0.3)
+    generator.stop_event.set()
+    thread.join()
+
+    latency = generator.get_latency()
+    slow = sum(latency.counts[i] for i, b in enumerate(LATENCY_BOUNDS) if b > 0.05)
+    if pacing == "closed":
+        # Only the stalled call itself looks slow
+        assert slow == stalled
+    else:
+        # Sends queued behind the stall are charged for their wait
+        assert slow >= stalled
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_sends_traces(mock_channel):
+    generator = LoadGenerator()
+
+    mock_export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = mock_export
+
+    args = {
+        "load_type": "traces",
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 6,
+        "spans_per_trace": 3,
+        "threads": 1,
+        "target_rate": None,
+    }
+
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(0.2)
+    generator.stop_event.set()
+    thread.join()
+
+    method = mock_channel.return_value.unary_unary.call_args.args[0]
+    assert method == "/opentelemetry.proto.collector.trace.v1.TraceService/Export"
+    payload = mock_export.call_args.args[0]
+    request = ExportTraceServiceRequest.FromString(payload)
+    assert len(request.resource_spans[0].scope_spans[0].spans) == 6
+    assert generator.metrics["sent"] == mock_export.call_count * 6
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_threads_share_payload(mock_channel):
+    generator = LoadGenerator()
+
+    mock_export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = mock_export
+
+    args = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 2,
+        "target_rate": None,
+        "fresh_timestamps": False,
+    }
+
+    generator.stop_event.clear()
+    threads = [
+        threading.Thread(target=generator.worker_thread, args=(i, args))
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(0.2)
+    generator.stop_event.set()
+    for thread in threads:
+        thread.join()
+
+    payloads = {id(call.args[0]) for call in mock_export.call_args_list}
+    assert generator.corpus is not None
+    assert payloads == {id(generator.corpus[0])}
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_cycles_corpus(mock_channel):
+    generator = LoadGenerator()
+
+    mock_export = MagicMock(return_value=None)
+    mock_channel.return_value.unary_unary.return_value = mock_export
+
+    args = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 1,
+        "target_rate": None,
+        "corpus_size": 3,
+        "fresh_timestamps": False,
+    }
+
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+    thread.start()
+
+    time.sleep(0.2)
+    generator.stop_event.set()
+    thread.join()
+
+    sent = [call.args[0] for call in mock_export.call_args_list]
+    assert generator.corpus is not None
+    assert len(set(generator.corpus.payloads)) == 3
+    assert sent[:6] == generator.corpus.payloads * 2
+
+
+@patch("loadgen.grpc.insecure_channel")
+def test_worker_thread_sends_fresh_timestamps(mock_channel):
+    generator = LoadGenerator()
+    sent = []
+
+    def export(payload):
+        sent.append((time.time_ns(), payload))
+        time.sleep(0.01)
+
+    mock_channel.return_value.unary_unary.return_value = export
+    args = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 1,
+        "target_rate": None,
+        "corpus_size": 2,
+    }
+
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.worker_thread, args=(0, args))
+    thread.start()
+    time.sleep(0.1)
+    generator.stop_event.set()
+    thread.join()
+
+    assert len(sent) > 4
+    assert generator.corpus is not None
+    previous = 0
+    for index, (sent_at, payload) in enumerate(sent):
+        request = ExportLogsServiceRequest.FromString(payload)
+        records = request.resource_logs[0].scope_logs[0].log_records
+        built = ExportLogsServiceRequest.FromString(generator.corpus[index % 2])
+        built_records = built.resource_logs[0].scope_logs[0].log_records
+        # Only the timestamps differ from the batch in the corpus
+        assert len(payload) == len(generator.corpus[index % 2])
+        assert [r.body for r in records] == [r.body for r in built_records]
+        assert previous < records[0].time_unix_nano <= sent_at
+        previous = records[0].time_unix_nano
 
 
 @patch("loadgen.grpc.insecure_channel")
-@patch("loadgen.logs_service_pb2_grpc.LogsServiceStub")
-def test_worker_thread_handles_export_failure(mock_stub_class, mock_channel):
+def test_worker_thread_handles_export_failure(mock_channel):
     generator = LoadGenerator()
 
     # Simulate gRPC Export failure
-    mock_stub = MagicMock()
-    mock_stub.Export.side_effect = Exception("gRPC failed")
-    mock_stub_class.return_value = mock_stub
+    mock_export = MagicMock(side_effect=Exception("gRPC failed"))
+    mock_channel.return_value.unary_unary.return_value = mock_export
 
     args = {
         "body_size": 10,
@@ -78,18 +303,16 @@ def test_worker_thread_handles_export_failure(mock_stub_class, mock_channel):
 
 
 @patch("loadgen.grpc.insecure_channel")
-@patch("loadgen.logs_service_pb2_grpc.LogsServiceStub")
-def test_worker_thread_rate_limiting_and_late_batches(mock_stub_class, mock_channel):
+def test_worker_thread_rate_limiting_and_late_batches(mock_channel):
     generator = LoadGenerator()
 
-    # Mock stub with delay to simulate late sending
+    # Mock Export with delay to simulate late sending
     def slow_export(request):
         time.sleep(0.3)  # delay > interval causes batch to be late
         return None
 
-    mock_stub = MagicMock()
-    mock_stub.Export.side_effect = slow_export
-    mock_stub_class.return_value = mock_stub
+    mock_export = MagicMock(side_effect=slow_export)
+    mock_channel.return_value.unary_unary.return_value = mock_export
 
     args = {
         "body_size": 5,
@@ -113,3 +336,47 @@ def test_worker_thread_rate_limiting_and_late_batches(mock_stub_class, mock_chan
     # late_batches should increase
     assert generator.metrics["late_batches"] > 0
     assert generator.metrics["sent"] >= 2
+
+
+@patch("loadgen.grpc.aio.insecure_channel")
+def test_async_worker_respects_max_in_flight(mock_channel):
+    generator = LoadGenerator()
+    mock_channel.return_value.close = AsyncMock()
+
+    in_flight = 0
+    peak_in_flight = 0
+
+    async def slow_export(request):
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+
+    mock_export = AsyncMock(side_effect=slow_export)
+    mock_channel.return_value.unary_unary = MagicMock(return_value=mock_export)
+
+    args = {
+        "body_size": 10,
+        "num_attributes": 1,
+        "attribute_value_size": 5,
+        "batch_size": 3,
+        "threads": 1,
+        "target_rate": None,
+        "max_in_flight": 4,
+    }
+
+    generator.stop_event.clear()
+    thread = threading.Thread(target=generator.async_worker_thread, args=(0, args))
+    thread.start()
+
+    time.sleep(0.3)
+    generator.stop_event.set()
+    thread.join()
+
+    # The window is filled but never exceeded, and every issued call that
+    # completed is accounted for.
+    assert peak_in_flight == 4
+    assert generator.metrics["sent"] == mock_export.await_count * 3
+    assert generator.metrics["failed"] == 0
+    mock_channel.return_value.close.assert_awaited_once()
@@ -0,0 +1,134 @@
+"""
+In-place timestamp rewriting of serialized OTLP requests.
+
+OTLP timestamps are fixed64 fields, so a new time can be written over an old
+one without changing the size of the message or re-encoding it. The offsets of
+the timestamp fields are found once, by walking the protobuf wire format of a
+serialized request, and every send then only patches eight bytes per
+timestamp.
+
+A timestamp spec describes where the timestamps of a request type are: it
+maps the field numbers of embedded messages to the spec of that message, and
+the field numbers of fixed64 timestamps to True.
+
+A Restamper copies each payload a worker sends into the worker's scratch
+buffer and moves its timestamps so that the latest is the current time,
+keeping their spacing within the request and never dating a record in the
+future.
+"""
+
+import struct
+from typing import Dict, List, Sequence, Union
+
+from corpus import WIRE_FIXED64, WIRE_LEN, iter_fields
+
+TimestampSpec = Dict[int, Union[bool, "TimestampSpec"]]
+
+# ExportLogsServiceRequest.resource_logs -> ResourceLogs.scope_logs ->
+# ScopeLogs.log_records -> LogRecord time_unix_nano, observed_time_unix_nano
+LOG_TIMESTAMP_FIELDS: TimestampSpec = {1: {2: {2: {1: True, 11: True}}}}
+
+# ExportTraceServiceRequest.resource_spans -> ResourceSpans.scope_spans ->
+# ScopeSpans.spans -> Span start_time_unix_nano, end_time_unix_nano and
+# Span.events -> Event time_unix_nano
+TRACE_TIMESTAMP_FIELDS: TimestampSpec = {1: {2: {2: {7: True, 8: True, 11: {1: True}}}}}
+
+# Every data point type keeps time_unix_nano in field 3, and its exemplars'
+# (field 5, 8 or 11 depending on the type) time_unix_nano in field 2. Fields
+# are only followed when their wire type matches, so the other types' fields
+# with those numbers are skipped. start_time_unix_nano is left alone, so that
+# cumulative series keep their start time instead of appearing to reset.
+_POINTS: TimestampSpec = {1: {3: True, 5: {2: True}, 8: {2: True}, 11: {2: True}}}
+
+# ExportMetricsServiceRequest.resource_metrics -> ResourceMetrics.scope_metrics
+# -> ScopeMetrics.metrics -> Metric gauge, sum, histogram,
+# exponential_histogram and summary -> data_points
+METRIC_TIMESTAMP_FIELDS: TimestampSpec = {
+    1: {2: {2: {5: _POINTS, 7: _POINTS, 9: _POINTS, 10: _POINTS, 11: _POINTS}}}
+}
+
+_FIXED64 = struct.Struct("<Q")
+
+
+def find_timestamps(payload, spec: TimestampSpec) -> List[int]:
+    """
+    Return the offsets of the non-zero timestamps of a serialized request.
+
+    Zero timestamps mean 'unset' in OTLP and are left out, so they stay unset
+    when the request is re-timestamped.
+    """
+    offsets: List[int] = []
+
+    def walk(start: int, end: int, spec: TimestampSpec) -> None:
+        for field, wire_type, value_start, value_end in iter_fields(
+            payload, start, end
+        ):
+            sub_spec = spec.get(field)
+            if sub_spec is True and wire_type == WIRE_FIXED64:
+                if _FIXED64.unpack_from(payload, value_start)[0]:
+                    offsets.append(value_start)
+            elif isinstance(sub_spec, dict) and wire_type == WIRE_LEN:
+                walk(value_start, value_end, sub_spec)
+
+    walk(0, len(payload), spec)
+    return offsets
+
+
+def earliest_timestamp(payload, offsets: List[int]) -> int:
+    """
+    Return the earliest of the timestamps at offsets, or 0 if there are none.
+    """
+    return min((_FIXED64.unpack_from(payload, o)[0] for o in offsets), default=0)
+
+
+def latest_timestamp(payload, offsets: List[int]) -> int:
+    """
+    Return the latest of the timestamps at offsets, or 0 if there are none.
+    """
+    return max((_FIXED64.unpack_from(payload, o)[0] for o in offsets), default=0)
+
+
+def shift_timestamps(buf: bytearray, offsets: List[int], delta_ns: int) -> None:
+    """
+    Move every timestamp at offsets by delta_ns nanoseconds, in place.
+    """
+    for offset in offsets:
+        _FIXED64.pack_into(buf, offset, _FIXED64.unpack_from(buf, offset)[0] + delta_ns)
+
+
+class Restamper:
+    """
+    A worker's view of a corpus whose payloads have their timestamps moved to
+    the current time as they are sent.
+
+    The offsets and latest timestamp of each payload are found once per
+    corpus and shared by every worker. A worker only owns a scratch buffer
+    the size of the largest payload, which each payload is copied into and
+    patched, so a send costs one copy of the payload plus eight bytes per
+    timestamp.
+
+    Attributes:
+        payloads: The corpus payloads, left unmodified.
+        offsets: Offsets of the timestamps of each payload.
+        latest: Latest timestamp of each payload, in Unix nanoseconds.
+    """
+
+    def __init__(self, payloads: Sequence, offsets: List[List[int]], latest: List[int]):
+        self.payloads = payloads
+        self.offsets = offsets
+        self.latest = latest
+        self._scratch = bytearray(max((len(p) for p in payloads), default=0))
+
+    def stamp(self, index: int, now_ns: int) -> memoryview:
+        """
+        Return payload index with its timestamps moved so that the latest is
+        at now_ns, as a view of the scratch buffer that the next call
+        overwrites.
+        """
+        payload = self.payloads[index]
+        size = len(payload)
+        self._scratch[:size] = payload
+        shift_timestamps(
+            self._scratch, self.offsets[index], now_ns - self.latest[index]
+        )
+        return memoryview(self._scratch)[:size]
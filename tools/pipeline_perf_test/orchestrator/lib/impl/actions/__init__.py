@@ -3,3 +3,4 @@ from . import multi_component_action
 from . import wait_action
 from . import update_component_strategy
 from . import no_op_action
+from . import max_throughput_search
@@ -0,0 +1,405 @@
+"""
+Module defining a step action that searches for the maximum sustainable throughput
+of a pipeline.
+
+The action repeatedly drives a load generator component using the
+`pipeline_perf_loadgen` execution strategy at candidate target rates. For each rate
+it starts the load, lets the pipeline settle for a warmup period (extended to the
+end of the load generator's own warmup, whose load its counters leave out), and then
+measures a short steady window by scraping the load generator's and the backend's
+Prometheus endpoints at the start and end of the window. A rate is judged sustainable
+when:
+
+- the load generator's `late_batches` grew by no more than `max_late_batches`
+  (i.e. it kept up with its schedule), and
+- the percentage of logs attempted in the window (`sent` + `failed`) that did not
+  reach the backend (`received_logs` by default) is at most `max_loss_percent`.
+
+Two search strategies are supported:
+
+- exponential: starts at `min_rate` and multiplies the rate by `growth_factor` until
+  a rate fails (or `max_rate` is reached), then bisects between the last good and
+  first failed rates.
+- binary: bisects between `min_rate` and `max_rate` directly.
+
+Both stop once the bounds are within `precision` (relative) of each other, or after
+`max_probes` probes. The highest sustainable rate is recorded as the
+`max_sustainable_rate` metric of the load generator component, so reports can select
+it, and as a `Max Throughput Found` event. Every probe is recorded as a
+`Throughput Probe` event with its measurements.
+
+Typical YAML configuration example:
+
+```yaml
+tests:
+  - name: Find Max Throughput
+    steps:
+      - name: Search Max Rate
+        action:
+          max_throughput_search:
+            target: load-generator
+            backend: backend-service
+            min_rate: 10000
+            max_rate: 2000000
+            max_loss_percent: 0.1
+```
+
+Classes:
+    - MaxThroughputSearchConfig: Configuration for the search bounds, strategy and
+      sustainability criteria.
+    - MaxThroughputSearchAction: Step action that runs the search.
+
+The action is registered in the test step action registry under the name
+`"max_throughput_search"`.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Literal, Optional
+from urllib.parse import urljoin
+
+import requests
+from prometheus_client import parser
+
+from ...core.context import StepContext
+from ...core.framework.step import StepActionConfig, StepAction
+from ...impl.component.managed_component import ManagedComponent
+from ...impl.strategies.execution.pipeline_perf_loadgen import (
+    PipelinePerfLoadgenConfig,
+    PipelinePerfLoadgenExecution,
+)
+from ...runner.registry import step_action_registry, PluginMeta
+
+ACTION_NAME = "max_throughput_search"
+
+LOADGEN_METRICS = ["sent", "failed", "late_batches"]
+MEASUREMENT_START = "measurement_start_time_seconds"
+
+
+@step_action_registry.register_config(ACTION_NAME)
+class MaxThroughputSearchConfig(StepActionConfig):
+    """
+    Configuration for the MaxThroughputSearchAction.
+
+    Attributes:
+        target (str): Name of the load generator component. Its execution strategy must
+            be `pipeline_perf_loadgen`; every other setting of it is kept as configured.
+        backend (str): Name of the backend component counting received logs.
+        backend_metrics_endpoint (Optional[str]): Prometheus endpoint of the backend.
+            Defaults to the endpoint of the backend's `prometheus` monitoring strategy.
+        received_metric (str): Backend counter of received items. Defaults to
+            'received_logs'.
+        search (Literal["exponential", "binary"]): Search strategy. Defaults to
+            'exponential'.
+        min_rate (int): Lowest rate (items/sec) to probe. Defaults to 1000.
+        max_rate (int): Highest rate (items/sec) to probe. Defaults to 1000000.
+        growth_factor (float): Rate multiplier between exponential probes.
+            Defaults to 2.
+        precision (float): Relative gap between the highest passing and the lowest
+            failing rate at which the search stops. Defaults to 0.05.
+        max_probes (int): Maximum number of rates to probe. Defaults to 12.
+        warmup_seconds (float): Time to let each rate settle before measuring,
+            extended to the end of the load generator's own warmup. Defaults to 5.
+        window_seconds (float): Length of the measured steady window. Defaults to 15.
+        drain_seconds (float): Time to let in-flight items drain after each probe.
+            Defaults to 3.
+        max_loss_percent (float): Highest loss percentage judged sustainable.
+            Defaults to 0.1.
+        max_late_batches (int): Highest number of late loadgen batches in the window
+            judged sustainable. Defaults to 0.
+    """
+
+    target: str = "load-generator"
+    backend: str = "backend-service"
+    backend_metrics_endpoint: Optional[str] = None
+    received_metric: str = "received_logs"
+    search: Literal["exponential", "binary"] = "exponential"
+    min_rate: int = 1000
+    max_rate: int = 1000000
+    growth_factor: float = 2.0
+    precision: float = 0.05
+    max_probes: int = 12
+    warmup_seconds: float = 5.0
+    window_seconds: float = 15.0
+    drain_seconds: float = 3.0
+    max_loss_percent: float = 0.1
+    max_late_batches: int = 0
+
+
+@dataclass
+class ProbeResult:
+    """
+    Measurements of the steady window of one probed rate.
+
+    Attributes:
+        rate (int): Target rate of the probe in items/sec.
+        attempted (float): Items the load generator sent or failed to send.
+        received (float): Items the backend received.
+        late_batches (float): Batches the load generator sent behind schedule.
+        loss_percent (float): Percentage of attempted items not received.
+        sustainable (bool): Whether the rate met the sustainability criteria.
+    """
+
+    rate: int
+    attempted: float
+    received: float
+    late_batches: float
+    loss_percent: float
+    sustainable: bool
+
+
+def scrape_counters(endpoint: str, names: List[str]) -> Dict[str, float]:
+    """
+    Scrape a Prometheus endpoint and sum the samples of each named metric.
+
+    Names match either a sample name or its family name, so counters can be given
+    with or without their '_total' suffix. Missing metrics are reported as 0.
+    """
+    resp = requests.get(endpoint, timeout=10)
+    resp.raise_for_status()
+    totals = dict.fromkeys(names, 0.0)
+    for family in parser.text_string_to_metric_families(resp.text):
+        for sample in family.samples:
+            for name in (sample.name, family.name):
+                if name in totals:
+                    totals[name] += sample.value
+                    break
+    return totals
+
+
+def search_max_rate(
+    probe: Callable[[int], bool],
+    min_rate: int,
+    max_rate: int,
+    search: str = "exponential",
+    growth_factor: float = 2.0,
+    precision: float = 0.05,
+    max_probes: int = 12,
+) -> Optional[int]:
+    """
+    Search for the highest rate in [min_rate, max_rate] for which probe returns True.
+
+    Assumes sustainability is monotonic in the rate. Returns None when no probed rate
+    was sustainable.
+    """
+    good: Optional[int] = None
+    bad: Optional[int] = None
+    probes = 0
+
+    def run(rate: int) -> bool:
+        nonlocal good, bad, probes
+        probes += 1
+        if probe(rate):
+            good = rate
+            return True
+        bad = rate
+        return False
+
+    if search == "exponential":
+        rate = min_rate
+        while probes < max_probes and run(rate) and rate < max_rate:
+            rate = min(max_rate, math.ceil(rate * growth_factor))
+        if good is None or bad is None:
+            return good
+    else:
+        bad = max_rate + 1
+        good = min_rate - 1
+
+    while probes < max_probes and bad - good > max(1, precision * max(good, 1)):
+        run((good + bad) // 2)
+    return good if good >= min_rate else None
+
+
+@step_action_registry.register_class(ACTION_NAME)
+class MaxThroughputSearchAction(StepAction):
+    """
+    Step action that searches for the highest load generator rate a pipeline sustains.
+
+    The load generator is started and stopped once per probed rate, with its target
+    rate overridden. Sustainability is judged over a steady window from the loadgen's
+    late batches and the loss between logs sent and logs received by the backend.
+
+    Attributes:
+        config (MaxThroughputSearchConfig): Search bounds, strategy and criteria.
+    """
+
+    PLUGIN_META = PluginMeta(
+        supported_contexts=[StepContext.__name__],
+        installs_hooks=[],
+        yaml_example="""
+tests:
+  - name: Find Max Throughput
+    steps:
+      - name: Search Max Rate
+        action:
+          max_throughput_search:
+            target: load-generator
+            backend: backend-service
+            backend_metrics_endpoint: http://localhost:5000/metrics
+            search: exponential
+            min_rate: 10000
+            max_rate: 2000000
+            warmup_seconds: 5
+            window_seconds: 15
+            max_loss_percent: 0.1
+""",
+    )
+
+    def __init__(self, config: MaxThroughputSearchConfig):
+        """
+        Initializes the MaxThroughputSearchAction with the given configuration.
+
+        Args:
+            config (MaxThroughputSearchConfig): The search configuration.
+        """
+        self.config = config
+
+    def execute(self, ctx: StepContext):
+        """
+        Runs the search and records the highest sustainable rate.
+
+        Args:
+            ctx (StepContext): The current step context, providing access to the
+                components, events and meter.
+
+        Raises:
+            AssertionError: If a component is missing, or the load generator does not
+                use the `pipeline_perf_loadgen` execution strategy.
+            ValueError: If no backend metrics endpoint is configured or discoverable.
+        """
+        logger = ctx.get_logger(__name__)
+        loadgen = ctx.get_component_by_name(self.config.target)
+        assert isinstance(
+            loadgen, ManagedComponent
+        ), "Load generator component not found, or incompatible type"
+        loadgen_config = loadgen.get_execution_config()
+        assert isinstance(
+            loadgen_config, PipelinePerfLoadgenConfig
+        ), "Load generator must use the pipeline_perf_loadgen execution strategy"
+        ctx.set_step_component(loadgen)
+
+        loadgen_endpoint = urljoin(loadgen_config.endpoint, "metrics")
+        backend_endpoint = self._backend_endpoint(ctx)
+
+        def probe(rate: int) -> bool:
+            result = self._probe(
+                ctx, loadgen, loadgen_config, rate, loadgen_endpoint, backend_endpoint
+            )
+            logger.info(
+                f"Probed {rate} items/sec: loss {result.loss_percent:.3f}%, "
+                f"{result.late_batches:.0f} late batches, "
+                f"{'sustainable' if result.sustainable else 'unsustainable'}"
+            )
+            ctx.record_event(
+                "Throughput Probe",
+                rate=result.rate,
+                attempted=result.attempted,
+                received=result.received,
+                late_batches=result.late_batches,
+                loss_percent=result.loss_percent,
+                sustainable=result.sustainable,
+            )
+            return result.sustainable
+
+        max_rate = search_max_rate(
+            probe,
+            self.config.min_rate,
+            self.config.max_rate,
+            search=self.config.search,
+            growth_factor=self.config.growth_factor,
+            precision=self.config.precision,
+            max_probes=self.config.max_probes,
+        )
+        found = max_rate or 0
+        logger.info(f"Maximum sustainable rate: {found} items/sec")
+        ctx.record_event("Max Throughput Found", max_sustainable_rate=found)
+        meter = ctx.get_meter(__name__)
+        if meter:
+            meter.create_gauge("max_sustainable_rate").set(
+                found, {"component_name": self.config.target}
+            )
+
+    def _backend_endpoint(self, ctx: StepContext) -> str:
+        """
+        Returns the configured backend metrics endpoint, or the endpoint of the
+        backend component's prometheus monitoring strategy.
+        """
+        if self.config.backend_metrics_endpoint:
+            return self.config.backend_metrics_endpoint
+        backend = ctx.get_component_by_name(self.config.backend)
+        assert isinstance(
+            backend, ManagedComponent
+        ), "Backend component not found, or incompatible type"
+        monitoring = backend.component_config.monitoring or {}
+        if "prometheus" not in monitoring:
+            raise ValueError(
+                f"No backend_metrics_endpoint set and {self.config.backend} has no "
+                "prometheus monitoring endpoint"
+            )
+        return monitoring["prometheus"].config.endpoint
+
+    def _wait_for_measurement(self, loadgen_endpoint: str):
+        """
+        Waits for the end of the load generator's own warmup, if it is still
+        running, as its sent, failed and late batch counters leave out the load
+        sent during it.
+        """
+        measure_from = scrape_counters(loadgen_endpoint, [MEASUREMENT_START])[
+            MEASUREMENT_START
+        ]
+        wait = measure_from - time.time()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _probe(
+        self,
+        ctx: StepContext,
+        loadgen: ManagedComponent,
+        loadgen_config: PipelinePerfLoadgenConfig,
+        rate: int,
+        loadgen_endpoint: str,
+        backend_endpoint: str,
+    ) -> ProbeResult:
+        """
+        Runs the load generator at one rate and measures its steady window.
+        """
+        execution = PipelinePerfLoadgenExecution(
+            loadgen_config.model_copy(update={"target_rate": rate})
+        )
+        received_metric = [self.config.received_metric]
+        execution.start(loadgen, ctx)
+        try:
+            time.sleep(self.config.warmup_seconds)
+            self._wait_for_measurement(loadgen_endpoint)
+            loadgen_start = scrape_counters(loadgen_endpoint, LOADGEN_METRICS)
+            backend_start = scrape_counters(backend_endpoint, received_metric)
+            time.sleep(self.config.window_seconds)
+            loadgen_end = scrape_counters(loadgen_endpoint, LOADGEN_METRICS)
+            backend_end = scrape_counters(backend_endpoint, received_metric)
+        finally:
+            execution.stop(loadgen, ctx)
+            time.sleep(self.config.drain_seconds)
+
+        attempted = sum(
+            loadgen_end[name] - loadgen_start[name] for name in ("sent", "failed")
+        )
+        received = (
+            backend_end[self.config.received_metric]
+            - backend_start[self.config.received_metric]
+        )
+        late_batches = loadgen_end["late_batches"] - loadgen_start["late_batches"]
+        loss_percent = (
+            max(0.0, attempted - received) / attempted * 100 if attempted else 100.0
+        )
+        return ProbeResult(
+            rate=rate,
+            attempted=attempted,
+            received=received,
+            late_batches=late_batches,
+            loss_percent=loss_percent,
+            sustainable=(
+                loss_percent <= self.config.max_loss_percent
+                and late_batches <= self.config.max_late_batches
+            ),
+        )
@@ -37,6 +37,7 @@ Raises:
     - Requests HTTPError if start or stop requests fail.
 """
 
+import time
 from typing import Optional, ClassVar, Literal
 from urllib.parse import urljoin
 
@@ -70,7 +71,14 @@ class PipelinePerfLoadgenConfig(ExecutionStrategyConfig):
         attribute_value_size (Optional[int]): Size of each attribute's value. Defaults to 15.
         batch_size (Optional[int]): Number of events sent in each batch. Defaults to 10000.
         tcp_connection_per_thread(Optional[bool]): Use a dedicated tcp connection per-thread.
-        load_type (Optional[str]): Load generation type: 'otlp' or 'syslog'. Defaults to 'otlp'.
+        load_type (Optional[str]): Load generation type: 'otlp', 'traces', 'metrics',
+            'otap', 'replay' or 'syslog'. Defaults to 'otlp'.
+
+    Every other attribute is passed to the load generator's /start endpoint as
+    the load generator option of the same name, with the same default; see the
+    load generator's readme.md for what each does. calibrate_seconds (default
+    None) and min_cpu_headroom (default 0.1) are used by this strategy to
+    calibrate the load generator and to flag runs it limited.
     """
 
     endpoint: Optional[str] = "http://localhost:5001/"
@@ -82,6 +90,41 @@ class PipelinePerfLoadgenConfig(ExecutionStrategyConfig):
     batch_size: Optional[int] = 10000
     tcp_connection_per_thread: Optional[bool] = True
     load_type: Optional[str] = "otlp"
+    workers: Optional[str] = "threads"
+    sender: Optional[str] = "sync"
+    max_in_flight: Optional[int] = 1
+    transport: Optional[str] = "grpc"
+    http_encoding: Optional[str] = "protobuf"
+    compression: Optional[str] = "none"
+    corpus_size: Optional[int] = 1
+    corpus_path: Optional[str] = None
+    replay_speed: Optional[float] = 1.0
+    fresh_timestamps: Optional[bool] = True
+    spans_per_trace: Optional[int] = 10
+    trace_depth: Optional[int] = 3
+    span_events: Optional[int] = 0
+    span_links: Optional[int] = 0
+    data_shape: Optional[str] = None
+    metric_mix: Optional[str] = "gauge=1,sum=1,histogram=1,exponential_histogram=1"
+    metric_series: Optional[int] = 100
+    points_per_series: Optional[int] = 1
+    pacing: Optional[str] = "closed"
+    arrivals: Optional[str] = "uniform"
+    load_profile: Optional[str] = None
+    syslog_format: Optional[str] = "rfc3164"
+    syslog_framing: Optional[str] = "newline"
+    syslog_send_buffer: Optional[int] = None
+    cpu_affinity: Optional[str] = None
+    warmup_seconds: Optional[float] = 0.0
+    endpoints: Optional[str] = None
+    endpoint_policy: Optional[str] = "round_robin"
+    retry_on_failure: Optional[bool] = False
+    retry_queue_size: Optional[int] = 100
+    retry_initial_interval: Optional[float] = 5.0
+    retry_max_interval: Optional[float] = 30.0
+    retry_max_elapsed_time: Optional[float] = 300.0
+    calibrate_seconds: Optional[float] = None
+    min_cpu_headroom: Optional[float] = 0.1
 
 
 @execution_registry.register_class(STRATEGY_NAME)
@@ -90,7 +133,9 @@ class PipelinePerfLoadgenExecution(ExecutionStrategy):
     Execution strategy implementation for controlling the pipeline performance load generator.
 
     This strategy starts and stops the load generator by issuing HTTP POST requests
-    to designated 'start' and 'stop' endpoints.
+    to designated 'start' and 'stop' endpoints. Before stopping, it records when
+    the load generator's warmup ended and whether the load generator, rather than
+    the pipeline, limited the run.
 
     Attributes:
         type (ClassVar[Literal["pipeline_perf_loadgen"]]): Identifier for this strategy.
@@ -98,10 +143,17 @@ class PipelinePerfLoadgenExecution(ExecutionStrategy):
         default_hooks (dict): Placeholder for lifecycle hooks (empty by default).
         start_endpoint (str): Fully qualified URL for starting the load generator.
         stop_endpoint (str): Fully qualified URL for stopping the load generator.
+        calibrate_endpoint (str): Fully qualified URL for calibrating the load
+            generator.
+        metrics_endpoint (str): Fully qualified URL of the load generator's metrics.
+        calibration (Optional[dict]): Result of the last calibration.
 
     Methods:
         start(component, ctx): Sends a POST request to start load generation with configured parameters.
         stop(component, ctx): Sends a POST request to stop load generation.
+        calibrate(parameters, ctx): Measures the load generator's ceiling.
+        read_metrics(ctx): Reads the load generator's unlabelled metrics.
+        check_limited(samples, ctx): Flags a run limited by the load generator.
     """
 
     type: ClassVar[Literal["pipeline_perf_loadgen"]] = "pipeline_perf_loadgen"
@@ -136,6 +188,9 @@ components:
         self.default_hooks = {}
         self.start_endpoint = urljoin(config.endpoint, "start")
         self.stop_endpoint = urljoin(config.endpoint, "stop")
+        self.calibrate_endpoint = urljoin(config.endpoint, "calibrate")
+        self.metrics_endpoint = urljoin(config.endpoint, "metrics")
+        self.calibration: Optional[dict] = None
 
     def start(self, _component: Component, ctx: StepContext):
         """
@@ -158,7 +213,42 @@ components:
             "batch_size": self.config.batch_size,
             "tcp_connection_per_thread": self.config.tcp_connection_per_thread,
             "load_type": self.config.load_type,
+            "workers": self.config.workers,
+            "sender": self.config.sender,
+            "max_in_flight": self.config.max_in_flight,
+            "transport": self.config.transport,
+            "http_encoding": self.config.http_encoding,
+            "compression": self.config.compression,
+            "corpus_size": self.config.corpus_size,
+            "corpus_path": self.config.corpus_path,
+            "replay_speed": self.config.replay_speed,
+            "fresh_timestamps": self.config.fresh_timestamps,
+            "spans_per_trace": self.config.spans_per_trace,
+            "trace_depth": self.config.trace_depth,
+            "span_events": self.config.span_events,
+            "span_links": self.config.span_links,
+            "data_shape": self.config.data_shape,
+            "metric_mix": self.config.metric_mix,
+            "metric_series": self.config.metric_series,
+            "points_per_series": self.config.points_per_series,
+            "pacing": self.config.pacing,
+            "arrivals": self.config.arrivals,
+            "load_profile": self.config.load_profile,
+            "syslog_format": self.config.syslog_format,
+            "syslog_framing": self.config.syslog_framing,
+            "syslog_send_buffer": self.config.syslog_send_buffer,
+            "cpu_affinity": self.config.cpu_affinity,
+            "warmup_seconds": self.config.warmup_seconds,
+            "endpoints": self.config.endpoints,
+            "endpoint_policy": self.config.endpoint_policy,
+            "retry_on_failure": self.config.retry_on_failure,
+            "retry_queue_size": self.config.retry_queue_size,
+            "retry_initial_interval": self.config.retry_initial_interval,
+            "retry_max_interval": self.config.retry_max_interval,
+            "retry_max_elapsed_time": self.config.retry_max_elapsed_time,
         }
+        if self.config.calibrate_seconds:
+            self.calibrate(parameters, ctx)
         ctx.record_event("Requesting Load Start", None, **parameters)
         resp = requests.post(
             self.start_endpoint,
@@ -175,6 +265,10 @@ components:
         """
         Stops the load generator by sending a POST request to the stop endpoint.
 
+        A 'Load Measurement Started' event is first recorded at the time the load
+        generator's warmup ended, for reports to use as the start of their
+        observation window.
+
         Args:
             _component (Component): The component instance (unused).
             ctx (StepContext): The current execution context for logging.
@@ -183,8 +277,105 @@ components:
             requests.HTTPError: If the HTTP request to stop the load generator fails.
         """
         logger = ctx.get_logger(__name__)
+        samples = self.read_metrics(ctx)
+        measure_from = samples.get("measurement_start_time_seconds")
+        if measure_from:
+            ctx.record_event(
+                "Load Measurement Started",
+                int(measure_from * 1e9),
+                warmup_seconds=self.config.warmup_seconds,
+            )
+        self.check_limited(samples, ctx)
         ctx.record_event("Requesting Load Stop")
         resp = requests.post(self.stop_endpoint, timeout=60)
         resp.raise_for_status()
         ctx.record_event("Load Stopped")
         logger.debug(f"Got response from loadgen stop: {resp.text}")
+
+    def calibrate(self, parameters: dict, ctx: StepContext):
+        """
+        Measures the load generator's ceiling for the load parameters against a
+        null sink, for calibrate_seconds, and records it as an event.
+
+        Args:
+            parameters (dict): The load parameters, as sent to the start endpoint.
+            ctx (StepContext): The current execution context for logging.
+
+        Raises:
+            requests.HTTPError: If the calibration request fails.
+        """
+        logger = ctx.get_logger(__name__)
+        duration = self.config.calibrate_seconds
+        resp = requests.post(
+            self.calibrate_endpoint,
+            json={**parameters, "duration": duration},
+            timeout=duration + 60,
+        )
+        resp.raise_for_status()
+        self.calibration = resp.json()
+        ctx.record_event(
+            "Load Generator Calibrated",
+            None,
+            **{k: v for k, v in self.calibration.items() if v is not None},
+        )
+        logger.info(
+            "Load generator ceiling: "
+            f"{self.calibration['items_per_second']:.0f} items/sec, "
+            f"{self.calibration['bytes_per_second']:.0f} bytes/sec"
+        )
+
+    def read_metrics(self, ctx: StepContext) -> dict:
+        """
+        Reads the unlabelled samples of the load generator's metrics. Failures to
+        read them are logged, and give no samples.
+
+        Args:
+            ctx (StepContext): The current execution context for logging.
+
+        Returns:
+            dict: The value of each sample, by name.
+        """
+        logger = ctx.get_logger(__name__)
+        try:
+            resp = requests.get(self.metrics_endpoint, timeout=10)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            logger.debug(f"Could not read loadgen metrics: {e}")
+            return {}
+        samples = {}
+        for line in resp.text.splitlines():
+            name, _, value = line.partition(" ")
+            if line and line[0] != "#" and "{" not in name:
+                samples[name] = float(value)
+        return samples
+
+    def check_limited(self, samples: dict, ctx: StepContext):
+        """
+        Records a 'Load Generator Limited' event, and logs a warning, when the load
+        generator ran out of CPU headroom or sent within min_cpu_headroom of its
+        calibrated ceiling, so the run measured the load generator rather than the
+        pipeline.
+
+        Args:
+            samples (dict): The load generator's metrics, from read_metrics.
+            ctx (StepContext): The current execution context for logging.
+        """
+        logger = ctx.get_logger(__name__)
+        limit = self.config.min_cpu_headroom or 0.0
+        details = {}
+        headroom = samples.get("cpu_headroom")
+        if headroom is not None and headroom < limit:
+            details["cpu_headroom"] = headroom
+        measure_from = samples.get("measurement_start_time_seconds")
+        if self.calibration and measure_from and time.time() > measure_from:
+            # Items sent during the warmup are not counted in 'sent'.
+            rate = samples.get("sent", 0.0) / (time.time() - measure_from)
+            ceiling = self.calibration["items_per_second"]
+            if ceiling and rate >= ceiling * (1 - limit):
+                details["items_per_second"] = rate
+                details["calibrated_items_per_second"] = ceiling
+        if details:
+            logger.warning(
+                f"Load generator was the limiting component of this run: {details}"
+            )
+            ctx.record_event("Load Generator Limited", None, **details)
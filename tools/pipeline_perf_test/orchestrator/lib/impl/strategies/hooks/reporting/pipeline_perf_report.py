@@ -651,7 +651,10 @@ hooks:
             ],
             "gauge": ["otelcol_process_memory_rss_bytes"],
         }
-        loadgen_metrics_type = {"counter": ["sent", "failed", "bytes_sent"]}
+        loadgen_metrics_type = {
+            "counter": ["sent", "failed", "bytes_sent", "wire_bytes_sent"],
+            "gauge": ["target_rate"],
+        }
         backend_metrics_type = {"counter": ["received_logs"]}
 
         otel_counter_metrics = tc.metrics.query_metrics(
@@ -674,6 +677,11 @@ hooks:
             metric_attrs={"component_name": self.config.system_under_test},
             time_range=(self.report_start, self.report_end),
         )
+        loadgen_gauge_metrics = tc.metrics.query_metrics(
+            metric_name=loadgen_metrics_type.get("gauge"),
+            metric_attrs={"component_name": self.config.load_generator},
+            time_range=(self.report_start, self.report_end),
+        )
 
         counter_metrics = concat_metrics_df(
             [otel_counter_metrics, backend_counter_metrics, loadgen_counter_metrics],
@@ -691,7 +699,8 @@ hooks:
             counter_rates = counter_rates.loc[first_idx:last_idx]
 
         gauge_metrics = concat_metrics_df(
-            [counter_rates, otel_gauge_metrics], ignore_index=True
+            [counter_rates, otel_gauge_metrics, loadgen_gauge_metrics],
+            ignore_index=True,
         )
 
         gauge_aggregates = gauge_metrics.with_aggregation(
@@ -262,6 +262,9 @@ def scrape_and_convert_metrics(
           on include/exclude filters.
         - All metrics are recorded as gauges via the `get_instrument` function, regardless of
           their original type.
+        - Histogram and summary samples are recorded under their own sample names (e.g.
+          `<name>_bucket` with its `le` label, `<name>_sum` and `<name>_count`), so they
+          don't overwrite each other in a single gauge.
         - Each metric sample is tagged with the component name as a label named 'component_name'.
     """
     resp = requests.get(endpoint)
@@ -269,6 +272,7 @@ def scrape_and_convert_metrics(
     metrics_text = resp.text
 
     for family in parser.text_string_to_metric_families(metrics_text):
+        per_sample = family.type in ("histogram", "gaugehistogram", "summary")
         instrument = None
         for sample in family.samples:
             name, labels, value, *_ = sample
@@ -276,6 +280,9 @@ def scrape_and_convert_metrics(
             if not should_keep(name, include=include, exclude=exclude):
                 continue
             # Record the metric
+            if per_sample:
+                get_instrument(meter, name, family.type).set(value, labels)
+                continue
             if not instrument:
                 instrument = get_instrument(meter, family.name, family.type)
             instrument.set(value, labels)
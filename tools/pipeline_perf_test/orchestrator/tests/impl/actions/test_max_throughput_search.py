@@ -0,0 +1,159 @@
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from lib.core.context import StepContext
+from lib.core.framework.step import StepAction
+from lib.impl.actions.max_throughput_search import (
+    ACTION_NAME,
+    MEASUREMENT_START,
+    MaxThroughputSearchAction,
+    MaxThroughputSearchConfig,
+    search_max_rate,
+)
+from lib.impl.component.managed_component import ManagedComponent
+from lib.impl.strategies.execution.pipeline_perf_loadgen import (
+    PipelinePerfLoadgenConfig,
+)
+from lib.runner.registry import step_action_registry
+
+
+def test_max_throughput_search_is_registered():
+    assert ACTION_NAME in step_action_registry.element
+    assert ACTION_NAME in step_action_registry.config
+    assert step_action_registry.element[ACTION_NAME] is MaxThroughputSearchAction
+    assert step_action_registry.config[ACTION_NAME] is MaxThroughputSearchConfig
+
+
+def test_max_throughput_search_instantiation():
+    config = MaxThroughputSearchConfig(min_rate=500, search="binary")
+    action = MaxThroughputSearchAction(config)
+    assert isinstance(action, StepAction)
+    assert action.config.min_rate == 500
+    assert action.config.search == "binary"
+
+
+@pytest.mark.parametrize("search", ["exponential", "binary"])
+def test_search_converges_below_capacity(search):
+    probed = []
+
+    def probe(rate):
+        probed.append(rate)
+        return rate <= 37000
+
+    found = search_max_rate(
+        probe, 1000, 1000000, search=search, precision=0.01, max_probes=30
+    )
+
+    assert 37000 * 0.99 <= found <= 37000
+    assert len(probed) < 30
+
+
+def test_exponential_search_stops_at_max_rate():
+    probed = []
+
+    def probe(rate):
+        probed.append(rate)
+        return True
+
+    assert search_max_rate(probe, 1000, 5000) == 5000
+    assert probed == [1000, 2000, 4000, 5000]
+
+
+def test_search_returns_none_when_nothing_is_sustainable():
+    assert search_max_rate(lambda rate: False, 1000, 5000) is None
+    assert search_max_rate(lambda rate: False, 1000, 5000, search="binary") is None
+
+
+@patch("lib.impl.actions.max_throughput_search.time.sleep")
+@patch("lib.impl.actions.max_throughput_search.PipelinePerfLoadgenExecution")
+@patch("lib.impl.actions.max_throughput_search.scrape_counters")
+def test_execute_judges_probes_by_loss_and_late_batches(
+    mock_scrape, mock_execution, _mock_sleep
+):
+    loadgen = MagicMock(spec=ManagedComponent)
+    loadgen.get_execution_config.return_value = PipelinePerfLoadgenConfig(
+        endpoint="http://loadgen:5001/"
+    )
+    ctx = MagicMock(spec=StepContext)
+    ctx.get_component_by_name.return_value = loadgen
+
+    # The pipeline receives up to 4000 items/sec, and the loadgen falls behind
+    # its schedule from 8000. Each probe scrapes the loadgen and the backend at
+    # the start, then at the end of its window.
+    rates = []
+    counter_scrapes = []
+
+    def execution(config):
+        rates.append(config.target_rate)
+        return mock_execution.return_value
+
+    def scrape(endpoint, names):
+        if names == [MEASUREMENT_START]:
+            return {MEASUREMENT_START: 0.0}
+        rate = rates[-1]
+        counter_scrapes.append(endpoint)
+        window = 1 if (len(counter_scrapes) - 1) % 4 >= 2 else 0
+        if endpoint.startswith("http://loadgen"):
+            late = 5 if rate >= 8000 else 0
+            return {"sent": rate * window, "failed": 0, "late_batches": late * window}
+        return {"received_logs": min(rate, 4000) * window}
+
+    mock_execution.side_effect = execution
+    mock_scrape.side_effect = scrape
+    config = MaxThroughputSearchConfig(
+        backend_metrics_endpoint="http://backend:5000/metrics",
+        min_rate=1000,
+        max_rate=16000,
+        precision=0.2,
+    )
+    MaxThroughputSearchAction(config).execute(ctx)
+
+    assert rates == [1000, 2000, 4000, 8000, 6000, 5000, 4500]
+    assert mock_scrape.call_args_list[0].args[0] == "http://loadgen:5001/metrics"
+    ctx.record_event.assert_any_call("Max Throughput Found", max_sustainable_rate=4000)
+    assert mock_execution.return_value.stop.call_count == len(rates)
+
+
+@patch("lib.impl.actions.max_throughput_search.time.sleep")
+@patch("lib.impl.actions.max_throughput_search.PipelinePerfLoadgenExecution")
+@patch("lib.impl.actions.max_throughput_search.scrape_counters")
+def test_probe_waits_for_the_end_of_the_loadgen_warmup(
+    mock_scrape, _mock_execution, mock_sleep
+):
+    loadgen = MagicMock(spec=ManagedComponent)
+    loadgen.get_execution_config.return_value = PipelinePerfLoadgenConfig(
+        endpoint="http://loadgen:5001/", warmup_seconds=30
+    )
+    ctx = MagicMock(spec=StepContext)
+    ctx.get_component_by_name.return_value = loadgen
+    measure_from = time.time() + 30
+    measured = []
+
+    def sleep(seconds):
+        measured.append(seconds)
+
+    def scrape(endpoint, names):
+        if names == [MEASUREMENT_START]:
+            return {MEASUREMENT_START: measure_from}
+        sent = 1000.0 * len(measured)
+        if endpoint.startswith("http://loadgen"):
+            return {"sent": sent, "failed": 0, "late_batches": 0}
+        return {"received_logs": sent}
+
+    mock_sleep.side_effect = sleep
+    mock_scrape.side_effect = scrape
+    config = MaxThroughputSearchConfig(
+        backend_metrics_endpoint="http://backend:5000/metrics",
+        min_rate=1000,
+        max_rate=1000,
+        warmup_seconds=5,
+    )
+    MaxThroughputSearchAction(config).execute(ctx)
+
+    # The action's own 5s warmup is extended to the end of the loadgen's 30s
+    # one (the mocked sleeps do not move the clock)
+    assert measured[0] == 5
+    assert 29 < measured[1] <= 30
+    ctx.record_event.assert_any_call("Max Throughput Found", max_sustainable_rate=1000)